@@ -1,1940 +1,4801 @@
-# Foundations of AI - Final Project
-# Author: Nicholas Ianni
-
-###################################
-# Location class
-#
-# Class variables:
-# stack: the ordered stack at the associated location
-# name: the name of the location
-###################################
-
-class Location:
-
-    ###############################
-    # Constructor
-    # Initializes the location with the associated name of the location
-    # and the ordered stack at the location
-    #
-    # Parameters:
-    # self: the Location object
-    # stack: the ordered stack at the associated location
-    # name: the name of the location
-    ###############################
-
-    def __init__(self, stack, name):
-        self.stack = stack
-        self.name = name
-
-    ###############################
-    # take_top
-    # Takes a block from the top of the stack at this location
-    #
-    # Parameter:
-    # self: the Location object
-    #
-    # Returns the top object of the stack.
-    # Returns '0' and prints an error upon trying to take from an empty stack.
-    ###############################
-
-    def take_top(self):
-        # If the stack is not empty, return and remove the top item from the stack
-        if not(len(self.stack) == 0):
-            return self.stack.pop()
-        # Otherwise, print an error message
-        else:
-            print("Error: Tried to take from an empty stack at location " + self.name + ".\n")
-            return '0'
-
-    ###############################
-    # put_top
-    # Puts a specified item on top of the stack at the associated location.
-    #
-    # Parameters:
-    # self: the Location object
-    # item: the item from the Arm to put on the top of the stack
-    ###############################
-
-    def put_top(self, item):
-        self.stack.append(item)
-
-###################################
-# Arm class
-#
-# Class variables:
-# place: the arm's current location
-# item: the current item the arm is holding (0 means that the arm is empty)
-###################################
-
-class Arm:
-
-    ###############################
-    # Constructor
-    # Initializes the Arm object
-    #
-    # Parameters:
-    # self: the Arm object
-    # place: the arm's current location
-    # item: the current item the arm is holding (0 means that the arm is empty)
-    ###############################
-
-    def __init__(self, place, item):
-        self.place = place
-        self.item = item
-
-    ###############################
-    # move
-    # Moves the arm from the arm's inital location to a new location
-    #
-    # Parameters:
-    # self: the Arm object
-    # place: the place the arm will move to
-    ###############################
-
-    def move(self, place):
-        self.place = place
-
-    ###############################
-    # pick_up
-    # Picks up the block at the arm's current location and returns the updated
-    # Location object
-    #
-    # Parameter:
-    # self: the Arm object
-    #
-    # Returns the updated Location object
-    # Prints an error if the arm is currently holding an item
-    ###############################
-
-    def pick_up(self):
-        # If the Arm is empty (marked by item being 0), take the object
-        if self.item == '0':
-            self.item = self.place.take_top()
-        # Otherwise, print an error message
-        else:
-            print("Error: Tried to pick up at location " + self.place.name + ".\n")
-        # Return the updated Location object
-        return self.place
-
-    ###############################
-    # put_down
-    # Puts the item the arm is holding down onto the location and returns the
-    # updated Location object
-    #
-    # Parameter:
-    # self: the Arm object
-    #
-    # Returns the updated Location object
-    # Prints an error is the arm is not currently holding an item
-    ###############################
-
-    def put_down(self):
-        # If the arm is not empty (not '0'), place the item on top of the stack
-        if not(self.item == '0'):
-            self.place.put_top(self.item)
-            self.item = '0'
-        # Otherwise, print an error message
-        else:
-            print("Error: Tried to put down without an item in the arm.\n")
-        # Return the updated Location object
-        return self.place
-
-###################################
-# State class
-#
-# Class variables:
-# l1: the first Location object at the given state (L1)
-# l2: the second Location object at the given state (L2)
-# l3: the third Location object at the given state (L3)
-# arm: the Arm object at the given state
-# num: the state number
-###################################
-
-class State:
-
-    ###############################
-    # Constructor
-    # Initializes the State object
-    #
-    # Parameters:
-    # self: the State object
-    # l1: the first Location object at the given state (L1)
-    # l2: the second Location object at the given state (L2)
-    # l3: the third Location object at the given state (L3)
-    # num: the state number
-    ###############################
-
-    def __init__(self, l1, l2, l3, num):
-        self.l1 = l1
-        self.l2 = l2
-        self.l3 = l3
-        # Starts the arm at L1
-        self.arm = Arm(self.l1, '0')
-        self.num = num
-
-    ###############################
-    # get_relations
-    # Returns a list of relations for the given state
-    #
-    # Parameter:
-    # self: the State object
-    #
-    # Returns a list of relations for the given state
-    ###############################
-
-    def get_relations(self):
-        # Create a blank list for relations to be appended to
-        relations = []
-
-        # Table relation
-        # For each location, if the location is not empty, create a relation for
-        # the block that is touching the table with the following form:
-        # ['t' (Table), (block touching table)]
-        if not(len(self.l1.stack) == 0):
-            relations.append(['t', self.l1.stack[0]])
-        if not(len(self.l2.stack) == 0):
-            relations.append(['t', self.l2.stack[0]])
-        if not(len(self.l3.stack) == 0):
-            relations.append(['t', self.l3.stack[0]])
-
-        # On relation
-        # For each location, create a relation for each pair of blocks directly
-        # on top of each other with the following form:
-        # ['o' (On), (block above), (block below)]
-        for i in range(len(self.l1.stack)):
-            if not(i+1 == len(self.l1.stack)):
-                relations.append(['o', self.l1.stack[i+1], self.l1.stack[i]])
-        for i in range(len(self.l2.stack)):
-            if not(i+1 == len(self.l2.stack)):
-                relations.append(['o', self.l2.stack[i+1], self.l2.stack[i]])
-        for i in range(len(self.l3.stack)):
-            if not(i+1 == len(self.l3.stack)):
-                relations.append(['o', self.l3.stack[i+1], self.l3.stack[i]])
-
-        # Clear relation
-        # For each location, if the stack is not empty, create a relation where
-        # a block does not have a block on top of it with the following form:
-        # ['c' (Clear), (block on top of stack)]
-        if not(len(self.l1.stack) == 0):
-            relations.append(['c', self.l1.stack[len(self.l1.stack) - 1]])
-        if not(len(self.l2.stack) == 0):
-            relations.append(['c', self.l2.stack[len(self.l2.stack) - 1]])
-        if not(len(self.l3.stack) == 0):
-            relations.append(['c', self.l3.stack[len(self.l3.stack) - 1]])
-
-        # Above relation
-        # Only check for "Above" if the arm is not empty (marked by item being 0)
-        if not(self.arm.item == '0'):
-            # For each location, create a relation where the arm is holding an
-            # item above a block or stack with the following form:
-            # ['a' (Above), (block held by arm), (block on top of stack)]
-            if self.arm.place.name == 'L1':
-                relations.append(['a', self.arm.item, self.l1.stack[len(self.l1.stack) - 1]])
-            elif self.arm.place.name == 'L2':
-                relations.append(['a', self.arm.item, self.l2.stack[len(self.l2.stack) - 1]])
-            elif self.arm.place.name == 'L3':
-                relations.append(['a', self.arm.item, self.l3.stack[len(self.l3.stack) - 1]])
-
-        # Return the list of relations
-        return relations
-
-    ###################################
-    # print_state
-    # Outputs a text interpretation of the given state
-    #
-    # Parameter:
-    # self: the State object
-    ###################################
-
-    def print_state(self):
-        # Print the state number
-        print("State " + str(self.num) + ":")
-        # Print the arm in it's current location
-        # If the arm is in L1...
-        if self.arm.place.name == 'L1':
-            # Print the formatted arm stem
-            print(" |")
-            # If the arm is empty (marked by item being 0), print an empty arm
-            if self.arm.item == '0':
-                print("/ \\")
-            # Otherwise, print an arm with the associated item within the arm
-            else:
-                print("/" + self.arm.item + "\\")
-        # If the arm is in L2...
-        elif self.arm.place.name == 'L2':
-            # Print the formatted arm stem
-            print("    |")
-            # If the arm is empty (marked by item being 0), print an empty arm
-            if self.arm.item == '0':
-                print("   / \\")
-            # Otherwise, print an arm with the associated item within the arm
-            else:
-                print("   /" + self.arm.item + "\\")
-        # If the arm is in L3...
-        elif self.arm.place.name == 'L3':
-            # Print the formatted arm stem
-            print("       |")
-            # If the arm is empty (marked by item being 0), print an empty arm
-            if self.arm.item == '0':
-                print("      / \\")
-            # Otherwise, print an arm with the associated item within the arm
-            else:
-                print("      /" + self.arm.item + "\\")
-        # If the arm is not recognized at any of these locations, print an error
-        else:
-            print("Error: Unknown arm location.\n")
-        print("")
-        # Determine the max index of all the stacks
-        maxIndex = len(self.l1.stack)
-        if maxIndex < len(self.l2.stack):
-            maxIndex = len(self.l2.stack)
-        if maxIndex < len(self.l3.stack):
-            maxIndex = len(self.l3.stack)
-        # Loop for each height of blocks
-        for n in range(maxIndex):
-            print(" ", end="")
-            # If the L1 stack has a block at the given height, print the block
-            if maxIndex - n <= len(self.l1.stack):
-                print(self.l1.stack[maxIndex - n - 1], end="")
-            # Otherwise, make the L1 slot at that height empty
-            else:
-                print(" ", end="")
-            print("  ", end="")
-            # If the L2 stack has a block at the given height, print the block
-            if maxIndex - n <= len(self.l2.stack):
-                print(self.l2.stack[maxIndex - n - 1], end="")
-            # Otherwise, make the L2 slot at that height empty
-            else:
-                print(" ", end="")
-            print("  ", end="")
-            # If the L3 stack has a block at the given height, print the block
-            if maxIndex - n <= len(self.l3.stack):
-                print(self.l3.stack[maxIndex - n - 1], end="")
-            # Otherwise, make the L3 slot at that height empty
-            else:
-                print(" ", end="")
-            print("")
-        # Draw the table an stack locations
-        print("=========")
-        print(" L1 L2 L3\n")
-
-#######################################
-# Planner class
-#
-# Class variables:
-# state: the current state
-# state_g: the goal state
-# relations_c: the set of relations for the current state (changes each state)
-# relations_g: the set of relations for the goal state (created once)
-# satisfied: a set of booleans directly mapped to relations_g that denote
-# if the associated relation is present in both relations_c and relations_g
-#######################################
-
-class Planner:
-
-    ###################################
-    # Constructor
-    # Initializes the planner object
-    #
-    # Parameters:
-    # self: the Planner object
-    # l1i: the initial state's first location
-    # l2i: the initial state's second location
-    # l3i: the initial state's third location
-    # l1g: the goal state's first location
-    # l2g: the goal state's second location
-    # l3g: the goal state's third location
-    ###################################
-
-    def __init__ (self, l1i, l2i, l3i, l1g, l2g, l3g):
-        self.state = State(Location(l1i, 'L1'), Location(l2i, 'L2'), Location(l3i, 'L3'), 0)
-        self.state_g = State(Location(l1g, 'L1'), Location(l2g, 'L2'), Location(l3g, 'L3'), 0)
-        self.relations_c = self.state.get_relations()
-        self.relations_g = self.state_g.get_relations()
-        self.satisfied = []
-        for i in range(len(self.relations_g)):
-            self.satisfied.append(False)
-
-    ###################################
-    # search4relations
-    # Searches the relation list for relations of a specified type
-    #
-    # Parameters:
-    # self: the Planner object
-    # relations: the list of relations of the state
-    # type: the type of relation to be searched for ->
-    # -> 't' for Table, 'o' for On, 'a' for Above, and 'c' for Clear
-    #
-    # Returns a list of relations from the relation list filtered by the given type
-    ###################################
-
-    def search4relations (self, relations, type):
-        list = []
-        # For each relation in relations, only append to list those relations of
-        # the specified type
-        for r in range(len(relations)):
-            if relations[r][0] == type:
-                list.append(relations[r])
-        # Return the completed list
-        return list
-
-    ###################################
-    # search4block
-    # For the given state, find which location the block in question is located at
-    #
-    # Parameters:
-    # self: the Planner object
-    # state: the state to search within
-    # block: the block to find in the given state
-    #
-    # Returns the location of the block
-    # Returns an error if the block is either held by the arm or the block is not found
-    ###################################
-
-    def search4block (self, state, block):
-        found = False
-        location = ''
-        # Check L1 for the block
-        for i in range(len(state.l1.stack)):
-            # If found, change location to L1, change found to true, then stop
-            if state.l1.stack[i] == block:
-                found = True
-                location = 'L1'
-                break
-        # If the block was not found in L1, check L2 for the block
-        if not(found):
-            for i in range(len(state.l2.stack)):
-                # If found, change location to L2, change found to true, then stop
-                if state.l2.stack[i] == block:
-                    found = True
-                    location = 'L2'
-                    break
-        # If the block was not found in L1 or L2, check L3 for the block
-        if not(found):
-            for i in range(len(state.l3.stack)):
-                # If found, change location to L3, change found to true, then stop
-                if state.l3.stack[i] == block:
-                    found = True
-                    location = 'L3'
-                    break
-        # If the block was not found, print an appropriate error message
-        if not(found):
-            if state.arm.item == block:
-                print("Error: search4block used when block was in arm.\n")
-            else:
-                print("Error: search4block did not find block.\n")
-        # Return the location (if an error is printed, an empty string is returned)
-        return location
-
-    ###################################
-    # compare_relations
-    # Compares the relations of a given type and returns an ordered list of
-    # relations to solve for. This function also updates the satisfied function
-    # for those relations that are already true (with some exception to On
-    # relation, as some On relations are deemed only temporarily satisfied).
-    #
-    # Parameters:
-    # self: the Planner object
-    # type: the type of relation being tested for
-    #
-    # Returns an ordered list of relations to solve for of the given type
-    # Prints an error and returns an empty set if type is not 't', 'o', or 'c'
-    #
-    # Side effect: Alters the satisfied list
-    ###################################
-
-    def compare_relations (self, type):
-        list = []
-        # Table relation, 't'
-        if type == 't':
-            # Find all relations of type Table for the current state
-            current = self.search4relations(self.relations_c, 't')
-            # Find all relations of type Table for the goal state
-            goal = self.search4relations(self.relations_g, 't')
-            # For each goal relation of type 't'...
-            for i in range(len(goal)):
-                # Search for a relation that matches goal[i]
-                match = False
-                for j in range(len(current)):
-                    # If the relations match, set match to true, then stop
-                    if goal[i][1] == current[j][1]:
-                        match = True
-                        break
-                # If a match is found...
-                if match:
-                    # Find the corresponding relation in relations_g, then stop
-                    for k in range(len(self.relations_g)):
-                        if goal[i][0] == self.relations_g[k][0] and goal[i][1] == self.relations_g[k][1]:
-                            self.satisfied[k] = True
-                            break
-                # If a match is not found...
-                else:
-                    # Add the goal relation to the list
-                    list.append(goal[i])
-            # END OF LOOP - list is ready to be returned
-
-        # On relation, 'o'
-        elif type == 'o':
-            # Find all relations of type On for the current state
-            current = self.search4relations(self.relations_c, 'o')
-            # Find all relations of type Table for the current state
-            current_t = self.search4relations(self.relations_c, 't')
-            # Find all relations of type Clear for the current state
-            current_c = self.search4relations(self.relations_c, 'c')
-
-            # Find all relations of type On for the goal state
-            goal = self.search4relations(self.relations_g, 'o')
-            # Find all relations of type Table for the goal state
-            goal_t = self.search4relations(self.relations_g, 't')
-
-            # To order the tasks, find the location where a block is both
-            # Table and Clear (such a block may not be found)
-            found = False
-            order = ['L1']
-            for i in range(len(current_t)):
-                for j in range(len(current_c)):
-                    # If a block is both Table and Clear, save the block's location
-                    if current_t[i][1] == current_c[j][1]:
-                        found = True
-                        order[0] = self.search4block(self.state, current_t[i][1])
-                        break
-                if found:
-                    break
-            # Complete the order for each case
-            if order[0] == 'L1':
-                order.append('L3')
-                order.append('L2')
-            elif order[0] == 'L2':
-                order.append('L1')
-                order.append('L3')
-            elif order[0] == 'L3':
-                order.append('L2')
-                order.append('L1')
-            # If location is blank, an error occured (print error message)
-            else:
-                print("Error: compare_relations failed from search4block.\n")
-            # For each location in order, order the tasks from the bottom
-            # to the top of the stack. Also, compare relations along the way.
-            for i in range(len(order)):
-                    # Find the block on the table at order[i] in the current state
-                    bottom = ''
-                    for j in range(len(current_t)):
-                        if self.search4block(self.state, current_t[j][1]) == order[i]:
-                            # Check if the goal state has a matching Table relation
-                            for k in range(len(goal_t)):
-                                if current_t[j][1] == goal_t[k][1]:
-                                    bottom = current_t[j][1]
-                    # If the stack is empty or there is no goal of a stack
-                    # being formed, no stack will be formed.
-                    if not(bottom == ''):
-                        # Find the chain of On goal relations until a match cannot be found
-                        still_true = True
-                        while True:
-                            # For each On goal relation, see if the
-                            # second parmeter matches bottom
-                            match_goal = False
-                            for j in range(len(goal)):
-                                if bottom == goal[j][2]:
-                                    # Specify that a goal relation succeeds the
-                                    # bottom block's relation, and shift bottom
-                                    # to the top block of the found relation
-                                    bottom = goal[j][1]
-                                    match_goal = True
-                                    # See if there is a match for the goal
-                                    # relation in the current state
-                                    match_current = False
-                                    # If the stack does not hold true up to that
-                                    # point, don't check and add the task
-                                    if still_true:
-                                        for k in range(len(current)):
-                                            if current[k][2] == goal[j][2] and current[k][1] == goal[j][1]:
-                                                # Specify a match
-                                                match_current = True
-                                                # Find the relation in relations_g &
-                                                # set satisfied to true for the relation
-                                                for n in range(len(self.relations_g)):
-                                                    if self.relations_g[n][0] == goal[j][0] and self.relations_g[n][1] == goal[j][1]:
-                                                        if self.relations_g[n][2] == goal[j][2]:
-                                                            self.satisfied[n] = True
-                                                            break
-                                    # If no match is found...
-                                    if not(match_current):
-                                        # Set still_true to False and add task
-                                        list.append(goal[j])
-                                        still_true = False
-                            # If a On goal is not found for the bottom block,
-                            # stop the loop to start on a new stack
-                            if not(match_goal):
-                                break
-                # END OF LOOP - list is ready to be returned
-
-        # Clear relation, 'c'
-        elif type == 'c':
-            # Since it is implied that Clear is already solved for, we only
-            # check that the current Clear relations match the goal Clear relations
-            # Find all relations of type Clear for the current state
-            current = self.search4relations(self.relations_c, 'c')
-            # Find all relations of type Clear for the goal state
-            goal = self.search4relations(self.relations_g, 'c')
-
-            for i in range(len(goal)):
-                for j in range(len(current)):
-                    if goal[i][1] == current[j][1]:
-                        for k in range(len(self.relations_g)):
-                            if goal[i][0] == self.relations_g[k][0] and goal[i][1] == self.relations_g[k][1]:
-                                self.satisfied[k] = True
-                                break
-            # END OF LOOP - empty list is returned
-
-        # Print an error and returns an empty set if type is not 't', 'o', or 'c'
-        else:
-            print("Error: compare_relations only accepts types t, o, and c.\n")
-        return list
-
-    ###################################
-    # execution_setup
-    # Allocates stacks for a given relation task. Stack roles are as follows:
-    # Dig - the stack to dig from
-    # Junk - the stack that blocks can be temporarily placed on
-    # Place Tmp - the temporary location to place the goal block
-    # Place - the goal location for the goal block
-    #
-    # Parameters:
-    # self - the Planner object
-    # task - the relation task to solve for
-    #
-    # Returns an ordered list of the stack roles ordered as the following:
-    # [Dig, Junk, Place Tmp, Place]
-    ###################################
-
-    def execution_setup (self, task):
-        list = []
-        dig = ''
-        junk = ''
-        place_tmp = ''
-        place = ''
-        if task[0] == 't':
-            # Define the goal block
-            block_g = task[1]
-            # Find the block's location to set as Dig
-            dig = self.search4block(self.state, block_g)
-            # Find a location that block can be placed
-            # Find Table relations for both the current and goal state
-            current = self.search4relations(self.relations_c, 't')
-            goal = self.search4relations(self.relations_g, 't')
-            # Find the places that currently satisfy Table
-            place_list = []
-            for i in range(len(current)):
-                for j in range(len(goal)):
-                    if current[i][1] == goal[j][1]:
-                        # If the current and goal relations match, save the location
-                        place_list.append(self.search4block(self.state, current[i][1]))
-                        break
-            # Set the default place as 'L1'
-            place = 'L1'
-            # If place_list is empty, set Place to L1
-            if len(place_list) == 0:
-                place = 'L1'
-            # Otherwise, if place_list is on length 1...
-            elif len(place_list) == 1:
-                # If place_list[0] is L1, set Place to L2
-                if place_list[0] == 'L1':
-                    place = 'L2'
-                # Otherwise, set Place to 'L1'
-                else:
-                    place = 'L1'
-            # Otherwise, place_list is length 2
-            else:
-                # If place_list[0] or place_list[1] is L1
-                if place_list[0] == 'L1' or place_list[1] == 'L1':
-                    # If place_list[0] or place_list[1] is L2, set Place to L3
-                    if place_list[0] == 'L2' or place_list[1] == 'L2':
-                        place = 'L3'
-                    # Otherwise, set Place to 'L2'
-                    else:
-                        place = 'L2'
-                # Otherwise, set Place to L1
-                else:
-                    place = 'L1'
-            # Place is set
-            # If Dig is the same as Place, find Place Tmp
-            if dig == place:
-                # If dig is L1, set Place Tmp as L2 and Junk as L3
-                if dig == 'L1':
-                    place_tmp = 'L2'
-                    junk = 'L3'
-                # Otherwise, set Place Tmp as L1
-                else:
-                    place_tmp = 'L1'
-                    # If Dig is L2, set Junk as L3
-                    if dig == 'L2':
-                        junk = 'L3'
-                    # Otherwise, set Junk as L2
-                    else:
-                        junk = 'L2'
-            # Otherwise, find a place for Junk
-            else:
-                # If Dig is L1 or Place is L1...
-                if dig == 'L1' or place == 'L1':
-                    # If Dig is L2 or Place is L2, set Junk to L3
-                    if dig == 'L2' or place == 'L2':
-                        junk = 'L3'
-                    # Otherwise, set Junk to L2
-                    else:
-                        junk = 'L2'
-                # Otherwise, set Junk to L1
-                else:
-                    junk = 'L1'
-            # Order list as [Dig, Junk, Place Tmp, Place]
-            list = [dig, junk, place_tmp, place]
-        elif task[0] == 'o':
-            # Define the goal block
-            block_g = task[1]
-            # Find the block's location to set as Dig
-            dig = self.search4block(self.state, block_g)
-            # Find the block's location to set as Place
-            place = self.search4block(self.state, task[2])
-            # If Dig is the same as Place, find Place Tmp
-            if dig == place:
-                # If dig is L1, set Place Tmp as L2 and Junk as L3
-                if dig == 'L1':
-                    place_tmp = 'L2'
-                    junk = 'L3'
-                # Otherwise, set Place Tmp as L1
-                else:
-                    place_tmp = 'L1'
-                    # If Dig is L2, set Junk as L3
-                    if dig == 'L2':
-                        junk = 'L3'
-                    # Otherwise, set Junk as L2
-                    else:
-                        junk = 'L2'
-            # Otherwise, find a place for Junk
-            else:
-                # If Dig is L1 or Place is L1...
-                if dig == 'L1' or place == 'L1':
-                    # If Dig is L2 or Place is L2, set Junk to L3
-                    if dig == 'L2' or place == 'L2':
-                        junk = 'L3'
-                    # Otherwise, set Junk to L2
-                    else:
-                        junk = 'L2'
-                # Otherwise, set Junk to L1
-                else:
-                    junk = 'L1'
-            # Order list as [Dig, Junk, Place Tmp, Place]
-            list = [dig, junk, place_tmp, place]
-        else:
-            # Print an error that the task was not 't' or 'o' and print an empty list
-            print("Error: execution_setup will only accept types 't' or 'o'.\n")
-        # Return the ordered list
-        return list
-
-    ###################################
-    # make_action_block
-    # Creates an action block for a given task and stack roles.
-    #
-    # Action key:
-    # u: Pick up block
-    # d: Put down block
-    # m1: Move arm to L1
-    # m2: Move arm to L2
-    # m3: Move arm to L3
-    #
-    # Parameters:
-    # self: the Planner object
-    # task: the relation to solve for
-    # roles: the stack roles given by execution_setup
-    #
-    # Returns an ordered list denoting actions to be taken in a specific order
-    ###################################
-
-    def make_action_block (self, task, roles):
-        actions = []
-        # If the task is a Table relation...
-        if task[0] == 't':
-            # Track the depth within the stacks for help with indexing
-            depth = 0
-            depth_p = 0
-            # Track the arm's location throughout the action block
-            arm_l = self.state.arm.place.name
-            # Track if the goal block is at Place Tmp
-            tmp_g = False
-            # Track if Dig and Place are the same location
-            same = roles[0] == roles[3]
-            while True:
-                # If Place is L1 and not empty, empty the stack at Place
-                if roles[3] == 'L1' and len(self.state.l1.stack) - depth_p != 0:
-                    # If the arm is not in L1, move to L1
-                    if not(arm_l == 'L1'):
-                        actions.append('m1')
-                        arm_l = 'L1'
-                    # Pick up the top block from L1's stack
-                    actions.append('u')
-                    # If Dig and Place are the same AND goal block is NOT at
-                    # Place Tmp...
-                    if same and not(tmp_g):
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l1.stack[len(self.state.l1.stack) - depth_p - 1]:
-                            # If Place Tmp is L2, move to L2 and set tmp_g to True
-                            if roles[2] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                tmp_g = True
-                            # If Place Tmp is L3, move to L3 and set tmp_g to True
-                            elif roles[2] == 'L3':
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                tmp_g = True
-                            # Otherwise, print an error message
-                            else:
-                                print("Error: Place and Place Tmp were assigned to the same place.\n")
-                    # Otherwise, find Junk's location
-                    else:
-                        # If Junk is L2, move to L2
-                        if roles[1] == 'L2':
-                            actions.append('m2')
-                            arm_l = 'L2'
-                        # If Junk is L3, move to L3
-                        elif roles[1] == 'L3':
-                            actions.append('m3')
-                            arm_l = 'L3'
-                        # Otherwise, print an error message
-                        else:
-                            print("Error: Place and Junk were assigned to the same place.\n")
-                    # Put down the block
-                    actions.append('d')
-                    # Increment depth_p
-                    depth_p += 1
-                # If Place is L2 and not empty, empty the stack at Place
-                elif roles[3] == 'L2' and len(self.state.l2.stack) - depth_p != 0:
-                    # If the arm is not in L2, move to L2
-                    if not(arm_l == 'L2'):
-                        actions.append('m2')
-                        arm_l = 'L2'
-                    # Pick up the top block from L2's stack
-                    actions.append('u')
-                    # If Dig and Place are the same AND goal block is NOT at
-                    # Place Tmp...
-                    if same and not(tmp_g):
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l2.stack[len(self.state.l2.stack) - depth_p - 1]:
-                            # If Place Tmp is L2, move to L2 and set tmp_g to True
-                            if roles[2] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                tmp_g = True
-                            # If Place Tmp is L3, move to L3 and set tmp_g to True
-                            elif roles[2] == 'L3':
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                tmp_g = True
-                            # Otherwise, print an error message
-                            else:
-                                print("Error: Place and Place Tmp were assigned to the same place.\n")
-                    # Otherwise, find Junk's location
-                    else:
-                        # If Junk is L1, move to L1
-                        if roles[1] == 'L1':
-                            actions.append('m1')
-                            arm_l = 'L1'
-                        # If Junk is L3, move to L3
-                        elif roles[1] == 'L3':
-                            actions.append('m3')
-                            arm_l = 'L3'
-                        # Otherwise, print an error message
-                        else:
-                            print("Error: Place and Junk were assigned to the same place.\n")
-                    # Put down the block
-                    actions.append('d')
-                    # Increment depth_p
-                    depth_p += 1
-                # If Place is L3 and not empty, empty the stack at Place
-                elif roles[3] == 'L3' and len(self.state.l3.stack) - depth_p != 0:
-                    # If the arm is not in L3, move to L3
-                    if not(arm_l == 'L3'):
-                        actions.append('m3')
-                        arm_l = 'L3'
-                    # Pick up the top block from L3's stack
-                    actions.append('u')
-                    # If Dig and Place are the same AND goal block is NOT at
-                    # Place Tmp...
-                    if same and not(tmp_g):
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l3.stack[len(self.state.l3.stack) - depth_p - 1]:
-                            # If Place Tmp is L1, move to L1 and set tmp_g to True
-                            if roles[2] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                tmp_g = True
-                            # If Place Tmp is L2, move to L2 and set tmp_g to True
-                            elif roles[2] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                tmp_g = True
-                            # Otherwise, print an error message
-                            else:
-                                print("Error: Place and Place Tmp were assigned to the same place.\n")
-                    # Otherwise, find Junk's location
-                    else:
-                        # If Junk is L1, move to L1
-                        if roles[1] == 'L1':
-                            actions.append('m1')
-                            arm_l = 'L1'
-                        # If Junk is L2, move to L2
-                        elif roles[1] == 'L2':
-                            actions.append('m2')
-                            arm_l = 'L2'
-                        # Otherwise, print an error message
-                        else:
-                            print("Error: Place and Junk were assigned to the same place.\n")
-                    # Put down the block
-                    actions.append('d')
-                    # Increment depth_p
-                    depth_p += 1
-                # Otherwise, move on to Place Tmp or Dig operations
-                else:
-                    # If the goal block is at Place Tmp...
-                    if tmp_g:
-                        # If Place Tmp is at L1, move to L1 and pick up
-                        if roles[2] == 'L1':
-                            actions.append('m1')
-                            arm_l = 'L1'
-                            actions.append('u')
-                            # If Place is at L2, move to L2 and put down
-                            if roles[3] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L3, move to L3 and put down
-                            else:
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # If Place Tmp is at L2, move to L2 and pick up
-                        elif roles[2] == 'L2':
-                            actions.append('m2')
-                            arm_l = 'L2'
-                            actions.append('u')
-                            # If Place is at L1, move to L1 and put down
-                            if roles[3] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L3, move to L3 and put down
-                            else:
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # Otherwise, Place Tmp is at L3, move to L3 and pick up
-                        else:
-                            actions.append('m3')
-                            arm_l = 'L3'
-                            actions.append('u')
-                            # If Place is at L1, move to L1 and put down
-                            if roles[3] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L2, move to L2 and put down
-                            else:
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                    # If Dig is L1...
-                    elif roles[0] == 'L1':
-                        # If the arm is not at L1, move to L1
-                        if not(arm_l == 'L1'):
-                            actions.append('m1')
-                            arm_l = 'L1'
-                        # Pick up the block
-                        actions.append('u')
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l1.stack[len(self.state.l1.stack) - depth - 1]:
-                            # If Place is at L2, move to L2 and put down
-                            if roles[3] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L3, move to L3 and put down
-                            else:
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # Otherwise, find Junk's location
-                        else:
-                            # If Junk is at L2, move to L2
-                            if roles[1] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                            # If Junk is at L3, move to L3
-                            elif roles[1] == 'L3':
-                                actions.append('m3')
-                                arm_l = 'L3'
-                            # Otherwise, print an error message\
-                            else:
-                                print("Error: Dig and Junk were assigned to the same place.\n")
-                            # Put down the block
-                            actions.append('d')
-                    # If Dig is L2...
-                    elif roles[0] == 'L2':
-                        # If the arm is not at L2, move to L2
-                        if not(arm_l == 'L2'):
-                            actions.append('m2')
-                            arm_l = 'L2'
-                        # Pick up the block
-                        actions.append('u')
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l2.stack[len(self.state.l2.stack) - depth - 1]:
-                            # If Place is at L1, move to L1 and put down
-                            if roles[3] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L3, move to L3 and put down
-                            else:
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # Otherwise, find Junk's location
-                        else:
-                            # If Junk is at L1, move to L1
-                            if roles[1] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                            # If Junk is at L3, move to L3
-                            elif roles[1] == 'L3':
-                                actions.append('m3')
-                                arm_l = 'L3'
-                            # Otherwise, print an error message\
-                            else:
-                                print("Error: Dig and Junk were assigned to the same place.\n")
-                            # Put down the block
-                            actions.append('d')
-                    # If Dig is L3...
-                    elif roles[0] == 'L3':
-                        # If the arm is not at L3, move to L3
-                        if not(arm_l == 'L3'):
-                            actions.append('m3')
-                            arm_l = 'L3'
-                        # Pick up the block
-                        actions.append('u')
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l3.stack[len(self.state.l3.stack) - depth - 1]:
-                            # If Place is at L1, move to L1 and put down
-                            if roles[3] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L2, move to L2 and put down
-                            else:
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # Otherwise, find Junk's location
-                        else:
-                            # If Junk is at L1, move to L1
-                            if roles[1] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                            # If Junk is at L2, move to L2
-                            elif roles[1] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                            # Otherwise, print an error message\
-                            else:
-                                print("Error: Dig and Junk were assigned to the same place.\n")
-                            # Put down the block
-                            actions.append('d')
-                    # Otherwise, print an error
-                    else:
-                        print("Error: Dig was not allocated a location.\n")
-                    # Increment depth
-                    depth += 1
-            # END OF LOOP
-
-        # If the task is an On relation...
-        elif task[0] == 'o':
-            # Track the depth within the stacks for help with indexing
-            depth = 0
-            depth_p = 0
-            # Track the arm's location throughout the action block
-            arm_l = self.state.arm.place.name
-            # Track if the goal block is at Place Tmp
-            tmp_g = False
-            # Track if Dig and Place are the same location
-            same = roles[0] == roles[3]
-            # Track if the correct block is exposed at Place
-            exposed = False
-            # If Place is at L1, set exposed's value
-            if roles[3] == 'L1':
-                exposed = task[2] == self.state.l1.stack[len(self.state.l1.stack) - 1]
-            # If Place is at L2, set exposed's value
-            elif roles[3] == 'L2':
-                exposed = task[2] == self.state.l2.stack[len(self.state.l2.stack) - 1]
-            # If Place is at L2, set exposed's value
-            elif roles[3] == 'L3':
-                exposed = task[2] == self.state.l3.stack[len(self.state.l3.stack) - 1]
-            # Otherwise, print an error message
-            else:
-                print("Error: Place was not found in make_action_block.\n")
-            while True:
-                # If the goal block is NOT exposed...
-                if not(exposed):
-                    # If Place is at L1...
-                    if roles[3] == 'L1':
-                        # If the arm is not in L1, move to L1
-                        if not(arm_l == 'L1'):
-                            actions.append('m1')
-                            arm_l = 'L1'
-                        # Pick up the block
-                        actions.append('u')
-                        # If Dig and Place are the same AND goal block is NOT at
-                        # Place Tmp...
-                        if same and not(tmp_g):
-                            # If the top goal block is picked up, move to Place Tmp
-                            if task[1] == self.state.l1.stack[len(self.state.l1.stack) - depth_p - 1]:
-                                # If Place Tmp is L2, move to L2 and set tmp_g to True
-                                if roles[2] == 'L2':
-                                    actions.append('m2')
-                                    arm_l = 'L2'
-                                    tmp_g = True
-                                # If Place Tmp is L3, move to L3 and set tmp_g to True
-                                elif roles[2] == 'L3':
-                                    actions.append('m3')
-                                    arm_l = 'L3'
-                                    tmp_g = True
-                                # Otherwise, print an error message
-                                else:
-                                    print("Error: Place and Place Tmp were assigned to the same place.\n")
-                        # Otherwise, move to Junk
-                        else:
-                            # If Junk is L2, move to L2
-                            if roles[1] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                            # If Junk is L3, move to L3
-                            elif roles[1] == 'L3':
-                                actions.append('m3')
-                                arm_l = 'L3'
-                            # Otherwise, print an error message
-                            else:
-                                print("Error: Place and Junk were assigned to the same place.\n")
-                        # Put down the block
-                        actions.append('d')
-                        # Increment depth, then check if the goal block is exposed
-                        depth_p += 1
-                        if task[2] == self.state.l1.stack[len(self.state.l1.stack) - depth_p - 1]:
-                            exposed = True
-                    # If Place is at L2...
-                    elif roles[3] == 'L2':
-                        # If the arm is not in L2, move to L2
-                        if not(arm_l == 'L2'):
-                            actions.append('m2')
-                            arm_l = 'L2'
-                        # Pick up the block
-                        actions.append('u')
-                        # If Dig and Place are the same AND goal block is NOT at
-                        # Place Tmp...
-                        if same and  not(tmp_g):
-                            # If the top goal block is picked up, move to Place Tmp
-                            if task[1] == self.state.l2.stack[len(self.state.l2.stack) - depth_p - 1]:
-                                # If Place Tmp is L1, move to L1 and set tmp_g to True
-                                if roles[2] == 'L1':
-                                    actions.append('m1')
-                                    arm_l = 'L1'
-                                    tmp_g = True
-                                # If Place Tmp is L3, move to L3 and set tmp_g to True
-                                elif roles[2] == 'L3':
-                                    actions.append('m3')
-                                    arm_l = 'L3'
-                                    tmp_g = True
-                                # Otherwise, print an error message
-                                else:
-                                    print("Error: Place and Place Tmp were assigned to the same place.\n")
-                        # Otherwise, move to Junk
-                        else:
-                            # If Junk is L1, move to L1
-                            if roles[1] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                            # If Junk is L3, move to L3
-                            elif roles[1] == 'L3':
-                                actions.append('m3')
-                                arm_l = 'L3'
-                            # Otherwise, print an error message
-                            else:
-                                print("Error: Place and Junk were assigned to the same place.\n")
-                        # Put down the block
-                        actions.append('d')
-                        # Increment depth, then check if the goal block is exposed
-                        depth_p += 1
-                        if task[2] == self.state.l2.stack[len(self.state.l2.stack) - depth_p - 1]:
-                            exposed = True
-                    # Otherwise, Place is at L3...
-                    else:
-                        # If the arm is not in L3, move to L3
-                        if not(arm_l == 'L3'):
-                            actions.append('m3')
-                            arm_l = 'L3'
-                        # Pick up the block
-                        actions.append('u')
-                        # If Dig and Place are the same AND goal block is NOT at
-                        # Place Tmp...
-                        if same and not(tmp_g):
-                            # If the top goal block is picked up, move to Place Tmp
-                            if task[1] == self.state.l3.stack[len(self.state.l3.stack) - depth_p - 1]:
-                                # If Place Tmp is L1, move to L1 and set tmp_g to True
-                                if roles[2] == 'L1':
-                                    actions.append('m1')
-                                    arm_l = 'L1'
-                                    tmp_g = True
-                                # If Place Tmp is L2, move to L2 and set tmp_g to True
-                                elif roles[2] == 'L2':
-                                    actions.append('m2')
-                                    arm_l = 'L2'
-                                    tmp_g = True
-                                # Otherwise, print an error message
-                                else:
-                                    print("Error: Place and Place Tmp were assigned to the same place.\n")
-                        # Otherwise, move to Junk
-                        else:
-                            # If Junk is L1, move to L1
-                            if roles[1] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                            # If Junk is L2, move to L2
-                            elif roles[1] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                            # Otherwise, print an error message
-                            else:
-                                print("Error: Place and Junk were assigned to the same place.\n")
-                        # Put down the block
-                        actions.append('d')
-                        # Increment depth, then check if the goal block is exposed
-                        depth_p += 1
-                        if task[2] == self.state.l3.stack[len(self.state.l3.stack) - depth_p - 1]:
-                            exposed = True
-                # Otherwise, move on to Place Tmp or Dig operations
-                else:
-                    # If the top goal block is in Place Tmp...
-                    if tmp_g:
-                        # If Place Tmp is at L1, move to L1 and pick up
-                        if roles[2] == 'L1':
-                            actions.append('m1')
-                            arm_l = 'L1'
-                            actions.append('u')
-                            # If Place is at L2, move to L2 and put down
-                            if roles[3] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L3, move to L3 and put down
-                            else:
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # If Place Tmp is at L2, move to L2 and pick up
-                        elif roles[2] == 'L2':
-                            actions.append('m2')
-                            arm_l = 'L2'
-                            actions.append('u')
-                            # If Place is at L1, move to L1 and put down
-                            if roles[3] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L3, move to L3 and put down
-                            else:
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # Otherwise, Place Tmp is at L3, move to L3 and pick up
-                        else:
-                            actions.append('m3')
-                            arm_l = 'L3'
-                            actions.append('u')
-                            # If Place is at L1, move to L1 and put down
-                            if roles[3] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L2, move to L2 and put down
-                            else:
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                    # If Dig is L1...
-                    elif roles[0] == 'L1':
-                        # If the arm is not at L1, move to L1
-                        if not(arm_l == 'L1'):
-                            actions.append('m1')
-                            arm_l = 'L1'
-                        # Pick up the block
-                        actions.append('u')
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l1.stack[len(self.state.l1.stack) - depth - 1]:
-                            # If Place is at L2, move to L2 and put down
-                            if roles[3] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L3, move to L3 and put down
-                            else:
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # Otherwise, find Junk's location
-                        else:
-                            # If Junk is at L2, move to L2
-                            if roles[1] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                            # If Junk is at L3, move to L3
-                            elif roles[1] == 'L3':
-                                actions.append('m3')
-                                arm_l = 'L3'
-                            # Otherwise, print an error message
-                            else:
-                                print("Error: Dig and Junk were assigned to the same place.\n")
-                            # Put down the block
-                            actions.append('d')
-                    # If Dig is L2...
-                    elif roles[0] == 'L2':
-                        # If the arm is not at L2, move to L2
-                        if not(arm_l == 'L2'):
-                            actions.append('m2')
-                            arm_l = 'L2'
-                        # Pick up the block
-                        actions.append('u')
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l2.stack[len(self.state.l2.stack) - depth - 1]:
-                            # If Place is at L1, move to L1 and put down
-                            if roles[3] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L3, move to L3 and put down
-                            else:
-                                actions.append('m3')
-                                arm_l = 'L3'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # Otherwise, find Junk's location
-                        else:
-                            # If Junk is at L1, move to L1
-                            if roles[1] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                            # If Junk is at L3, move to L3
-                            elif roles[1] == 'L3':
-                                actions.append('m3')
-                                arm_l = 'L3'
-                            # Otherwise, print an error message\
-                            else:
-                                print("Error: Dig and Junk were assigned to the same place.\n")
-                            # Put down the block
-                            actions.append('d')
-                    # If Dig is L3...
-                    elif roles[0] == 'L3':
-                        # If the arm is not at L3, move to L3
-                        if not(arm_l == 'L3'):
-                            actions.append('m3')
-                            arm_l = 'L3'
-                        # Pick up the block
-                        actions.append('u')
-                        # If the indexed block matches the goal block...
-                        if task[1] == self.state.l3.stack[len(self.state.l3.stack) - depth - 1]:
-                            # If Place is at L1, move to L1 and put down
-                            if roles[3] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                            # Otherwise, Place is at L2, move to L2 and put down
-                            else:
-                                actions.append('m2')
-                                arm_l = 'L2'
-                                actions.append('d')
-                                # END OF TASK - break loop
-                                break
-                        # Otherwise, find Junk's location
-                        else:
-                            # If Junk is at L1, move to L1
-                            if roles[1] == 'L1':
-                                actions.append('m1')
-                                arm_l = 'L1'
-                            # If Junk is at L2, move to L2
-                            elif roles[1] == 'L2':
-                                actions.append('m2')
-                                arm_l = 'L2'
-                            # Otherwise, print an error message
-                            else:
-                                print("Error: Dig and Junk were assigned to the same place.\n")
-                            # Put down the block
-                            actions.append('d')
-                    # Otherwise, print an error
-                    else:
-                        print("Error: Dig was not allocated a location.\n")
-                    # Increment depth
-                    depth += 1
-            # END OF LOOP
-        # Otherwise, print an error message
-        else:
-            print("Error: make_action_block only accepts relation tasks of type 't' or 'o'.\n")
-        # Return the ordered list of tasks
-        return actions
-
-    ###################################
-    # execute_with_output
-    # Excecutes the given action block, updates the state and it's relations,
-    # and prints a formatted text output.
-    #
-    # Parameters:
-    # self: the Planner object
-    # actions: the ordered list of actions given by make_action_block
-    ###################################
-
-    def execute_with_output (self, actions):
-        for i in range(len(actions)):
-            # If the action is to pick up
-            if actions[i] == 'u':
-                # If the arm is at L1 and L1 is of length 1 or less...
-                if self.state.arm.place.name == 'L1' and len(self.state.l1.stack) <= 1:
-                    # If the arm is at L1 and L1 is of length 1, define action as pick up
-                    if len(self.state.l1.stack) == 1:
-                        # Save the block being picked up
-                        block_u = self.state.l1.stack[len(self.state.l1.stack) - 1]
-                        # Print that the arm has preformed "Pick up" on a block
-                        print("Action: Pick up " + block_u + " from L1.\n")
-                        # Update L1 and Arm
-                        self.state.l1 = self.state.arm.pick_up()
-                        # Update relations
-                        len_c = len(self.relations_c)
-                        for i in range(len_c):
-                            # Remove relations with block_u
-                            if self.relations_c[len_c - i - 1][1] == block_u:
-                                self.relations_c.remove(self.relations_c[len_c - i - 1])
-                        # Create an Above empty relation
-                        self.relations_c.append(['a', block_u, '0'])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-                    # Otherwise, print an error
-                    else:
-                        print("Error: Tried action \"Pick Up\" when the stack was empty.\n")
-                # If the arm is at L2 and L2 is of length 1 or less...
-                elif self.state.arm.place.name == 'L2' and len(self.state.l2.stack) <= 1:
-                    # If the arm is at L2 and L2 is of length 1, define action as pick up
-                    if len(self.state.l2.stack) == 1:
-                        # Save the block being picked up
-                        block_u = self.state.l2.stack[len(self.state.l2.stack) - 1]
-                        # Print that the arm has preformed "Pick up" on a block
-                        print("Action: Pick up " + block_u + " from L2.\n\n")
-                        # Update L1 and Arm
-                        self.state.l2 = self.state.arm.pick_up()
-                        # Update relations
-                        len_c = len(self.relations_c)
-                        for i in range(len_c):
-                            # Remove relations with block_u
-                            if self.relations_c[len_c - i - 1][1] == block_u:
-                                self.relations_c.remove(self.relations_c[len_c - i - 1])
-                        # Create an Above empty relation
-                        self.relations_c.append(['a', block_u, '0'])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-                    # Otherwise, print an error
-                    else:
-                        print("Error: Tried action \"Pick Up\" when the stack was empty.\n")
-                # If the arm is at L3 and L3 is of length 1 or less...
-                elif self.state.arm.place.name == 'L3' and len(self.state.l3.stack) <= 1:
-                    # If the arm is at L3 and L3 is of length 1, define action as pick up
-                    if len(self.state.l3.stack) == 1:
-                        # Save the block being picked up
-                        block_u = self.state.l3.stack[len(self.state.l3.stack) - 1]
-                        # Print that the arm has preformed "Pick up" on a block
-                        print("Action: Pick up " + block_u + " from L3.\n")
-                        # Update L1 and Arm
-                        self.state.l3 = self.state.arm.pick_up()
-                        # Update relations
-                        len_c = len(self.relations_c)
-                        for i in range(len_c):
-                            # Remove relations with block_u
-                            if self.relations_c[len_c - i - 1][1] == block_u:
-                                self.relations_c.remove(self.relations_c[len_c - i - 1])
-                        # Create an Above empty relation
-                        self.relations_c.append(['a', block_u, '0'])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-                    # Otherwise, print an error
-                    else:
-                        print("Error: Tried action \"Pick Up\" when the stack was empty.\n")
-                # Unstack
-                else:
-                    # If arm is at L1...
-                    if self.state.arm.place.name == 'L1':
-                        # Save the block being picked up
-                        block_u = self.state.l1.stack[len(self.state.l1.stack) - 1]
-                        # Save the block below the block being picked up
-                        block_d = self.state.l1.stack[len(self.state.l1.stack) - 2]
-                        # Print that the arm has preformed "Unstack" on a block
-                        print("Action: Unstack " + block_u + " from L1.\n")
-                        # Update L1 and Arm
-                        self.state.l1 = self.state.arm.pick_up()
-                        # Update relations
-                        len_c = len(self.relations_c)
-                        for i in range(len_c):
-                            # Remove relations with block_u
-                            if self.relations_c[len_c - i - 1][1] == block_u:
-                                self.relations_c.remove(self.relations_c[len_c - i - 1])
-                        # Create an Above empty relation
-                        self.relations_c.append(['a', block_u, block_d])
-                        # Create a Clear relation
-                        self.relations_c.append(['c', block_d])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-                    # If arm is at L2...
-                    elif self.state.arm.place.name == 'L2':
-                        # Save the block being picked up
-                        block_u = self.state.l2.stack[len(self.state.l2.stack) - 1]
-                        # Save the block below the block being picked up
-                        block_d = self.state.l2.stack[len(self.state.l2.stack) - 2]
-                        # Print that the arm has preformed "Unstack" on a block
-                        print("Action: Unstack " + block_u + " from L2.\n")
-                        # Update L1 and Arm
-                        self.state.l2 = self.state.arm.pick_up()
-                        # Update relations
-                        len_c = len(self.relations_c)
-                        for i in range(len_c):
-                            # Remove relations with block_u
-                            if self.relations_c[len_c - i - 1][1] == block_u:
-                                self.relations_c.remove(self.relations_c[len_c - i - 1])
-                        # Create an Above empty relation
-                        self.relations_c.append(['a', block_u, block_d])
-                        # Create a Clear relation
-                        self.relations_c.append(['c', block_d])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-                    # Arm is at L3...
-                    else:
-                        # Save the block being picked up
-                        block_u = self.state.l3.stack[len(self.state.l3.stack) - 1]
-                        # Save the block below the block being picked up
-                        block_d = self.state.l3.stack[len(self.state.l3.stack) - 2]
-                        # Print that the arm has preformed "Unstack" on a block
-                        print("Action: Unstack " + block_u + " from L3.\n")
-                        # Update L1 and Arm
-                        self.state.l3 = self.state.arm.pick_up()
-                        # Update relations
-                        len_c = len(self.relations_c)
-                        for i in range(len_c):
-                            # Remove relations with block_u
-                            if self.relations_c[len_c - i - 1][1] == block_u:
-                                self.relations_c.remove(self.relations_c[len_c - i - 1])
-                        # Create an Above empty relation
-                        self.relations_c.append(['a', block_u, block_d])
-                        # Create a Clear relation
-                        self.relations_c.append(['c', block_d])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-            # If the action is to put down...
-            elif actions[i] == 'd':
-                # If the arm is at L1 and L1 is empty, define action as "Put Down"
-                if self.state.arm.place.name == 'L1' and len(self.state.l1.stack) == 0:
-                    # Save the block being put down
-                    block_a = self.state.arm.item
-                    # Print that the arm has preformed "Put Down" on a block
-                    print("Action: Put down " + block_a + " on L1.\n")
-                    # Update L1 and Arm
-                    self.state.l1 = self.state.arm.put_down()
-                    # Update relations
-                    self.relations_c.remove(['a', block_a, '0'])
-                    # Create a Table relation
-                    self.relations_c.append(['t', block_a])
-                    # Create a Clear relation
-                    self.relations_c.append(['c', block_a])
-                    # Increment state number and print state
-                    self.state.num += 1
-                    self.state.print_state()
-                # If the arm is at L2 and L2 is empty, define action as "Put Down"
-                elif self.state.arm.place.name == 'L2' and len(self.state.l2.stack) == 0:
-                    # Save the block being put down
-                    block_a = self.state.arm.item
-                    # Print that the arm has preformed "Put Down" on a block
-                    print("Action: Put down " + block_a + " on L2.\n")
-                    # Update L2 and Arm
-                    self.state.l2 = self.state.arm.put_down()
-                    # Update relations
-                    self.relations_c.remove(['a', block_a, '0'])
-                    # Create a Table relation
-                    self.relations_c.append(['t', block_a])
-                    # Create a Clear relation
-                    self.relations_c.append(['c', block_a])
-                    # Increment state number and print state
-                    self.state.num += 1
-                    self.state.print_state()
-                # If the arm is at L3 and L3 is empty, define action as "Put Down"
-                elif self.state.arm.place.name == 'L3' and len(self.state.l3.stack) == 0:
-                    # Save the block being put down
-                    block_a = self.state.arm.item
-                    # Print that the arm has preformed "Put Down" on a block
-                    print("Action: Put down " + block_a + " on L3.\n")
-                    # Update L3 and Arm
-                    self.state.l3 = self.state.arm.put_down()
-                    # Update relations
-                    self.relations_c.remove(['a', block_a, '0'])
-                    # Create a Table relation
-                    self.relations_c.append(['t', block_a])
-                    # Create a Clear relation
-                    self.relations_c.append(['c', block_a])
-                    # Increment state number and print state
-                    self.state.num += 1
-                    self.state.print_state()
-                # Otherwise, define action as "Stack"
-                else:
-                    # If the arm is at L1...
-                    if self.state.arm.place.name == 'L1':
-                        # Save the block being put down
-                        block_a = self.state.arm.item
-                        # Save the block that's currently at the top of the stack
-                        block_b = self.state.l1.stack[len(self.state.l1.stack) - 1]
-                        # Print that the arm has preformed "Stack"
-                        print("Action: Stack " + block_a + " on " + block_b +
-                        " at L1.\n")
-                        # Update L1 and Arm
-                        self.state.l1 = self.state.arm.put_down()
-                        # Update relations
-                        self.relations_c.remove(['a', block_a, block_b])
-                        self.relations_c.remove(['c', block_b])
-                        # Create a On relations
-                        self.relations_c.append(['o', block_a, block_b])
-                        # Create a Clear relation
-                        self.relations_c.append(['c', block_a])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-                    # If the arm is at L2...
-                    elif self.state.arm.place.name == 'L2':
-                        # Save the block being put down
-                        block_a = self.state.arm.item
-                        # Save the block that's currently at the top of the stack
-                        block_b = self.state.l2.stack[len(self.state.l2.stack) - 1]
-                        # Print that the arm has preformed "Stack"
-                        print("Action: Stack " + block_a + " on " + block_b +
-                        " at L2.\n")
-                        # Update L1 and Arm
-                        self.state.l2 = self.state.arm.put_down()
-                        # Update relations
-                        self.relations_c.remove(['a', block_a, block_b])
-                        self.relations_c.remove(['c', block_b])
-                        # Create a On relations
-                        self.relations_c.append(['o', block_a, block_b])
-                        # Create a Clear relation
-                        self.relations_c.append(['c', block_a])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-                    # Otherwise, the arm is at L3...
-                    else:
-                        # Save the block being put down
-                        block_a = self.state.arm.item
-                        # Save the block that's currently at the top of the stack
-                        block_b = self.state.l3.stack[len(self.state.l3.stack) - 1]
-                        # Print that the arm has preformed "Stack"
-                        print("Action: Stack " + block_a + " on " + block_b +
-                        " at L3.\n")
-                        # Update L1 and Arm
-                        self.state.l3 = self.state.arm.put_down()
-                        # Update relations
-                        self.relations_c.remove(['a', block_a, block_b])
-                        self.relations_c.remove(['c', block_b])
-                        # Create a On relations
-                        self.relations_c.append(['o', block_a, block_b])
-                        # Create a Clear relation
-                        self.relations_c.append(['c', block_a])
-                        # Increment state number and print state
-                        self.state.num += 1
-                        self.state.print_state()
-            # If the action is Move to L1
-            elif actions[i] == 'm1':
-                # Save the block being held
-                block_a = self.state.arm.item
-                # If L1 is empty, set block_b as '0'
-                block_b = '0'
-                # Otherwise, save the block that's at the top of L1
-                if not(len(self.state.l1.stack) == 0):
-                    block_b = self.state.l1.stack[len(self.state.l1.stack) - 1]
-                # Save the arm's initial location
-                initial = self.state.arm.place.name
-                # Print that the arm has preformed "Move"
-                print("Action: Move arm from " + initial + " to L1.\n")
-                # Move arm to L1
-                self.state.arm.move(self.state.l1)
-                # Update relations
-                len_c = len(self.relations_c)
-                for i in range(len_c):
-                    # Remove relations with block_a
-                    if self.relations_c[len_c - i - 1][1] == block_a:
-                        self.relations_c.remove(self.relations_c[len_c - i - 1])
-                # Create an Above relation
-                self.relations_c.append(['a', block_a, block_b])
-                # Increment state number and print state
-                self.state.num += 1
-                self.state.print_state()
-            # If the action is Move to L2
-            elif actions[i] == 'm2':
-                # Save the block being held
-                block_a = self.state.arm.item
-                # If L2 is empty, set block_b as '0'
-                block_b = '0'
-                # Otherwise, save the block that's at the top of L2
-                if not(len(self.state.l2.stack) == 0):
-                    block_b = self.state.l2.stack[len(self.state.l2.stack) - 1]
-                # Save the arm's initial location
-                initial = self.state.arm.place.name
-                # Print that the arm has preformed "Move"
-                print("Action: Move arm from " + initial + " to L2.\n")
-                # Move arm to L2
-                self.state.arm.move(self.state.l2)
-                # Update relations
-                len_c = len(self.relations_c)
-                for i in range(len_c):
-                    # Remove relations with block_a
-                    if self.relations_c[len_c - i - 1][1] == block_a:
-                        self.relations_c.remove(self.relations_c[len_c - i - 1])
-                # Create an Above relation
-                self.relations_c.append(['a', block_a, block_b])
-                # Increment state number and print state
-                self.state.num += 1
-                self.state.print_state()
-            # If the action is Move to L3
-            elif actions[i] == 'm3':
-                # Save the block being held
-                block_a = self.state.arm.item
-                # If L3 is empty, set block_b as '0'
-                block_b = '0'
-                # Otherwise, save the block that's at the top of L3
-                if not(len(self.state.l3.stack) == 0):
-                    block_b = self.state.l3.stack[len(self.state.l3.stack) - 1]
-                # Save the arm's initial location
-                initial = self.state.arm.place.name
-                # Print that the arm has preformed "Move"
-                print("Action: Move arm from " + initial + " to L3.\n")
-                # Move arm to L3
-                self.state.arm.move(self.state.l3)
-                # Update relations
-                len_c = len(self.relations_c)
-                for i in range(len_c):
-                    # Remove relations with block_a
-                    if self.relations_c[len_c - i - 1][1] == block_a:
-                        self.relations_c.remove(self.relations_c[len_c - i - 1])
-                # Create an Above relation
-                self.relations_c.append(['a', block_a, block_b])
-                # Increment state number and print state
-                self.state.num += 1
-                self.state.print_state()
-            # Otherwise, print an error message
-            else:
-                print("Error: execute_with_output received faulty action.\n")
-        # END OF LOOP
-
-    ###################################
-    # check_satisfaction
-    # The last function to be preformed. Checks satisfied list to see if all
-    # relations are satisfied.
-    #
-    # Parameter:
-    # self: the Planner object
-    #
-    # Return True if all relations are true
-    # Otherwise, return False
-    ###################################
-
-    def check_satisfaction (self):
-        check = True
-        # For each relation in relation_g...
-        for i in range(len(self.satisfied)):
-            # If the relation is False, set check to False and break
-            if not(self.satisfied[i]):
-                check = False
-                break
-        return check
-
-# END OF Planner CLASS
-
-#######################################
-# Main driver
-# Takes user input for the initial and goal states and initializes the Planner.
-#
-# Then for the Table relation, run the compare_relations function, put the
-# relations to solve for into the execution_setup function, put the location
-# roles returned from execution_setup into the make_action_block function,
-# and put the actions from make_action_block into execute_with_output.
-# Rerun compare_relations for Table and repeat sequence if necessary.
-#
-# Next for the On relation, complete the same sequence of compare_relations,
-# execution_setup, make_action_block, and execute_with_output.
-# Rerun compare_relations for On and repeat sequence if necessary.
-#
-# Finally, run compare_relations for the Clear relation and run check_satisfaction.
-#######################################
-
-print("\nWelcome to WORLD OF BLOCKS")
-print("Instructions: Input the stack in bottom to top order with the format \"x,y,z\".")
-print("\nInitial state:")
-print("Enter the stack at L1: ", end="")
-l1i = input()
-print("Enter the stack at L2: ", end="")
-l2i = input()
-print("Enter the stack at L3: ", end="")
-l3i = input()
-print("\nGoal state:")
-print("Enter the stack at L1: ", end="")
-l1g = input()
-print("Enter the stack at L2: ", end="")
-l2g = input()
-print("Enter the stack at L3: ", end="")
-l3g = input()
-print("")
-# Reformat inputs to lists
-l1_i = l1i.split(',')
-l2_i = l2i.split(',')
-l3_i = l3i.split(',')
-l1_g = l1g.split(',')
-l2_g = l2g.split(',')
-l3_g = l3g.split(',')
-# Remove '' from empty stacks
-if len(l1_i) != 0:
-    if l1_i[0] == '':
-        l1_i = []
-if len(l2_i) != 0:
-    if l2_i[0] == '':
-        l2_i = []
-if len(l3_i) != 0:
-    if l3_i[0] == '':
-        l3_i = []
-if len(l1_g) != 0:
-    if l1_g[0] == '':
-        l1_g = []
-if len(l2_g) != 0:
-    if l2_g[0] == '':
-        l2_g = []
-if len(l3_g) != 0:
-    if l3_g[0] == '':
-        l3_g = []
-# Initialize the Planner object
-planner = Planner(l1_i, l2_i, l3_i, l1_g, l2_g, l3_g)
-# Print the initial state
-planner.state.print_state()
-# Run compare_relations for the Table relations and save the ordered relation list
-relations = planner.compare_relations('t')
-# Set up a list for all actions
-actions = []
-# For each goal relation...
-for i in range(len(relations)):
-    # Run execution_setup with the given relations and save the outputted roles
-    roles = planner.execution_setup(relations[i])
-    # Run make_action_block for the given task
-    actions = planner.make_action_block(relations[i], roles)
-    # Execute actions with output
-    planner.execute_with_output(actions)
-# While the Table relations have yet to all be solved for
-while True:
-    # Recompare the relations
-    relations = planner.compare_relations('t')
-    # If the relation list is empty, exit the loop
-    if len(relations) == 0:
-        break
-    # Otherwise, repeat the sequence
-    else:
-        # Set up a list for all actions
-        actions = []
-        # For each goal relation...
-        for i in range(len(relations)):
-            # Run execution_setup with the given relations and save the outputted roles
-            roles = planner.execution_setup(relations[i])
-            # Run make_action_block for the given task
-            actions = planner.make_action_block(relations[i], roles)
-            # Execute actions with output
-            planner.execute_with_output(actions)
-# END OF LOOP
-# While the On relations have yet to all be solved for
-while True:
-    # Compare the On relations
-    relations = planner.compare_relations('o')
-    # If the relation list is empty, exit the loop
-    if len(relations) == 0:
-        break
-    # Otherwise, repeat the sequence
-    else:
-        # Set up a list for all actions
-        actions = []
-        # For each goal relation...
-        for i in range(len(relations)):
-            # Run execution_setup with the given relations and save the outputted roles
-            roles = planner.execution_setup(relations[i])
-            # Run make_action_block for the given task
-            actions = planner.make_action_block(relations[i], roles)
-            # Execute actions with output
-            planner.execute_with_output(actions)
-# END OF LOOP
-# Compare Clear relations
-relations = planner.compare_relations('c')
-# Check the satisfaction and output the final results
-if planner.check_satisfaction():
-    print("Goal state achieved successfully.\n")
-# If check_satisfaction comes back false, process was unsuccessful
-else:
-    print("Operation unsuccessful.\n")
-stop = input()
-# END OF FILE
+# Foundations of AI - Final Project
+# Author: Nicholas Ianni
+
+import argparse
+import asyncio
+import cProfile
+import collections
+import concurrent.futures
+import contextlib
+import heapq
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import sys
+import time
+import tracemalloc
+
+# The on-disk plan cache is optional, since some Python builds leave out sqlite3
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+# Marks an empty arm and the absence of a block (None can never be the name
+# or id of a block)
+EMPTY = None
+
+###################################
+# Location class
+#
+# Class variables:
+# stack: the ordered stack at the associated location
+# name: the name of the location
+# index: the block index of the State that owns the location (None if the
+# location is not part of a State)
+###################################
+
+class Location:
+
+    ###############################
+    # Constructor
+    # Initializes the location with the associated name of the location
+    # and the ordered stack at the location
+    #
+    # Parameters:
+    # self: the Location object
+    # stack: the ordered stack at the associated location
+    # name: the name of the location
+    ###############################
+
+    def __init__(self, stack, name):
+        self.stack = stack
+        self.name = name
+        # The index is attached by the State that owns the location
+        self.index = None
+
+    ###############################
+    # take_top
+    # Takes a block from the top of the stack at this location
+    #
+    # Parameter:
+    # self: the Location object
+    #
+    # Returns the top object of the stack.
+    # Returns EMPTY and prints an error upon trying to take from an empty stack.
+    ###############################
+
+    def take_top(self):
+        # If the stack is not empty, return and remove the top item from the stack
+        if not(len(self.stack) == 0):
+            item = self.stack.pop()
+            # Remove the item from the block index
+            if not(self.index is None):
+                del self.index[item]
+            return item
+        # Otherwise, print an error message
+        else:
+            print("Error: Tried to take from an empty stack at location " + self.name + ".\n")
+            return EMPTY
+
+    ###############################
+    # put_top
+    # Puts a specified item on top of the stack at the associated location.
+    #
+    # Parameters:
+    # self: the Location object
+    # item: the item from the Arm to put on the top of the stack
+    ###############################
+
+    def put_top(self, item):
+        self.stack.append(item)
+        # Record the item's location and height in the block index
+        if not(self.index is None):
+            self.index[item] = (self.name, len(self.stack) - 1)
+
+###################################
+# Arm class
+#
+# Class variables:
+# place: the arm's current location
+# item: the current item the arm is holding (EMPTY means that the arm is empty)
+###################################
+
+class Arm:
+
+    ###############################
+    # Constructor
+    # Initializes the Arm object
+    #
+    # Parameters:
+    # self: the Arm object
+    # place: the arm's current location
+    # item: the current item the arm is holding (EMPTY means that the arm is empty)
+    ###############################
+
+    def __init__(self, place, item):
+        self.place = place
+        self.item = item
+
+    ###############################
+    # move
+    # Moves the arm from the arm's inital location to a new location
+    #
+    # Parameters:
+    # self: the Arm object
+    # place: the place the arm will move to
+    ###############################
+
+    def move(self, place):
+        self.place = place
+
+    ###############################
+    # pick_up
+    # Picks up the block at the arm's current location and returns the updated
+    # Location object
+    #
+    # Parameter:
+    # self: the Arm object
+    #
+    # Returns the updated Location object (the Location keeps the block index
+    # up to date)
+    # Prints an error if the arm is currently holding an item
+    ###############################
+
+    def pick_up(self):
+        # If the Arm is empty (marked by item being EMPTY), take the object
+        if self.item is EMPTY:
+            self.item = self.place.take_top()
+        # Otherwise, print an error message
+        else:
+            print("Error: Tried to pick up at location " + self.place.name + ".\n")
+        # Return the updated Location object
+        return self.place
+
+    ###############################
+    # put_down
+    # Puts the item the arm is holding down onto the location and returns the
+    # updated Location object
+    #
+    # Parameter:
+    # self: the Arm object
+    #
+    # Returns the updated Location object (the Location keeps the block index
+    # up to date)
+    # Prints an error is the arm is not currently holding an item
+    ###############################
+
+    def put_down(self):
+        # If the arm is not empty (not EMPTY), place the item on top of the stack
+        if not(self.item is EMPTY):
+            self.place.put_top(self.item)
+            self.item = EMPTY
+        # Otherwise, print an error message
+        else:
+            print("Error: Tried to put down without an item in the arm.\n")
+        # Return the updated Location object
+        return self.place
+
+###################################
+# State class
+#
+# Class variables:
+# locations: the Location objects of the given state in order (L1, L2, ...)
+# arm: the Arm object at the given state
+# num: the state number
+# places: the Location objects of the state keyed by location name
+# numbers: the position of each location in locations keyed by location name
+# index: maps each block on a stack to its (location name, height), where
+# height 0 is the block touching the table
+# names: the name of each block id (None if the blocks are their own names)
+###################################
+
+class State:
+
+    ###############################
+    # Constructor
+    # Initializes the State object
+    #
+    # Parameters:
+    # self: the State object
+    # locations: the list of Location objects at the given state (L1, L2, ...)
+    # num: the state number
+    # names: the name of each block id, if the stacks hold block ids (None if
+    # the blocks are their own names)
+    ###############################
+
+    def __init__(self, locations, num, names=None):
+        self.locations = locations
+        # Starts the arm at L1
+        self.arm = Arm(self.locations[0], EMPTY)
+        self.num = num
+        self.names = names
+        # Build the block index and attach it to each location so that it is
+        # kept up to date as blocks are taken from and put on the stacks
+        self.places = {}
+        self.numbers = {}
+        self.index = {}
+        for k in range(len(self.locations)):
+            location = self.locations[k]
+            self.places[location.name] = location
+            self.numbers[location.name] = k
+            location.index = self.index
+            for h in range(len(location.stack)):
+                self.index[location.stack[h]] = (location.name, h)
+
+    ###############################
+    # find
+    # Finds the location of a block using the block index
+    #
+    # Parameters:
+    # self: the State object
+    # block: the block to find
+    #
+    # Returns the name of the location holding the block
+    # Returns '' if the block is not on any stack (held by the arm or unknown)
+    ###############################
+
+    def find(self, block):
+        entry = self.index.get(block)
+        if entry is None:
+            return ''
+        return entry[0]
+
+    ###############################
+    # below
+    # Finds the block directly under a block using the block index
+    #
+    # Parameters:
+    # self: the State object
+    # block: the block to look under
+    #
+    # Returns the block under the given block
+    # Returns EMPTY if the block is touching the table or is not on any stack
+    ###############################
+
+    def below(self, block):
+        entry = self.index.get(block)
+        if entry is None or entry[1] == 0:
+            return EMPTY
+        return self.places[entry[0]].stack[entry[1] - 1]
+
+    ###############################
+    # above_count
+    # Counts the blocks stacked above a block using the block index
+    #
+    # Parameters:
+    # self: the State object
+    # block: the block to count above
+    #
+    # Returns the number of blocks above the given block
+    # Returns -1 if the block is not on any stack
+    ###############################
+
+    def above_count(self, block):
+        entry = self.index.get(block)
+        if entry is None:
+            return -1
+        return len(self.places[entry[0]].stack) - entry[1] - 1
+
+    ###############################
+    # get_relations
+    # Returns a list of relations for the given state
+    #
+    # Parameter:
+    # self: the State object
+    #
+    # Returns a list of relations for the given state
+    ###############################
+
+    def get_relations(self):
+        # Create a blank list for relations to be appended to
+        relations = []
+
+        # Table relation
+        # For each location, if the location is not empty, create a relation for
+        # the block that is touching the table with the following form:
+        # ['t' (Table), (block touching table)]
+        for location in self.locations:
+            if not(len(location.stack) == 0):
+                relations.append(['t', location.stack[0]])
+
+        # On relation
+        # For each location, create a relation for each pair of blocks directly
+        # on top of each other with the following form:
+        # ['o' (On), (block above), (block below)]
+        for location in self.locations:
+            for i in range(len(location.stack)):
+                if not(i+1 == len(location.stack)):
+                    relations.append(['o', location.stack[i+1], location.stack[i]])
+
+        # Clear relation
+        # For each location, if the stack is not empty, create a relation where
+        # a block does not have a block on top of it with the following form:
+        # ['c' (Clear), (block on top of stack)]
+        for location in self.locations:
+            if not(len(location.stack) == 0):
+                relations.append(['c', location.stack[len(location.stack) - 1]])
+
+        # Above relation
+        # Only check for "Above" if the arm is not empty (marked by item being EMPTY)
+        if not(self.arm.item is EMPTY):
+            # Create a relation where the arm is holding an item above a block
+            # or stack at the arm's location with the following form:
+            # ['a' (Above), (block held by arm), (block on top of stack)]
+            stack = self.arm.place.stack
+            relations.append(['a', self.arm.item, stack[len(stack) - 1]])
+
+        # Return the list of relations
+        return relations
+
+    ###############################
+    # name
+    # Returns the name of a block for output (EMPTY for EMPTY)
+    #
+    # Parameters:
+    # self: the State object
+    # block: the block (or block id)
+    ###############################
+
+    def name(self, block):
+        if block is EMPTY:
+            return EMPTY
+        if self.names is None:
+            return str(block)
+        return str(self.names[block])
+
+    ###################################
+    # format_state
+    # Builds the text interpretation of the given state as a single string.
+    # Each location gets a column wide enough for its name and for the
+    # longest block name, so that any number of locations and any block
+    # names can be drawn.
+    #
+    # Parameter:
+    # self: the State object
+    #
+    # Returns the text that print_state outputs
+    ###################################
+
+    def format_state(self):
+        # Find the width of the block names (1 for single letters)
+        size = 1
+        if self.names is None:
+            blocks = list(self.index)
+            if not(self.arm.item is EMPTY):
+                blocks.append(self.arm.item)
+        else:
+            blocks = self.names
+        for block in blocks:
+            if size < len(str(block)):
+                size = len(str(block))
+        # Find the width of the columns (3 for the names L1 to L9 and single
+        # letter blocks)
+        width = size + 2
+        for location in self.locations:
+            if width < len(location.name) + 1:
+                width = len(location.name) + 1
+        # Collect the lines of the output and join them once at the end
+        text = []
+        # Add the state number
+        text.append("State " + str(self.num) + ":\n")
+        # Add the arm in it's current location
+        k = self.numbers.get(self.arm.place.name)
+        if not(k is None) and self.arm.place is self.locations[k]:
+            # Add the formatted arm stem (over the middle of the block names)
+            text.append(" " * (1 + width * k + (size - 1) // 2) + "|\n")
+            # If the arm is empty (marked by item being EMPTY), add an empty arm
+            if self.arm.item is EMPTY:
+                text.append(" " * (width * k) + "/" + " " * size + "\\\n")
+            # Otherwise, add an arm with the associated item within the arm
+            else:
+                text.append(" " * (width * k) + "/" + self.name(self.arm.item).ljust(size) + "\\\n")
+        # If the arm is not recognized at any of the locations, add an error
+        else:
+            text.append("Error: Unknown arm location.\n\n")
+        text.append("\n")
+        # Determine the max index of all the stacks
+        maxIndex = 0
+        for location in self.locations:
+            if maxIndex < len(location.stack):
+                maxIndex = len(location.stack)
+        # Loop for each height of blocks
+        for n in range(maxIndex):
+            row = []
+            for location in self.locations:
+                # If the stack has a block at the given height, add the block
+                if maxIndex - n <= len(location.stack):
+                    row.append(self.name(location.stack[maxIndex - n - 1]).ljust(size))
+                # Otherwise, make the slot at that height empty
+                else:
+                    row.append(" " * size)
+            text.append(" " + (" " * (width - size)).join(row) + "\n")
+        # Draw the table an stack locations
+        text.append("=" * (width * len(self.locations)) + "\n")
+        names = [location.name.ljust(width - 1) for location in self.locations]
+        text.append((" " + " ".join(names)).rstrip() + "\n\n")
+        return "".join(text)
+
+    ###################################
+    # print_state
+    # Outputs a text interpretation of the given state
+    #
+    # Parameter:
+    # self: the State object
+    ###################################
+
+    def print_state(self):
+        # Print the whole state with a single call
+        print(self.format_state(), end="")
+
+    ###################################
+    # copy
+    # Copies the state, with its own stacks, arm and block index
+    #
+    # Parameter:
+    # self: the State object
+    #
+    # Returns the new State object
+    ###################################
+
+    def copy(self):
+        state = State([Location(location.stack[:], location.name) for location in self.locations],
+                      self.num, self.names)
+        state.arm.move(state.places[self.arm.place.name])
+        state.arm.item = self.arm.item
+        return state
+
+#######################################
+# make_state
+# Creates a State from a list of stacks, naming the locations L1, L2, ...
+# in order
+#
+# Parameters:
+# stacks: the list of stacks (each a list of blocks from bottom to top)
+# num: the state number
+# names: the name of each block id, if the stacks hold block ids
+#
+# Returns the State object (which takes ownership of the stacks)
+#######################################
+
+def make_state(stacks, num=0, names=None):
+    return State([Location(stacks[k], 'L' + str(k + 1)) for k in range(len(stacks))], num, names)
+
+# Sets attributes of immutable objects (CompactState blocks normal
+# assignment)
+set_slot = object.__setattr__
+
+#######################################
+# CompactState class
+# A compact, immutable and hashable state value for search, caching and
+# deduplication. Block names are interned, the stacks are tuples (bottom to
+# top) that successors share with their parent when unchanged, and the hash
+# is computed once, so hashing is O(1) and comparing different states almost
+# always stops at the hash.
+#
+# Class variables:
+# stacks: a tuple of one tuple of blocks per location
+# arm: the index of the arm's location (0 for L1)
+# held: the block held by the arm (None if the arm is empty)
+# hash: the hash of the state
+#######################################
+
+class CompactState:
+
+    __slots__ = ('stacks', 'arm', 'held', 'hash')
+
+    ###############################
+    # Constructor
+    # Initializes the CompactState object
+    #
+    # Parameters:
+    # self: the CompactState object
+    # stacks: a tuple of one tuple of blocks per location
+    # arm: the index of the arm's location
+    # held: the block held by the arm (None if the arm is empty)
+    ###############################
+
+    def __init__(self, stacks, arm, held):
+        set_slot(self, 'stacks', stacks)
+        set_slot(self, 'arm', arm)
+        set_slot(self, 'held', held)
+        set_slot(self, 'hash', hash((stacks, arm, held)))
+
+    ###############################
+    # from_state
+    # Converts a State object into a CompactState (block ids are converted
+    # back to block names)
+    #
+    # Parameter:
+    # state: the State object to convert
+    #
+    # Returns the CompactState of the state
+    ###############################
+
+    @staticmethod
+    def from_state(state):
+        locations = state.locations
+        stacks = []
+        arm = 0
+        for k in range(len(locations)):
+            stacks.append(tuple([sys.intern(state.name(block)) for block in locations[k].stack]))
+            if state.arm.place is locations[k]:
+                arm = k
+        held = None
+        if not(state.arm.item is EMPTY):
+            held = sys.intern(state.name(state.arm.item))
+        return CompactState(tuple(stacks), arm, held)
+
+    ###############################
+    # to_state
+    # Converts the CompactState into a new State object
+    #
+    # Parameters:
+    # self: the CompactState object
+    # num: the state number
+    #
+    # Returns the State object
+    ###############################
+
+    def to_state(self, num=0):
+        state = make_state([list(stack) for stack in self.stacks], num)
+        state.arm.move(state.locations[self.arm])
+        if not(self.held is None):
+            state.arm.item = self.held
+        return state
+
+    ###############################
+    # apply
+    # Applies a primitive action to the state
+    #
+    # Parameters:
+    # self: the CompactState object
+    # action: the action -> 'u', 'd' or 'mK' (move to location LK)
+    #
+    # Returns the resulting CompactState
+    # Returns None if the action is not possible in this state
+    ###############################
+
+    def apply(self, action):
+        stacks = self.stacks
+        arm = self.arm
+        # Pick up the top block at the arm's location
+        if action == 'u':
+            stack = stacks[arm]
+            if not(self.held is None) or len(stack) == 0:
+                return None
+            return CompactState(stacks[:arm] + (stack[:len(stack) - 1],) + stacks[arm + 1:],
+                                arm, stack[len(stack) - 1])
+        # Put down the held block at the arm's location
+        if action == 'd':
+            if self.held is None:
+                return None
+            return CompactState(stacks[:arm] + (stacks[arm] + (self.held,),) + stacks[arm + 1:],
+                                arm, None)
+        # Move the arm to another location
+        if len(action) > 1 and action[0] == 'm' and action[1:].isdigit():
+            k = int(action[1:]) - 1
+            if 0 <= k < len(stacks):
+                return CompactState(stacks, k, self.held)
+        return None
+
+    ###############################
+    # successors
+    # Generates the states reachable with one primitive action (moves to the
+    # arm's own location are left out)
+    #
+    # Parameter:
+    # self: the CompactState object
+    #
+    # Yields (action, CompactState) pairs
+    ###############################
+
+    def successors(self):
+        stacks = self.stacks
+        arm = self.arm
+        held = self.held
+        # Pick up the top block at the arm's location
+        if held is None:
+            stack = stacks[arm]
+            if not(len(stack) == 0):
+                yield 'u', CompactState(stacks[:arm] + (stack[:len(stack) - 1],) + stacks[arm + 1:],
+                                        arm, stack[len(stack) - 1])
+        # Put down the held block at the arm's location
+        else:
+            yield 'd', CompactState(stacks[:arm] + (stacks[arm] + (held,),) + stacks[arm + 1:],
+                                    arm, None)
+        # Move the arm to each other location
+        for k in range(len(stacks)):
+            if not(k == arm):
+                yield 'm' + str(k + 1), CompactState(stacks, k, held)
+
+    ###############################
+    # predecessors
+    # Generates the states from which one primitive action leads to this
+    # state (the inverse of successors)
+    #
+    # Parameter:
+    # self: the CompactState object
+    #
+    # Yields (action, CompactState) pairs, where the action applied to the
+    # CompactState gives this state
+    ###############################
+
+    def predecessors(self):
+        stacks = self.stacks
+        arm = self.arm
+        held = self.held
+        # A held block was picked up from the arm's location
+        if not(held is None):
+            yield 'u', CompactState(stacks[:arm] + (stacks[arm] + (held,),) + stacks[arm + 1:],
+                                    arm, None)
+        # The top block at the arm's location was put down there
+        else:
+            stack = stacks[arm]
+            if not(len(stack) == 0):
+                yield 'd', CompactState(stacks[:arm] + (stack[:len(stack) - 1],) + stacks[arm + 1:],
+                                        arm, stack[len(stack) - 1])
+        # The arm moved here from each other location
+        action = 'm' + str(arm + 1)
+        for k in range(len(stacks)):
+            if not(k == arm):
+                yield action, CompactState(stacks, k, held)
+
+    ###############################
+    # __setattr__
+    # Prevents the state from being changed
+    ###############################
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactState is immutable")
+
+    ###############################
+    # __hash__
+    # Returns the hash computed by the constructor
+    ###############################
+
+    def __hash__(self):
+        return self.hash
+
+    ###############################
+    # __eq__
+    # Returns True if both states have the same stacks, arm and held block
+    ###############################
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not(isinstance(other, CompactState)) or not(self.hash == other.hash):
+            return False
+        return self.arm == other.arm and self.held == other.held and self.stacks == other.stacks
+
+    ###############################
+    # __repr__
+    # Returns a readable form of the state
+    ###############################
+
+    def __repr__(self):
+        return "CompactState(%r, %r, %r)" % (self.stacks, self.arm, self.held)
+
+#######################################
+# Relations class
+# A store for the relations of a state with an index for each relation type,
+# so that membership tests, inserts, deletes and "what is on/under X" lookups
+# are O(1). Relations are stored as tuples, and relations given as lists
+# (such as ['o', a, b]) are accepted everywhere a relation is expected.
+#
+# A store can also track its progress towards a goal store as relations are
+# added and removed: the number of goal relations of each type that do not
+# hold yet, and the set of well-placed blocks (a block is well placed if it
+# is on the table as in the goal, or on its goal support and that support is
+# well placed).
+#
+# Class variables:
+# table: the Table relations keyed by the block touching the table
+# on: the On relations keyed by the block above
+# under: the On relations keyed by the block below
+# clear: the Clear relations keyed by the clear block
+# above: the Above relations keyed by the block held by the arm
+# types: the per-type indexes keyed by relation type
+# goal: the Relations store of the goal (None if progress is not tracked)
+# unsatisfied: the number of goal relations of each type not in the store
+# missing: the total number of goal relations not in the store
+# well_placed: the set of well-placed blocks
+# tracked: the relation types that change the goal progress (the types of
+# the goal relations, and Table and On for the well-placed blocks)
+#######################################
+
+class Relations:
+
+    ###################################
+    # Constructor
+    # Initializes the store with a list of relations
+    #
+    # Parameters:
+    # self: the Relations object
+    # relations: the list of relations to store
+    # goal: the Relations store of the goal to track progress towards (None
+    # for no tracking)
+    ###################################
+
+    def __init__(self, relations, goal=None):
+        self.table = {}
+        self.on = {}
+        self.under = {}
+        self.clear = {}
+        self.above = {}
+        self.types = {'t': self.table, 'o': self.on, 'c': self.clear, 'a': self.above}
+        self.goal = goal
+        # Every goal relation is unsatisfied until it is added
+        self.unsatisfied = {'t': 0, 'o': 0, 'c': 0, 'a': 0}
+        self.missing = 0
+        self.well_placed = set()
+        self.tracked = set()
+        if not(goal is None):
+            for relation in goal:
+                self.unsatisfied[relation[0]] += 1
+                self.tracked.add(relation[0])
+            self.missing = len(goal)
+            self.tracked.update(['t', 'o'])
+        for r in range(len(relations)):
+            self.append(relations[r])
+
+    ###################################
+    # append
+    # Adds a relation to the store
+    #
+    # Parameters:
+    # self: the Relations object
+    # relation: the relation to add
+    ###################################
+
+    def append(self, relation):
+        relation = tuple(relation)
+        self.types[relation[0]][relation[1]] = relation
+        # On relations are also indexed by the block below
+        if relation[0] == 'o':
+            self.under[relation[2]] = relation
+        if relation[0] in self.tracked:
+            self.track(relation, True)
+
+    ###################################
+    # remove
+    # Removes a relation from the store
+    #
+    # Parameters:
+    # self: the Relations object
+    # relation: the relation to remove
+    #
+    # Raises a ValueError if the relation is not in the store
+    ###################################
+
+    def remove(self, relation):
+        relation = tuple(relation)
+        if not(self.types[relation[0]].get(relation[1]) == relation):
+            raise ValueError("Relations.remove: relation not in store")
+        del self.types[relation[0]][relation[1]]
+        if relation[0] == 'o':
+            del self.under[relation[2]]
+        if relation[0] in self.tracked:
+            self.track(relation, False)
+
+    ###################################
+    # remove_block
+    # Removes every relation whose first block is the given block
+    #
+    # Parameters:
+    # self: the Relations object
+    # block: the block whose relations are removed
+    ###################################
+
+    def remove_block(self, block):
+        for index in self.types.values():
+            relation = index.pop(block, None)
+            if not(relation is None):
+                if relation[0] == 'o':
+                    del self.under[relation[2]]
+                if relation[0] in self.tracked:
+                    self.track(relation, False)
+
+    ###################################
+    # track
+    # Updates the goal progress after a relation was added or removed
+    #
+    # Parameters:
+    # self: the Relations object
+    # relation: the relation (as a tuple)
+    # added: True if the relation was added, False if it was removed
+    ###################################
+
+    def track(self, relation, added):
+        goal = self.goal
+        # Look the relation up in the goal's index directly (relation is
+        # already a tuple)
+        in_goal = goal.types[relation[0]].get(relation[1]) == relation
+        if in_goal:
+            if added:
+                self.unsatisfied[relation[0]] -= 1
+                self.missing -= 1
+            else:
+                self.unsatisfied[relation[0]] += 1
+                self.missing += 1
+        # Only Table and On relations decide whether a block is well placed
+        if not(relation[0] == 't' or relation[0] == 'o'):
+            return
+        block = relation[1]
+        if added:
+            if not(in_goal) or (relation[0] == 'o' and not(relation[2] in self.well_placed)):
+                return
+            # The block is well placed, and so is the chain of blocks on it
+            # that are on their goal supports
+            while True:
+                self.well_placed.add(block)
+                above = self.under.get(block)
+                if above is None or not(goal.on.get(above[1]) == above):
+                    break
+                block = above[1]
+        else:
+            # The block and every block stacked on it are no longer well placed
+            while block in self.well_placed:
+                self.well_placed.discard(block)
+                above = self.under.get(block)
+                if above is None:
+                    break
+                block = above[1]
+
+    ###################################
+    # of_type
+    # Returns the relations of a given type in the order they were added
+    #
+    # Parameters:
+    # self: the Relations object
+    # type: the type of relation -> 't', 'o', 'a' or 'c'
+    ###################################
+
+    def of_type(self, type):
+        return list(self.types[type].values())
+
+    ###################################
+    # on_top_of
+    # Returns the block that is on the given block (EMPTY if it is clear)
+    #
+    # Parameters:
+    # self: the Relations object
+    # block: the block to look on top of
+    ###################################
+
+    def on_top_of(self, block):
+        relation = self.under.get(block)
+        if relation is None:
+            return EMPTY
+        return relation[1]
+
+    ###################################
+    # under_block
+    # Returns the block under the given block (EMPTY if there is none)
+    #
+    # Parameters:
+    # self: the Relations object
+    # block: the block to look under
+    ###################################
+
+    def under_block(self, block):
+        relation = self.on.get(block)
+        if relation is None:
+            return EMPTY
+        return relation[2]
+
+    ###################################
+    # __contains__
+    # Returns True if the relation is in the store (O(1))
+    #
+    # Parameters:
+    # self: the Relations object
+    # relation: the relation to test for
+    ###################################
+
+    def __contains__(self, relation):
+        index = self.types.get(relation[0])
+        return not(index is None) and index.get(relation[1]) == tuple(relation)
+
+    ###################################
+    # __iter__
+    # Iterates over all relations, grouped by type
+    #
+    # Parameter:
+    # self: the Relations object
+    ###################################
+
+    def __iter__(self):
+        for index in self.types.values():
+            for relation in list(index.values()):
+                yield relation
+
+    ###################################
+    # __len__
+    # Returns the number of relations in the store
+    #
+    # Parameter:
+    # self: the Relations object
+    ###################################
+
+    def __len__(self):
+        return len(self.table) + len(self.on) + len(self.clear) + len(self.above)
+
+#######################################
+# Step
+# An event for one executed primitive action, yielded by
+# Planner.execute_steps. The kinds of steps are as follows:
+# 'pick up' - block is picked up from the table at source
+# 'unstack' - block is picked up from below at source
+# 'put down' - block is put down on the table at source
+# 'stack' - block is put down on below at source
+# 'move' - the arm moves from source to target holding block
+#
+# Fields:
+# action: the primitive action ('u', 'd' or 'mK')
+# kind: the kind of step
+# block: the name of the block picked up, put down or held (EMPTY if the arm
+# is empty)
+# below: the name of the block under block (for a move, the block at the top
+# of target; EMPTY if there is none)
+# source: the name of the arm's location before the action
+# target: the name of the arm's location after the action
+# num: the state number after the action
+#######################################
+
+Step = collections.namedtuple('Step', ['action', 'kind', 'block', 'below', 'source', 'target', 'num'])
+
+#######################################
+# describe_step
+# Describes a Step in the text written by execute_with_output
+#
+# Parameter:
+# step: the Step to describe
+#
+# Returns the text of the step
+#######################################
+
+def describe_step(step):
+    if step.kind == 'pick up':
+        return "Action: Pick up " + step.block + " from " + step.source + ".\n\n"
+    if step.kind == 'unstack':
+        return "Action: Unstack " + step.block + " from " + step.source + ".\n\n"
+    if step.kind == 'put down':
+        return "Action: Put down " + step.block + " on " + step.source + ".\n\n"
+    if step.kind == 'stack':
+        return "Action: Stack " + step.block + " on " + step.below + " at " + step.source + ".\n\n"
+    return "Action: Move arm from " + step.source + " to " + step.target + ".\n\n"
+
+#######################################
+# Output class
+# A sink for the text written while actions are executed. The mode decides
+# what is written:
+# 'none' - nothing is written
+# 'summary' - only the number of executed actions, written by finish
+# 'full' - every action and state, written as one stream write per flush
+# 'nth' - like 'full', but only every Nth action and state
+#
+# Class variables:
+# mode: the output mode
+# stream: the stream written to (sys.stdout when None)
+# every: the interval of actions written in 'nth' mode
+# trace: True if actions and states are written ('full' or 'nth')
+# count: the number of actions reported to the output
+# buffer: the text waiting to be written by flush
+#######################################
+
+class Output:
+
+    ###################################
+    # Constructor
+    # Initializes the Output object
+    #
+    # Parameters:
+    # self: the Output object
+    # mode: the output mode -> 'none', 'summary', 'full' or 'nth'
+    # stream: the stream to write to (sys.stdout when None)
+    # every: the interval of actions written in 'nth' mode
+    #
+    # Raises a ValueError if the mode is unknown or every is less than 1
+    ###################################
+
+    def __init__(self, mode='full', stream=None, every=1):
+        if not(mode in ['none', 'summary', 'full', 'nth']):
+            raise ValueError("Output mode must be 'none', 'summary', 'full' or 'nth'")
+        if every < 1:
+            raise ValueError("Output interval must be at least 1")
+        self.mode = mode
+        self.stream = stream
+        self.every = every
+        self.trace = mode == 'full' or mode == 'nth'
+        self.count = 0
+        self.buffer = []
+
+    ###################################
+    # step
+    # Reports an executed action and the state it produced
+    #
+    # Parameters:
+    # self: the Output object
+    # text: the description of the action (None when trace is False)
+    # state: the State after the action
+    ###################################
+
+    def step(self, text, state):
+        self.count += 1
+        # Only render the state if it will be written
+        if self.trace:
+            if self.mode == 'full' or self.count % self.every == 0:
+                self.buffer.append(text)
+                self.buffer.append(state.format_state())
+
+    ###################################
+    # flush
+    # Writes all buffered text to the stream with a single write
+    #
+    # Parameter:
+    # self: the Output object
+    ###################################
+
+    def flush(self):
+        if not(len(self.buffer) == 0):
+            stream = self.stream
+            if stream is None:
+                stream = sys.stdout
+            stream.write("".join(self.buffer))
+            self.buffer = []
+
+    ###################################
+    # finish
+    # Flushes the output and, in 'summary' mode, writes the number of
+    # executed actions
+    #
+    # Parameter:
+    # self: the Output object
+    ###################################
+
+    def finish(self):
+        if self.mode == 'summary':
+            self.buffer.append("Executed " + str(self.count) + " actions.\n")
+        self.flush()
+
+#######################################
+# Planner class
+#
+# Class variables:
+# state: the current state
+# state_g: the goal state
+# relations_c: the Relations store for the current state (changes each state)
+# relations_g: the Relations store for the goal state (created once)
+# (relations_c tracks the goal relations of relations_g that hold and the
+# well-placed blocks as each action is applied)
+# output: the Output that execute_with_output writes to by default
+# moves: the position of the location of each move action ('m1' is 0)
+# names: the name of each block id
+# ids: the id of each block name
+# stats: the phase statistics of instrument (None unless instrumented)
+# rng: the random generator that breaks ties between equally good locations
+# (None to always take the first one)
+#######################################
+
+class Planner:
+
+    ###################################
+    # Constructor
+    # Initializes the planner object
+    #
+    # Parameters:
+    # self: the Planner object
+    # stacks: the stacks of the initial state's locations (L1, L2, ...)
+    # followed by the stacks of the goal state's locations, so that the first
+    # half of the stacks is the initial state and the second half is the goal
+    # state (at least 3 locations each); blocks can have any names, and the
+    # given stacks are not changed
+    # output: the Output to write executed actions to (a full Output to
+    # sys.stdout if not given)
+    # rng: a random.Random that breaks ties between equally good locations
+    # (None for the deterministic first choice)
+    #
+    # Raises a ValueError if the states do not have the same number of
+    # locations or have fewer than 3 locations
+    ###################################
+
+    def __init__ (self, *stacks, output=None, rng=None):
+        if not(len(stacks) % 2 == 0) or len(stacks) < 6:
+            raise ValueError("the Planner needs the same number (at least 3) of initial and goal stacks")
+        count = len(stacks) // 2
+        # Number the blocks with dense integer ids in order of appearance, so
+        # that the stacks and relations only hold small integers (the names
+        # are only used for output)
+        self.names = []
+        self.ids = {}
+        for stack in stacks:
+            for block in stack:
+                if not(block in self.ids):
+                    self.ids[block] = len(self.names)
+                    self.names.append(block)
+        self.state = make_state([[self.ids[block] for block in stack] for stack in stacks[:count]],
+                                0, self.names)
+        self.state_g = make_state([[self.ids[block] for block in stack] for stack in stacks[count:]],
+                                  0, self.names)
+        # Map each move action to the position of its location
+        self.moves = {}
+        for k in range(count):
+            self.moves['m' + str(k + 1)] = k
+        self.relations_g = Relations(self.state_g.get_relations())
+        self.relations_c = Relations(self.state.get_relations(), self.relations_g)
+        self.output = output
+        if self.output is None:
+            self.output = Output('full')
+        self.stats = None
+        self.rng = rng
+
+    ###################################
+    # search4relations
+    # Searches the relation list for relations of a specified type
+    #
+    # Parameters:
+    # self: the Planner object
+    # relations: the Relations store of the state
+    # type: the type of relation to be searched for ->
+    # -> 't' for Table, 'o' for On, 'a' for Above, and 'c' for Clear
+    #
+    # Returns a list of relations from the relation list filtered by the given type
+    ###################################
+
+    def search4relations (self, relations, type):
+        # Return the relations from the store's index for the type
+        return relations.of_type(type)
+
+    ###################################
+    # search4block
+    # For the given state, find which location the block in question is located at
+    #
+    # Parameters:
+    # self: the Planner object
+    # state: the state to search within
+    # block: the block to find in the given state
+    #
+    # Returns the location of the block
+    # Returns an error if the block is either held by the arm or the block is not found
+    ###################################
+
+    def search4block (self, state, block):
+        # Look up the block's location in the block index
+        location = state.find(block)
+        # If the block was not found, print an appropriate error message
+        if location == '':
+            if state.arm.item == block:
+                print("Error: search4block used when block was in arm.\n")
+            else:
+                print("Error: search4block did not find block.\n")
+        # Return the location (if an error is printed, an empty string is returned)
+        return location
+
+    ###################################
+    # compare_relations
+    # Compares the relations of a given type and returns an ordered list of
+    # relations to solve for (an On relation that already holds is still a
+    # task if a relation below it in the same goal stack does not hold).
+    #
+    # Parameters:
+    # self: the Planner object
+    # type: the type of relation being tested for
+    #
+    # Returns an ordered list of relations to solve for of the given type
+    # Prints an error and returns an empty set if type is not 't', 'o', or 'c'
+    ###################################
+
+    def compare_relations (self, type):
+        list = []
+        # Table relation, 't'
+        if type == 't':
+            # Find all relations of type Table for the goal state
+            goal = self.search4relations(self.relations_g, 't')
+            # For each goal relation of type 't'...
+            for i in range(len(goal)):
+                # If the block is not on the table in the current state...
+                if not(goal[i][1] in self.relations_c.table):
+                    # Add the goal relation to the list
+                    list.append(goal[i])
+            # END OF LOOP - list is ready to be returned
+
+        # On relation, 'o'
+        elif type == 'o':
+            # Find all relations of type Table for the current state
+            current_t = self.search4relations(self.relations_c, 't')
+
+            # To order the tasks, find the location where a block is both
+            # Table and Clear (such a block may not be found)
+            order = ['L1']
+            for i in range(len(current_t)):
+                # If a block is both Table and Clear, save the block's location
+                if current_t[i][1] in self.relations_c.clear:
+                    order[0] = self.search4block(self.state, current_t[i][1])
+                    break
+            # Complete the order by going down from that location through the
+            # other locations (wrapping around from L1 to the last location)
+            if order[0] in self.state.numbers:
+                k = self.state.numbers[order[0]]
+                for j in range(1, len(self.state.locations)):
+                    order.append(self.state.locations[(k - j) % len(self.state.locations)].name)
+            # If location is blank, an error occured (print error message)
+            else:
+                print("Error: compare_relations failed from search4block.\n")
+            # For each location in order, order the tasks from the bottom
+            # to the top of the stack. Also, compare relations along the way.
+            for i in range(len(order)):
+                    # Find the block on the table at order[i] in the current state
+                    bottom = ''
+                    location = self.state.places.get(order[i])
+                    if not(location is None) and not(len(location.stack) == 0):
+                        # Check if the goal state has a matching Table relation
+                        if location.stack[0] in self.relations_g.table:
+                            bottom = location.stack[0]
+                    # If the stack is empty or there is no goal of a stack
+                    # being formed, no stack will be formed.
+                    if not(bottom == ''):
+                        # Follow the chain of On goal relations up from the
+                        # bottom block with the goal's successor map (the On
+                        # relations keyed by the block below)
+                        still_true = True
+                        relation = self.relations_g.under.get(bottom)
+                        while not(relation is None):
+                            # If the stack does not hold true up to that
+                            # point, or the block on bottom in the current
+                            # state (from the current successor map) is not
+                            # the goal block, add the task
+                            if not(still_true) or not(self.relations_c.under.get(bottom) == relation):
+                                list.append(relation)
+                                still_true = False
+                            # Shift bottom to the top block of the relation
+                            bottom = relation[1]
+                            relation = self.relations_g.under.get(bottom)
+                # END OF LOOP - list is ready to be returned
+
+        # Clear relation, 'c'
+        elif type == 'c':
+            # Since it is implied that Clear is already solved for, there are
+            # no tasks (relations_c already tracks which goal Clear relations
+            # hold)
+            pass
+
+        # Print an error and returns an empty set if type is not 't', 'o', or 'c'
+        else:
+            print("Error: compare_relations only accepts types t, o, and c.\n")
+        return list
+
+    ###################################
+    # first_location
+    # Finds the first location (in the order L1, L2, ...) that is not in a
+    # list of locations (or a random one of them if the Planner has an rng)
+    #
+    # Parameters:
+    # self: the Planner object
+    # excluded: the names of the locations to skip
+    #
+    # Returns the name of the location
+    # Returns L1 if every location is excluded
+    ###################################
+
+    def first_location (self, excluded):
+        if not(self.rng is None):
+            names = [location.name for location in self.state.locations if not(location.name in excluded)]
+            if not(len(names) == 0):
+                return self.rng.choice(names)
+        for location in self.state.locations:
+            if not(location.name in excluded):
+                return location.name
+        return self.state.locations[0].name
+
+    ###################################
+    # choose_junk
+    # Chooses the location to use as Junk among the locations that are not in
+    # a list of locations. With more than one choice, locations that do not
+    # hold a block that touches the table in the goal state are preferred
+    # (so that junk does not bury a tower that is being built), then
+    # locations with fewer blocks, then the first location (or a random one
+    # of the best locations if the Planner has an rng).
+    #
+    # Parameters:
+    # self: the Planner object
+    # excluded: the names of the locations that cannot be Junk
+    #
+    # Returns the name of the location
+    # Returns '' if every location is excluded
+    ###################################
+
+    def choose_junk (self, excluded):
+        junk = ''
+        best = None
+        ties = []
+        for location in self.state.locations:
+            if location.name in excluded:
+                continue
+            # Score the location (lower is better)
+            tower = not(len(location.stack) == 0) and location.stack[0] in self.relations_g.table
+            score = (tower, len(location.stack))
+            if best is None or score < best:
+                junk = location.name
+                best = score
+                ties = [location.name]
+            elif score == best:
+                ties.append(location.name)
+        # Break ties at random if asked to
+        if not(self.rng is None) and not(best is None):
+            junk = self.rng.choice(ties)
+        return junk
+
+    ###################################
+    # move_action
+    # Returns the action that moves the arm to a location
+    #
+    # Parameters:
+    # self: the Planner object
+    # location: the name of the location
+    ###################################
+
+    def move_action (self, location):
+        return 'm' + str(self.state.numbers[location] + 1)
+
+    ###################################
+    # execution_setup
+    # Allocates stacks for a given relation task. Stack roles are as follows:
+    # Dig - the stack to dig from
+    # Junk - the stack that blocks can be temporarily placed on
+    # Place Tmp - the temporary location to place the goal block
+    # Place - the goal location for the goal block
+    #
+    # Parameters:
+    # self - the Planner object
+    # task - the relation task to solve for
+    #
+    # Returns an ordered list of the stack roles ordered as the following:
+    # [Dig, Junk, Place Tmp, Place]
+    ###################################
+
+    def execution_setup (self, task):
+        list = []
+        dig = ''
+        junk = ''
+        place_tmp = ''
+        place = ''
+        if task[0] == 't':
+            # Define the goal block
+            block_g = task[1]
+            # Find the block's location to set as Dig
+            dig = self.search4block(self.state, block_g)
+            # Find a location that block can be placed
+            # Find Table relations for the current state
+            current = self.search4relations(self.relations_c, 't')
+            # Find the places that currently satisfy Table
+            place_list = []
+            for i in range(len(current)):
+                # If the current and goal relations match, save the location
+                if current[i][1] in self.relations_g.table:
+                    place_list.append(self.search4block(self.state, current[i][1]))
+            # Set Place as the first location that does not satisfy Table
+            # (only the first K-1 places are checked, so that a location is
+            # left if all K locations satisfy Table)
+            place = self.first_location(place_list[:len(self.state.locations) - 1])
+        elif task[0] == 'o':
+            # Define the goal block
+            block_g = task[1]
+            # Find the block's location to set as Dig
+            dig = self.search4block(self.state, block_g)
+            # Find the block's location to set as Place
+            place = self.search4block(self.state, task[2])
+        else:
+            # Print an error that the task was not 't' or 'o' and print an empty list
+            print("Error: execution_setup will only accept types 't' or 'o'.\n")
+            return list
+        # If Dig is the same as Place, set Place Tmp as the first other
+        # location and find a place for Junk among the rest
+        if dig == place:
+            place_tmp = self.first_location([dig])
+            junk = self.choose_junk([dig, place_tmp])
+        # Otherwise, find a place for Junk
+        else:
+            junk = self.choose_junk([dig, place])
+        # Order list as [Dig, Junk, Place Tmp, Place]
+        list = [dig, junk, place_tmp, place]
+        # Return the ordered list
+        return list
+
+    ###################################
+    # make_action_block
+    # Creates an action block for a given task and stack roles.
+    #
+    # Action key:
+    # u: Pick up block
+    # d: Put down block
+    # mK: Move arm to LK (m1 moves the arm to L1, m2 to L2, ...)
+    #
+    # Parameters:
+    # self: the Planner object
+    # task: the relation to solve for
+    # roles: the stack roles given by execution_setup
+    #
+    # Returns an ordered list denoting actions to be taken in a specific order
+    ###################################
+
+    def make_action_block (self, task, roles):
+        actions = []
+        places = self.state.places
+        # If the task is a Table relation...
+        if task[0] == 't':
+            # Track the depth within the stacks for help with indexing
+            depth = 0
+            depth_p = 0
+            # Track the arm's location throughout the action block
+            arm_l = self.state.arm.place.name
+            # Track if the goal block is at Place Tmp
+            tmp_g = False
+            # Track if Dig and Place are the same location
+            same = roles[0] == roles[3]
+            while True:
+                # If Place is not empty, empty the stack at Place
+                if roles[3] in places and len(places[roles[3]].stack) - depth_p != 0:
+                    # If the arm is not at Place, move to Place
+                    if not(arm_l == roles[3]):
+                        actions.append(self.move_action(roles[3]))
+                        arm_l = roles[3]
+                    # Pick up the top block from Place's stack
+                    actions.append('u')
+                    # If Dig and Place are the same AND goal block is NOT at
+                    # Place Tmp...
+                    if same and not(tmp_g):
+                        # If the goal block is at the indexed depth (from the block index)...
+                        if self.state.above_count(task[1]) == depth_p:
+                            # If Place Tmp is another location, move to Place Tmp
+                            # and set tmp_g to True
+                            if roles[2] in places and not(roles[2] == roles[3]):
+                                actions.append(self.move_action(roles[2]))
+                                arm_l = roles[2]
+                                tmp_g = True
+                            # Otherwise, print an error message
+                            else:
+                                print("Error: Place and Place Tmp were assigned to the same place.\n")
+                    # Otherwise, move to Junk
+                    else:
+                        # If Junk is another location, move to Junk
+                        if roles[1] in places and not(roles[1] == roles[3]):
+                            actions.append(self.move_action(roles[1]))
+                            arm_l = roles[1]
+                        # Otherwise, print an error message
+                        else:
+                            print("Error: Place and Junk were assigned to the same place.\n")
+                    # Put down the block
+                    actions.append('d')
+                    # Increment depth_p
+                    depth_p += 1
+                # Otherwise, move on to Place Tmp or Dig operations
+                else:
+                    # If the goal block is at Place Tmp, move to Place Tmp,
+                    # pick up, move to Place and put down
+                    if tmp_g:
+                        actions.append(self.move_action(roles[2]))
+                        arm_l = roles[2]
+                        actions.append('u')
+                        actions.append(self.move_action(roles[3]))
+                        arm_l = roles[3]
+                        actions.append('d')
+                        # END OF TASK - break loop
+                        break
+                    # If Dig is a location...
+                    elif roles[0] in places:
+                        # If the arm is not at Dig, move to Dig
+                        if not(arm_l == roles[0]):
+                            actions.append(self.move_action(roles[0]))
+                            arm_l = roles[0]
+                        # Pick up the block
+                        actions.append('u')
+                        # If the goal block is at the indexed depth (from the block index)...
+                        if self.state.above_count(task[1]) == depth:
+                            # Move to Place and put down (if Place is Dig, the
+                            # goal block was dug out from below its goal
+                            # support, so put it down at Junk)
+                            if roles[3] == roles[0]:
+                                arm_l = roles[1]
+                            else:
+                                arm_l = roles[3]
+                            actions.append(self.move_action(arm_l))
+                            actions.append('d')
+                            # END OF TASK - break loop
+                            break
+                        # Otherwise, find Junk's location
+                        else:
+                            # If Junk is another location, move to Junk
+                            if roles[1] in places and not(roles[1] == roles[0]):
+                                actions.append(self.move_action(roles[1]))
+                                arm_l = roles[1]
+                            # Otherwise, print an error message
+                            else:
+                                print("Error: Dig and Junk were assigned to the same place.\n")
+                            # Put down the block
+                            actions.append('d')
+                    # Otherwise, print an error
+                    else:
+                        print("Error: Dig was not allocated a location.\n")
+                        break
+                    # Increment depth
+                    depth += 1
+            # END OF LOOP
+
+        # If the task is an On relation...
+        elif task[0] == 'o':
+            # Track the depth within the stacks for help with indexing
+            depth = 0
+            depth_p = 0
+            # Track the arm's location throughout the action block
+            arm_l = self.state.arm.place.name
+            # Track if the goal block is at Place Tmp
+            tmp_g = False
+            # Track if Dig and Place are the same location
+            same = roles[0] == roles[3]
+            # If Place is not a known location, print an error message
+            if not(roles[3] in places):
+                print("Error: Place was not found in make_action_block.\n")
+                return actions
+            # Track if the correct block is exposed at Place (it is exposed
+            # when no blocks are above it, from the block index)
+            exposed = self.state.above_count(task[2]) == 0
+            while True:
+                # If the goal block is NOT exposed...
+                if not(exposed):
+                    # If the arm is not at Place, move to Place
+                    if not(arm_l == roles[3]):
+                        actions.append(self.move_action(roles[3]))
+                        arm_l = roles[3]
+                    # Pick up the block
+                    actions.append('u')
+                    # If Dig and Place are the same AND goal block is NOT at
+                    # Place Tmp...
+                    if same and not(tmp_g):
+                        # If the top goal block is picked up, move to Place Tmp
+                        if self.state.above_count(task[1]) == depth_p:
+                            # If Place Tmp is another location, move to Place Tmp
+                            # and set tmp_g to True
+                            if roles[2] in places and not(roles[2] == roles[3]):
+                                actions.append(self.move_action(roles[2]))
+                                arm_l = roles[2]
+                                tmp_g = True
+                            # Otherwise, print an error message
+                            else:
+                                print("Error: Place and Place Tmp were assigned to the same place.\n")
+                    # Otherwise, move to Junk
+                    else:
+                        # If Junk is another location, move to Junk
+                        if roles[1] in places and not(roles[1] == roles[3]):
+                            actions.append(self.move_action(roles[1]))
+                            arm_l = roles[1]
+                        # Otherwise, print an error message
+                        else:
+                            print("Error: Place and Junk were assigned to the same place.\n")
+                    # Put down the block
+                    actions.append('d')
+                    # Increment depth, then check if the goal block is exposed
+                    depth_p += 1
+                    if self.state.above_count(task[2]) == depth_p:
+                        exposed = True
+                # Otherwise, move on to Place Tmp or Dig operations
+                else:
+                    # If the top goal block is in Place Tmp, move to Place Tmp,
+                    # pick up, move to Place and put down
+                    if tmp_g:
+                        actions.append(self.move_action(roles[2]))
+                        arm_l = roles[2]
+                        actions.append('u')
+                        actions.append(self.move_action(roles[3]))
+                        arm_l = roles[3]
+                        actions.append('d')
+                        # END OF TASK - break loop
+                        break
+                    # If Dig is a location...
+                    elif roles[0] in places:
+                        # If the arm is not at Dig, move to Dig
+                        if not(arm_l == roles[0]):
+                            actions.append(self.move_action(roles[0]))
+                            arm_l = roles[0]
+                        # Pick up the block
+                        actions.append('u')
+                        # If the goal block is at the indexed depth (from the block index)...
+                        if self.state.above_count(task[1]) == depth:
+                            # Move to Place and put down (if Place is Dig, the
+                            # goal block was dug out from below its goal
+                            # support, so put it down at Junk)
+                            if roles[3] == roles[0]:
+                                arm_l = roles[1]
+                            else:
+                                arm_l = roles[3]
+                            actions.append(self.move_action(arm_l))
+                            actions.append('d')
+                            # END OF TASK - break loop
+                            break
+                        # Otherwise, find Junk's location
+                        else:
+                            # If Junk is another location, move to Junk
+                            if roles[1] in places and not(roles[1] == roles[0]):
+                                actions.append(self.move_action(roles[1]))
+                                arm_l = roles[1]
+                            # Otherwise, print an error message
+                            else:
+                                print("Error: Dig and Junk were assigned to the same place.\n")
+                            # Put down the block
+                            actions.append('d')
+                    # Otherwise, print an error
+                    else:
+                        print("Error: Dig was not allocated a location.\n")
+                        break
+                    # Increment depth
+                    depth += 1
+            # END OF LOOP
+        # Otherwise, print an error message
+        else:
+            print("Error: make_action_block only accepts relation tasks of type 't' or 'o'.\n")
+        # Return the ordered list of tasks
+        return actions
+
+    ###################################
+    # execute_steps
+    # Excecutes the given action block one action at a time, updating the
+    # state and it's relations. This is a generator: each action is only
+    # executed when the next Step is asked for, and nothing is formatted or
+    # written.
+    #
+    # Parameters:
+    # self: the Planner object
+    # actions: the ordered list of actions given by make_action_block
+    #
+    # Yields a Step for each executed action (faulty actions print an error
+    # and yield nothing)
+    ###################################
+
+    def execute_steps (self, actions):
+        # Steps name blocks by their names rather than their ids
+        names = self.names
+        for i in range(len(actions)):
+            # Find the arm's location and its stack
+            location = self.state.arm.place
+            stack = location.stack
+            # If the action is to pick up
+            if actions[i] == 'u':
+                # If the stack at the arm is empty, print an error
+                if len(stack) == 0:
+                    print("Error: Tried action \"Pick Up\" when the stack was empty.\n")
+                # If the stack is of length 1, define action as pick up
+                elif len(stack) == 1:
+                    # Save the block being picked up
+                    block_u = stack[len(stack) - 1]
+                    # Update the location and Arm
+                    self.state.arm.pick_up()
+                    # Update relations
+                    # Remove relations with block_u
+                    self.relations_c.remove_block(block_u)
+                    # Create an Above empty relation
+                    self.relations_c.append(['a', block_u, EMPTY])
+                    # Increment state number and yield the step
+                    self.state.num += 1
+                    yield Step(actions[i], 'pick up', names[block_u], EMPTY, location.name,
+                               location.name, self.state.num)
+                # Unstack
+                else:
+                    # Save the block being picked up
+                    block_u = stack[len(stack) - 1]
+                    # Save the block below the block being picked up
+                    block_d = stack[len(stack) - 2]
+                    # Update the location and Arm
+                    self.state.arm.pick_up()
+                    # Update relations
+                    # Remove relations with block_u
+                    self.relations_c.remove_block(block_u)
+                    # Create an Above empty relation
+                    self.relations_c.append(['a', block_u, block_d])
+                    # Create a Clear relation
+                    self.relations_c.append(['c', block_d])
+                    # Increment state number and yield the step
+                    self.state.num += 1
+                    yield Step(actions[i], 'unstack', names[block_u], names[block_d], location.name,
+                               location.name, self.state.num)
+            # If the action is to put down...
+            elif actions[i] == 'd':
+                # If the stack at the arm is empty, define action as "Put Down"
+                if len(stack) == 0:
+                    # Save the block being put down
+                    block_a = self.state.arm.item
+                    # Update the location and Arm
+                    self.state.arm.put_down()
+                    # Update relations
+                    self.relations_c.remove(['a', block_a, EMPTY])
+                    # Create a Table relation
+                    self.relations_c.append(['t', block_a])
+                    # Create a Clear relation
+                    self.relations_c.append(['c', block_a])
+                    # Increment state number and yield the step
+                    self.state.num += 1
+                    yield Step(actions[i], 'put down', names[block_a], EMPTY, location.name,
+                               location.name, self.state.num)
+                # Otherwise, define action as "Stack"
+                else:
+                    # Save the block being put down
+                    block_a = self.state.arm.item
+                    # Save the block that's currently at the top of the stack
+                    block_b = stack[len(stack) - 1]
+                    # Update the location and Arm
+                    self.state.arm.put_down()
+                    # Update relations
+                    self.relations_c.remove(['a', block_a, block_b])
+                    self.relations_c.remove(['c', block_b])
+                    # Create a On relations
+                    self.relations_c.append(['o', block_a, block_b])
+                    # Create a Clear relation
+                    self.relations_c.append(['c', block_a])
+                    # Increment state number and yield the step
+                    self.state.num += 1
+                    yield Step(actions[i], 'stack', names[block_a], names[block_b], location.name,
+                               location.name, self.state.num)
+            # If the action is a Move to a location
+            elif actions[i] in self.moves:
+                # Find the location to move to
+                target = self.state.locations[self.moves[actions[i]]]
+                # Save the block being held
+                block_a = self.state.arm.item
+                # If the location is empty, set block_b as EMPTY
+                block_b = EMPTY
+                # Otherwise, save the block that's at the top of the location
+                if not(len(target.stack) == 0):
+                    block_b = target.stack[len(target.stack) - 1]
+                # Move arm to the location
+                self.state.arm.move(target)
+                # Update relations
+                # Remove relations with block_a
+                self.relations_c.remove_block(block_a)
+                # Create an Above relation
+                self.relations_c.append(['a', block_a, block_b])
+                # Increment state number and yield the step
+                self.state.num += 1
+                # Name the blocks of the step
+                if not(block_a is EMPTY):
+                    block_a = names[block_a]
+                if not(block_b is EMPTY):
+                    block_b = names[block_b]
+                yield Step(actions[i], 'move', block_a, block_b, location.name,
+                           target.name, self.state.num)
+            # Otherwise, print an error message
+            else:
+                print("Error: execute_with_output received faulty action.\n")
+
+    ###################################
+    # execute_with_output
+    # Excecutes the given action block, updates the state and it's relations,
+    # and writes a formatted text output to an Output sink.
+    #
+    # Parameters:
+    # self: the Planner object
+    # actions: the ordered list of actions given by make_action_block
+    # output: the Output to write to (the Planner's output if not given)
+    ###################################
+
+    def execute_with_output (self, actions, output=None):
+        # Use the Planner's output unless another output is given
+        out = output
+        if out is None:
+            out = self.output
+        # Only describe actions if the output writes them
+        trace = out.trace
+        text = None
+        for step in self.execute_steps(actions):
+            if trace:
+                text = describe_step(step)
+            out.step(text, self.state)
+        # Write everything buffered for this action block at once
+        out.flush()
+
+    ###################################
+    # check_satisfaction
+    # The last function to be preformed. Checks that every goal relation holds
+    # in the current state (O(1), from the progress tracked by relations_c).
+    #
+    # Parameter:
+    # self: the Planner object
+    #
+    # Return True if all relations are true
+    # Otherwise, return False
+    ###################################
+
+    def check_satisfaction (self):
+        return self.relations_c.missing == 0
+
+    ###################################
+    # progress
+    # Reports how close the current state is to the goal (O(1), from the
+    # progress tracked by relations_c)
+    #
+    # Parameter:
+    # self: the Planner object
+    #
+    # Returns (satisfied, total, well_placed): the number of goal relations
+    # that hold, the number of goal relations and the number of well-placed
+    # blocks
+    ###################################
+
+    def progress (self):
+        total = len(self.relations_g)
+        return total - self.relations_c.missing, total, len(self.relations_c.well_placed)
+
+    ###################################
+    # solve
+    # Runs the whole planning pipeline. For the Table relations, run the
+    # compare_relations function, put the relations to solve for into the
+    # execution_setup function, put the location roles returned from
+    # execution_setup into the make_action_block function, and put the actions
+    # from make_action_block into execute_with_output. Rerun compare_relations
+    # for Table and repeat the sequence until no Table relations are left.
+    # Then complete the same sequence for the On relation. The Clear relations
+    # need no tasks, since the goal progress is tracked as actions are applied
+    # (and a type is done without comparing once all its goal relations hold).
+    #
+    # Since the greedy procedure can cycle on some problems, a limit on the
+    # number of actions and a deadline can be given. Solving stops after the
+    # first action block that takes the plan past the limit or ends past the
+    # deadline. Either way, the Planner's output is finished (see
+    # Output.finish) before returning.
+    #
+    # Parameters:
+    # self: the Planner object
+    # limit: the maximum number of actions to execute (None for no limit)
+    # deadline: the time.perf_counter() time to stop at (None for no
+    # deadline)
+    #
+    # Returns the list of all executed actions in order (longer than limit if
+    # solving was stopped; check_satisfaction tells if the goal was reached)
+    ###################################
+
+    def solve (self, limit=None, deadline=None):
+        plan = []
+        try:
+            # For the Table relations, then the On relations...
+            for type in ['t', 'o']:
+                # While the relations have yet to all be solved for
+                while True:
+                    # If every goal relation of the type holds, there is
+                    # nothing to compare
+                    if self.relations_c.unsatisfied[type] == 0:
+                        break
+                    # Compare the relations
+                    relations = self.compare_relations(type)
+                    # If the relation list is empty, exit the loop
+                    if len(relations) == 0:
+                        break
+                    # For each goal relation...
+                    for i in range(len(relations)):
+                        # Run execution_setup with the given relations and save the outputted roles
+                        roles = self.execution_setup(relations[i])
+                        # Run make_action_block for the given task
+                        actions = self.make_action_block(relations[i], roles)
+                        # Execute actions with output
+                        self.execute_with_output(actions)
+                        plan.extend(actions)
+                        # Stop if the plan has gone past the limit or the deadline
+                        if not(limit is None) and len(plan) > limit:
+                            return plan
+                        if not(deadline is None) and time.perf_counter() >= deadline:
+                            return plan
+                # END OF LOOP
+            return plan
+        finally:
+            # Write the summary of the output (if it has one)
+            self.output.finish()
+
+    ###################################
+    # copy
+    # Creates a Planner that continues from this Planner's current state.
+    # The goal state and its relations never change while solving, so they
+    # are shared; only the current state and its relations (with their goal
+    # progress) are copied. A random generator is copied with its state, so
+    # the copy makes the same choices this Planner would.
+    #
+    # Parameters:
+    # self: the Planner object
+    # output: the Output of the new Planner (an Output that writes nothing
+    # if not given)
+    #
+    # Returns the new Planner object
+    ###################################
+
+    def copy (self, output=None):
+        planner = Planner.__new__(Planner)
+        planner.state = self.state.copy()
+        planner.state_g = self.state_g
+        planner.moves = self.moves
+        planner.names = self.names
+        planner.ids = self.ids
+        planner.relations_c = Relations(list(self.relations_c), self.relations_g)
+        planner.relations_g = self.relations_g
+        planner.output = output
+        if planner.output is None:
+            planner.output = Output('none')
+        planner.stats = None
+        planner.rng = None
+        if not(self.rng is None):
+            planner.rng = random.Random()
+            planner.rng.setstate(self.rng.getstate())
+        return planner
+
+    ###################################
+    # plan
+    # Runs the whole pipeline of solve as a dry run on a copy of the Planner,
+    # so nothing is written and this Planner's state is left as it was (it can
+    # still plan again or execute the plan).
+    #
+    # Parameters:
+    # self: the Planner object
+    # limit: the maximum number of actions (see solve)
+    #
+    # Returns (actions, state) where actions is the list of all actions of the
+    # plan and state is the State reached by the plan
+    ###################################
+
+    def plan (self, limit=None):
+        planner = self.copy()
+        actions = planner.solve(limit)
+        return actions, planner.state
+
+    ###################################
+    # instrument
+    # Starts recording statistics for each phase of the pipeline (see
+    # time_phases): compare_relations, search4relations, search4block,
+    # execution_setup, make_action_block, execute_with_output (which includes
+    # the relation rewrites) and the current state's format_state (the
+    # rendering of print_state and the Output). Planners that are not
+    # instrumented run without any timing code.
+    #
+    # Parameter:
+    # self: the Planner object
+    #
+    # Returns the stats dict (also kept as self.stats), which is updated as
+    # the Planner runs
+    ###################################
+
+    def instrument (self):
+        self.stats = time_phases(self, PHASES)
+        self.stats.update(time_phases(self.state, ['format_state']))
+        return self.stats
+
+# END OF Planner CLASS
+
+# A rough upper bound on the seconds needed to free one state generated by
+# a search, so searches with a deadline can stop in time to clean up
+RELEASE_TIME = 1e-6
+
+# The phases of the Planner pipeline recorded by Planner.instrument
+PHASES = ['compare_relations', 'search4relations', 'search4block', 'execution_setup',
+          'make_action_block', 'execute_with_output']
+
+#######################################
+# AStarPlanner class
+# An optional planner that finds a shortest plan with A* search over the
+# same action model as the State and Arm classes (u, d, m1, m2, ...), as an
+# alternative to the greedy Planner.
+#
+# Search states are CompactState objects. States already expanded are kept
+# in a closed set so that no state is expanded twice.
+#
+# The heuristic counts the blocks that are not "well placed" (a block is
+# well placed if it is on its goal support and that support is well placed,
+# or it is on the table as in the goal). Each such block must at least be
+# picked up, carried by a move and put down, which takes 3 actions that no
+# other block can share, and a held block needs at least a put down. The
+# heuristic never overestimates, so the first goal state expanded gives a
+# shortest plan.
+#
+# Class variables:
+# start: the initial search state
+# goal_below: the goal support of each block (EMPTY for the table)
+# expanded: the number of states expanded by the last plan call
+# generated: the number of states generated by the last plan call
+# exhausted: True if the last plan call ran out of states to expand (so no
+# plan exists within its bound)
+# timed_out: True if the last plan call was stopped by its deadline
+#######################################
+
+class AStarPlanner:
+
+    ###################################
+    # Constructor
+    # Initializes the AStarPlanner object
+    #
+    # Parameters:
+    # self: the AStarPlanner object
+    # stacks: the stacks of the initial state's locations followed by the
+    # stacks of the goal state's locations (as for the Planner)
+    #
+    # Raises a ValueError if the states do not have the same number of
+    # locations
+    ###################################
+
+    def __init__ (self, *stacks):
+        if not(len(stacks) % 2 == 0) or len(stacks) == 0:
+            raise ValueError("the AStarPlanner needs the same number of initial and goal stacks")
+        count = len(stacks) // 2
+        # The arm starts empty at L1, as in the State class
+        self.start = CompactState.from_state(make_state([stack[:] for stack in stacks[:count]]))
+        # Search states name blocks by their names (see State.name), so the
+        # goal supports are keyed the same way
+        self.goal_below = {}
+        for stack in stacks[count:]:
+            names = [sys.intern(str(block)) for block in stack]
+            for i in range(len(names)):
+                if i == 0:
+                    self.goal_below[names[i]] = EMPTY
+                else:
+                    self.goal_below[names[i]] = names[i - 1]
+        self.expanded = 0
+        self.generated = 0
+        self.exhausted = False
+        self.timed_out = False
+
+    ###################################
+    # heuristic
+    # Estimates the number of actions left to reach the goal from a state
+    # without overestimating it
+    #
+    # Parameters:
+    # self: the AStarPlanner object
+    # state: the search state
+    #
+    # Returns the estimate (0 only for goal states)
+    ###################################
+
+    def heuristic (self, state):
+        stacks = state.stacks
+        arm = state.arm
+        held = state.held
+        estimate = 0
+        for stack in stacks:
+            # Walk up the stack while the blocks are well placed
+            below = EMPTY
+            for i in range(len(stack)):
+                if not(self.goal_below[stack[i]] == below):
+                    # Every block from here up has to be moved
+                    estimate += 3 * (len(stack) - i)
+                    break
+                below = stack[i]
+        if not(held is None):
+            # The held block needs a move first unless it can be put down
+            # well placed at the arm's location
+            top = EMPTY
+            if not(len(stacks[arm]) == 0):
+                top = stacks[arm][len(stacks[arm]) - 1]
+            if self.goal_below[held] == top and self.heuristic_clear(stacks[arm]):
+                estimate += 1
+            else:
+                estimate += 2
+        return estimate
+
+    ###################################
+    # heuristic_clear
+    # Returns True if every block of a stack is well placed
+    #
+    # Parameters:
+    # self: the AStarPlanner object
+    # stack: the stack to check
+    ###################################
+
+    def heuristic_clear (self, stack):
+        below = EMPTY
+        for i in range(len(stack)):
+            if not(self.goal_below[stack[i]] == below):
+                return False
+            below = stack[i]
+        return True
+
+    ###################################
+    # plan
+    # Searches for a shortest plan from the initial state to the goal.
+    #
+    # With a weight above 1, states are ordered by g + weight * h (weighted
+    # A*), which expands fewer states and finds a plan at most weight times
+    # longer than a shortest plan. With a bound, states that cannot lead to a
+    # plan shorter than the bound (g + h >= bound) are pruned, so only plans
+    # shorter than the bound are found.
+    #
+    # Parameters:
+    # self: the AStarPlanner object
+    # max_nodes: the maximum number of states to expand (None for no limit)
+    # weight: the weight of the heuristic (1 for shortest plans)
+    # bound: the length that plans must be shorter than (None for no bound)
+    # deadline: the time.perf_counter() time to return by (None for no
+    # deadline)
+    #
+    # Returns the list of actions of a plan
+    # Returns None if no plan is found within max_nodes expansions, the bound
+    # or the deadline
+    ###################################
+
+    def plan (self, max_nodes=None, weight=1, bound=None, deadline=None):
+        self.expanded = 0
+        self.generated = 1
+        self.exhausted = False
+        self.timed_out = False
+        # The best known cost and the parent link of each generated state
+        cost = {self.start: 0}
+        parent = {self.start: None}
+        closed = set()
+        if not(bound is None) and self.heuristic(self.start) >= bound:
+            self.exhausted = True
+            return None
+        # Ties on f are broken towards deeper states, then by insertion order
+        counter = 0
+        frontier = [(weight * self.heuristic(self.start), 0, counter, self.start)]
+        while not(len(frontier) == 0):
+            f, g, n, state = heapq.heappop(frontier)
+            g = -g
+            # Skip duplicates of states that were already expanded
+            if state in closed:
+                continue
+            # The heuristic is 0 only at a goal state
+            if f == g:
+                # Follow the parent links back to the initial state
+                actions = []
+                while not(parent[state] is None):
+                    state, action = parent[state]
+                    actions.append(action)
+                actions.reverse()
+                return actions
+            if not(max_nodes is None) and self.expanded >= max_nodes:
+                return None
+            # Look at the clock before every expansion, leaving time to free
+            # the states generated so far
+            if not(deadline is None) and time.perf_counter() + self.generated * RELEASE_TIME >= deadline:
+                self.timed_out = True
+                return None
+            closed.add(state)
+            self.expanded += 1
+            for action, child in state.successors():
+                if child in closed:
+                    continue
+                if child in cost and cost[child] <= g + 1:
+                    continue
+                estimate = self.heuristic(child)
+                # Prune states that cannot lead to a plan shorter than the bound
+                if not(bound is None) and g + 1 + estimate >= bound:
+                    continue
+                cost[child] = g + 1
+                parent[child] = (state, action)
+                counter += 1
+                self.generated += 1
+                heapq.heappush(frontier, (g + 1 + weight * estimate, -(g + 1), counter, child))
+        self.exhausted = True
+        return None
+
+#######################################
+# BidirectionalPlanner class
+# An optional planner that finds a shortest plan with breadth-first search
+# from both ends at once: forward from the initial state with the primitive
+# actions, and backward from the goal states with their inverses (see
+# CompactState.predecessors). The smaller frontier is grown by one whole
+# layer at a time, and every new state is looked up in the states seen by
+# the other side. The search stops after the first layer that meets the
+# other side, and the two halves of the best meeting are spliced together.
+#
+# The goal only fixes the towers (get_relations does not name locations),
+# so the backward search starts from every placement of the goal towers on
+# the locations, with the arm empty at each location. Only the first
+# max_goals of these states are used; with fewer than all of them the plan
+# is still valid but may not be the shortest.
+#
+# Class variables:
+# start: the initial search state
+# goals: the goal states the backward search starts from
+# complete: True if every goal state is used (so plans are the shortest)
+# expanded: the number of states expanded by the last plan call
+# forward_frontiers: the size of each forward layer expanded by the last
+# plan call
+# backward_frontiers: the size of each backward layer expanded by the last
+# plan call
+# meeting: the (forward, backward) depths at which the last plan call met,
+# or None
+# timed_out: True if the last plan call was stopped by its deadline
+#######################################
+
+class BidirectionalPlanner:
+
+    ###################################
+    # Constructor
+    # Initializes the BidirectionalPlanner object
+    #
+    # Parameters:
+    # self: the BidirectionalPlanner object
+    # stacks: the stacks of the initial state's locations followed by the
+    # stacks of the goal state's locations (as for the Planner)
+    # max_goals: the most goal states to start the backward search from
+    #
+    # Raises a ValueError if the states do not have the same number of
+    # locations
+    ###################################
+
+    def __init__ (self, *stacks, max_goals=20000):
+        if not(len(stacks) % 2 == 0) or len(stacks) == 0:
+            raise ValueError("the BidirectionalPlanner needs the same number of initial and goal stacks")
+        count = len(stacks) // 2
+        # The arm starts empty at L1, as in the State class
+        self.start = CompactState.from_state(make_state([stack[:] for stack in stacks[:count]]))
+        towers = []
+        for stack in stacks[count:]:
+            if not(len(stack) == 0):
+                towers.append(tuple([sys.intern(str(block)) for block in stack]))
+        self.goals = []
+        self.complete = True
+        for places in itertools.permutations(range(count), len(towers)):
+            if len(self.goals) >= max_goals:
+                self.complete = False
+                break
+            goal = [()] * count
+            for i in range(len(towers)):
+                goal[places[i]] = towers[i]
+            for arm in range(count):
+                self.goals.append(CompactState(tuple(goal), arm, None))
+        self.expanded = 0
+        self.forward_frontiers = []
+        self.backward_frontiers = []
+        self.meeting = None
+        self.timed_out = False
+
+    ###################################
+    # plan
+    # Searches for a shortest plan from the initial state to the goal
+    #
+    # Parameters:
+    # self: the BidirectionalPlanner object
+    # max_nodes: the maximum number of states to expand (None for no limit)
+    # deadline: the time.perf_counter() time to return by (None for no
+    # deadline)
+    #
+    # Returns the list of actions of a shortest plan
+    # Returns None if the goal cannot be reached within max_nodes expansions
+    # or the deadline
+    ###################################
+
+    def plan (self, max_nodes=None, deadline=None):
+        self.expanded = 0
+        self.forward_frontiers = []
+        self.backward_frontiers = []
+        self.meeting = None
+        self.timed_out = False
+        # Each side links a state to (neighbor, action, depth): the forward
+        # links lead back to the start and the backward links on to a goal
+        forward = {self.start: (None, None, 0)}
+        backward = {}
+        for goal in self.goals:
+            backward[goal] = (None, None, 0)
+        if self.start in backward:
+            self.meeting = (0, 0)
+            return []
+        forward_layer = [self.start]
+        backward_layer = list(self.goals)
+        while not(len(forward_layer) == 0) and not(len(backward_layer) == 0):
+            # Grow the smaller frontier by one layer
+            if len(forward_layer) <= len(backward_layer):
+                layer = forward_layer
+                seen = forward
+                other = backward
+                self.forward_frontiers.append(len(layer))
+            else:
+                layer = backward_layer
+                seen = backward
+                other = forward
+                self.backward_frontiers.append(len(layer))
+            if not(max_nodes is None) and self.expanded + len(layer) > max_nodes:
+                return None
+            depth = seen[layer[0]][2] + 1
+            following = []
+            best = None
+            for state in layer:
+                # Look at the clock before every expansion, leaving time to
+                # free the states seen so far
+                if not(deadline is None) and time.perf_counter() + (len(forward) + len(backward)) * RELEASE_TIME >= deadline:
+                    self.timed_out = True
+                    return None
+                self.expanded += 1
+                if seen is forward:
+                    neighbors = state.successors()
+                else:
+                    neighbors = state.predecessors()
+                for action, child in neighbors:
+                    if child in seen:
+                        continue
+                    seen[child] = (state, action, depth)
+                    following.append(child)
+                    # Keep the meeting with the shortest spliced plan
+                    if child in other:
+                        if best is None or other[child][2] < other[best][2]:
+                            best = child
+            if not(best is None):
+                return self.splice(forward, backward, best)
+            if seen is forward:
+                forward_layer = following
+            else:
+                backward_layer = following
+        return None
+
+    ###################################
+    # splice
+    # Joins the forward and backward halves of a plan at a meeting state
+    #
+    # Parameters:
+    # self: the BidirectionalPlanner object
+    # forward: the forward links of the search
+    # backward: the backward links of the search
+    # state: the meeting state
+    #
+    # Returns the list of actions from the start to a goal state
+    ###################################
+
+    def splice (self, forward, backward, state):
+        self.meeting = (forward[state][2], backward[state][2])
+        # Follow the forward links back to the start
+        actions = []
+        current = state
+        while not(forward[current][0] is None):
+            current, action, depth = forward[current]
+            actions.append(action)
+        actions.reverse()
+        # Follow the backward links on to a goal state
+        current = state
+        while not(backward[current][0] is None):
+            current, action, depth = backward[current]
+            actions.append(action)
+        return actions
+
+#######################################
+# PlanCache class
+# A cache of plans keyed by a canonical encoding of the planning mode and
+# the initial and goal stacks. The most recently used plans are kept in
+# memory up to a fixed number of entries (the least recently used plan is
+# evicted first). If a path is given, plans are also stored in an SQLite
+# file on local disk, which is shared by every run and process that opens
+# the same path, and plans that are not in memory are looked up there.
+#
+# Class variables:
+# capacity: the maximum number of plans kept in memory
+# path: the path of the on-disk store (None for memory only)
+# entries: the plans kept in memory (oldest first) keyed by cache key
+# database: the connection to the on-disk store (None for memory only)
+# hits: the number of lookups that found a plan
+# disk_hits: the number of hits that were found in the on-disk store
+# misses: the number of lookups that did not find a plan
+# evictions: the number of plans dropped from memory
+#######################################
+
+class PlanCache:
+
+    ###############################
+    # Constructor
+    # Initializes the PlanCache object
+    #
+    # Parameters:
+    # self: the PlanCache object
+    # capacity: the maximum number of plans kept in memory
+    # path: the path of the on-disk store (None for memory only)
+    #
+    # Raises a RuntimeError if a path is given but sqlite3 is not available
+    ###############################
+
+    def __init__(self, capacity=4096, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.entries = collections.OrderedDict()
+        self.database = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if not(path is None):
+            if sqlite3 is None:
+                raise RuntimeError("the on-disk plan cache needs the sqlite3 module")
+            # Commit every write at once so that other processes see it, and
+            # wait for other writers instead of failing
+            self.database = sqlite3.connect(path, timeout=30, isolation_level=None)
+            self.database.execute("CREATE TABLE IF NOT EXISTS plans "
+                                  "(key TEXT PRIMARY KEY, plan TEXT NOT NULL)")
+
+    ###############################
+    # key
+    # Builds the cache key of a problem
+    #
+    # Parameters:
+    # self: the PlanCache object
+    # initial: the initial stacks
+    # goal: the goal stacks
+    # mode: the planning mode (plans of each mode are kept apart)
+    #
+    # Returns the key as a string
+    ###############################
+
+    def key(self, initial, goal, mode='greedy'):
+        return json.dumps([mode, initial, goal], separators=(',', ':'))
+
+    ###############################
+    # get
+    # Looks up the plan of a key, in memory and then in the on-disk store
+    #
+    # Parameters:
+    # self: the PlanCache object
+    # key: the cache key
+    #
+    # Returns a copy of the list of actions of the plan
+    # Returns None if the plan is not cached
+    ###############################
+
+    def get(self, key):
+        plan = self.entries.get(key)
+        if not(plan is None):
+            # Mark the plan as the most recently used
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return list(plan)
+        if not(self.database is None):
+            row = self.database.execute("SELECT plan FROM plans WHERE key = ?", (key,)).fetchone()
+            if not(row is None):
+                plan = tuple(row[0].split())
+                self.remember(key, plan)
+                self.hits += 1
+                self.disk_hits += 1
+                return list(plan)
+        self.misses += 1
+        return None
+
+    ###############################
+    # put
+    # Stores the plan of a key in memory and in the on-disk store
+    #
+    # Parameters:
+    # self: the PlanCache object
+    # key: the cache key
+    # plan: the list of actions of the plan
+    ###############################
+
+    def put(self, key, plan):
+        self.remember(key, tuple(plan))
+        if not(self.database is None):
+            self.database.execute("INSERT OR REPLACE INTO plans (key, plan) VALUES (?, ?)",
+                                  (key, " ".join(plan)))
+
+    ###############################
+    # remember
+    # Stores a plan in memory, evicting the least recently used plans if the
+    # cache is full
+    #
+    # Parameters:
+    # self: the PlanCache object
+    # key: the cache key
+    # plan: the tuple of actions of the plan
+    ###############################
+
+    def remember(self, key, plan):
+        if self.capacity <= 0:
+            return
+        self.entries[key] = plan
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    ###############################
+    # stats
+    # Returns the counters of the cache as a dict with the entries "hits",
+    # "disk_hits", "misses", "evictions" and "size" (the plans in memory)
+    #
+    # Parameter:
+    # self: the PlanCache object
+    ###############################
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self.entries)}
+
+    ###############################
+    # close
+    # Closes the on-disk store (the memory cache can still be used)
+    #
+    # Parameter:
+    # self: the PlanCache object
+    ###############################
+
+    def close(self):
+        if not(self.database is None):
+            self.database.close()
+            self.database = None
+
+# The plan caches of this process keyed by (capacity, path), so that each
+# worker process of a batch keeps its caches from chunk to chunk
+caches = {}
+
+#######################################
+# get_cache
+# Returns the plan cache chosen by a settings dict, creating it on first
+# use. The settings entries are as follows:
+# "cache_size": the maximum number of plans kept in memory (0 for none)
+# "cache_path": the path of the on-disk store (None for memory only)
+# No cache is used if both are left out.
+#
+# Parameter:
+# settings: the settings dict (None for the defaults)
+#
+# Returns the PlanCache object
+# Returns None if the settings do not ask for a cache
+#######################################
+
+def get_cache(settings):
+    if settings is None:
+        return None
+    size = settings.get("cache_size", 0)
+    path = settings.get("cache_path")
+    if size <= 0 and path is None:
+        return None
+    if not((size, path) in caches):
+        caches[(size, path)] = PlanCache(size, path)
+    return caches[(size, path)]
+
+#######################################
+# parse_stack
+# Converts the text of a stack in the "x,y,z" format (bottom to top) into a
+# list of blocks. Lists of blocks are returned as a copy.
+#
+# Parameter:
+# stack: the text of the stack, or a list of blocks
+#
+# Returns the list of blocks in the stack (empty for an empty stack)
+#######################################
+
+def parse_stack(stack):
+    # Lists are already parsed
+    if isinstance(stack, list):
+        return [str(block) for block in stack]
+    # Reformat the input to a list
+    blocks = stack.split(',')
+    # Remove '' from empty stacks
+    if len(blocks) != 0:
+        if blocks[0] == '':
+            blocks = []
+    return blocks
+
+#######################################
+# copy_stacks
+# Copies a list of stacks (make_state takes ownership of the lists it is
+# given, and a State changes them as actions are executed)
+#
+# Parameter:
+# stacks: the list of stacks to copy
+#
+# Returns the copied list of stacks
+#######################################
+
+def copy_stacks(stacks):
+    return [stack[:] for stack in stacks]
+
+#######################################
+# read_stacks
+# Reads and checks the initial and goal stacks of a problem of the batch
+# format. A problem is a dict with the following form:
+# {"id": (optional id), "initial": [L1, L2, ...], "goal": [L1, L2, ...]}
+# where each stack is a list of blocks or "x,y,z" text (bottom to top). Both
+# states need the same number of locations, and at least 3.
+#
+# Parameter:
+# problem: the problem to read
+#
+# Returns the initial and goal stacks as two lists of lists of blocks
+# Raises a KeyError if a state is missing, and a ValueError if the states
+# cannot be solved by the Planner
+#######################################
+
+def read_stacks(problem):
+    initial = [parse_stack(stack) for stack in problem["initial"]]
+    goal = [parse_stack(stack) for stack in problem["goal"]]
+    if not(len(initial) == len(goal)):
+        raise ValueError("the initial and goal states have different numbers of stacks")
+    if len(initial) < 3:
+        raise ValueError("problems need at least 3 stacks")
+    # The Planner cannot terminate unless both states hold the same blocks
+    blocks = [block for stack in initial for block in stack]
+    if not(len(set(blocks)) == len(blocks)):
+        raise ValueError("the initial state repeats a block")
+    if not(sorted(blocks) == sorted([block for stack in goal for block in stack])):
+        raise ValueError("the initial and goal states hold different blocks")
+    return initial, goal
+
+#######################################
+# canonicalize
+# Maps a problem to a canonical form, so that problems that only differ by
+# the names of their blocks or by the order of the interchangeable
+# locations get the same canonical form and can share a plan.
+#
+# The arm starts at L1, so L1 keeps its place, and the other locations are
+# ordered by the height of their stacks (highest first). Locations with
+# stacks of the same height are interchangeable, so each of their orders is
+# tried (up to max_permutations orders in all; after that, the locations of
+# a group are kept in their given order). For each order, the blocks are
+# renamed b0, b1, ... in order of appearance in the initial stacks, and the
+# order that gives the smallest goal is kept. Goals only ask for towers and
+# not for the location of a tower, so the goal towers are sorted and the
+# empty goal stacks are put last.
+#
+# Parameters:
+# initial: the initial stacks
+# goal: the goal stacks (with the same blocks as initial)
+# max_permutations: the maximum number of location orders to try
+#
+# Returns (initial, goal, relabeling) where initial and goal are the
+# canonical stacks and relabeling is a dict with the following entries:
+# "locations": the position in the given stacks of each canonical location
+# "blocks": the given name of each canonical block
+#######################################
+
+def canonicalize(initial, goal, max_permutations=720):
+    count = len(initial)
+    # Group the locations after L1 by the height of their stacks
+    heights = sorted(set([len(initial[k]) for k in range(1, count)]), reverse=True)
+    groups = [[k for k in range(1, count) if len(initial[k]) == height] for height in heights]
+    # Find the orders to try for each group (empty stacks are all alike, so
+    # their order never matters)
+    choices = []
+    total = 1
+    for group in groups:
+        orders = math.factorial(len(group))
+        if len(initial[group[0]]) == 0 or total * orders > max_permutations:
+            choices.append([group])
+        else:
+            choices.append(list(itertools.permutations(group)))
+            total *= orders
+    best = None
+    for parts in itertools.product(*choices):
+        order = [0] + [k for part in parts for k in part]
+        # Number the blocks in order of appearance
+        number = {}
+        for k in order:
+            for block in initial[k]:
+                number[block] = len(number)
+        # The initial stacks are numbered the same way for every order, so
+        # the orders only differ by their goals
+        towers = sorted([[number[block] for block in stack] for stack in goal if len(stack) != 0])
+        if best is None or towers < best[0]:
+            best = (towers, order, number)
+    towers, order, number = best
+    names = ['b' + str(i) for i in range(len(number))]
+    canonical_initial = [[names[number[block]] for block in initial[k]] for k in order]
+    canonical_goal = ([[names[i] for i in tower] for tower in towers] +
+                      [[] for k in range(len(goal) - len(towers))])
+    blocks = {}
+    for block in number:
+        blocks[names[number[block]]] = block
+    return canonical_initial, canonical_goal, {"locations": order, "blocks": blocks}
+
+#######################################
+# translate_plan
+# Translates a plan of a canonical problem back to the problem it came from
+# (only the moves change, since actions do not name blocks)
+#
+# Parameters:
+# plan: the list of actions for the canonical problem
+# relabeling: the relabeling returned by canonicalize
+#
+# Returns the list of actions for the given problem
+#######################################
+
+def translate_plan(plan, relabeling):
+    order = relabeling["locations"]
+    moves = {}
+    for k in range(len(order)):
+        moves['m' + str(k + 1)] = 'm' + str(order[k] + 1)
+    return [moves.get(action, action) for action in plan]
+
+#######################################
+# optimize_plan
+# Removes redundant actions from a complete plan in one pass. The actions
+# kept so far are a stack, and each new action is checked against the top:
+# - a move right after a move replaces it (only the last move matters)
+# - a move to the arm's current location is dropped
+# - a pick up right after a put down (or a put down right after a pick up)
+# cancels it, since no move was made in between
+# Dropping actions can bring new pairs together (such as "m1 u m1 d" with
+# the arm at L1), which are then removed as well. The final state, including
+# the arm's location, is the same as for the given plan.
+#
+# Parameters:
+# plan: the list of actions
+# arm: the index of the arm's location before the plan (0 for L1)
+#
+# Returns the optimized list of actions (the actions saved are the
+# difference in length)
+#######################################
+
+def optimize_plan(plan, arm=0):
+    kept = []
+    # The arm's location after each kept action (and before the first)
+    arms = [arm]
+    for action in plan:
+        top = ''
+        if not(len(kept) == 0):
+            top = kept[len(kept) - 1]
+        if action == 'u' or action == 'd':
+            # Cancel a pick up and put down pair at the same location
+            if (action == 'u' and top == 'd') or (action == 'd' and top == 'u'):
+                kept.pop()
+                arms.pop()
+            else:
+                kept.append(action)
+                arms.append(arms[len(arms) - 1])
+        else:
+            # Only the last of a run of moves matters
+            if top[:1] == 'm':
+                kept.pop()
+                arms.pop()
+            k = int(action[1:]) - 1
+            # Skip moves to the arm's current location
+            if not(arms[len(arms) - 1] == k):
+                kept.append(action)
+                arms.append(k)
+    return kept
+
+#######################################
+# PlanCheck
+# The result of validate_plan
+#
+# Fields:
+# legal: True if every action of the plan was possible
+# satisfied: True if every goal relation holds after the plan (False if an
+# action was not possible)
+# step: the position of the first illegal action (the plan's length if
+# every action was possible)
+# action: the first illegal action (EMPTY if every action was possible)
+# error: the reason the action was not possible (EMPTY if every action was
+# possible)
+# state: the CompactState reached before the first illegal action (or at
+# the end of the plan)
+#######################################
+
+PlanCheck = collections.namedtuple('PlanCheck', ['legal', 'satisfied', 'step', 'action', 'error', 'state'])
+
+#######################################
+# validate_plan
+# Replays a plan from an initial configuration on plain lists, without a
+# Planner or any output, and checks the goal at the end with the same
+# relations as get_relations (every goal stack must be a whole stack of
+# the final state, at any location). Replay stops at the first action that
+# is not possible.
+#
+# Parameters:
+# initial: the initial stacks
+# goal: the goal stacks
+# plan: the list of actions
+# arm: the index of the arm's location before the plan (0 for L1)
+# held: the block held before the plan (EMPTY if the arm is empty)
+#
+# Returns a PlanCheck
+#######################################
+
+def validate_plan(initial, goal, plan, arm=0, held=EMPTY):
+    stacks = [list(stack) for stack in initial]
+    moves = {}
+    for k in range(len(stacks)):
+        moves['m' + str(k + 1)] = k
+    error = EMPTY
+    step = 0
+    for action in plan:
+        if action == 'u':
+            if not(held is EMPTY):
+                error = "pick up while holding " + str(held)
+                break
+            if len(stacks[arm]) == 0:
+                error = "pick up from the empty stack at L" + str(arm + 1)
+                break
+            held = stacks[arm].pop()
+        elif action == 'd':
+            if held is EMPTY:
+                error = "put down with an empty arm"
+                break
+            stacks[arm].append(held)
+            held = EMPTY
+        else:
+            k = moves.get(action)
+            if k is None:
+                error = "unknown action " + str(action)
+                break
+            arm = k
+        step += 1
+    state = CompactState(tuple([tuple(stack) for stack in stacks]), arm, held)
+    if not(error is EMPTY):
+        return PlanCheck(False, False, step, plan[step], error, state)
+    # Every goal stack must be a whole stack of the final state
+    current = set(state.stacks)
+    satisfied = True
+    for stack in goal:
+        if not(len(stack) == 0) and not(tuple(stack) in current):
+            satisfied = False
+            break
+    return PlanCheck(True, satisfied, step, EMPTY, EMPTY, state)
+
+#######################################
+# Plan archives
+# A compact binary file format for storing many plans. A file starts with
+# the bytes of ARCHIVE_MAGIC, followed by one record per plan. Each record
+# is the length of its body as a varint (so readers can skip it), then the
+# body:
+# - the plan id (a varint byte length, then UTF-8 text)
+# - the number of locations K, the bits per action (4 or 8) and the number
+#   of actions, as varints
+# - the packed actions: 'u' is 0, 'd' is 1 and 'mK' is K + 1, two actions
+#   per byte with 4 bits (low bits first), one per byte with 8 bits
+# - the block names (a varint count, then each name as text)
+# - the initial state (a varint 1 followed by a state, or 0 if left out)
+# - the snapshots (a varint count, then the number of actions applied and
+#   the state after them for each)
+# A state is the arm's location, the held block (0 if the arm is empty,
+# otherwise the block's position in the names plus 1), then for each
+# location its number of blocks and their positions in the names (bottom to
+# top), all as varints.
+#######################################
+
+ARCHIVE_MAGIC = b'WOBPLAN1'
+
+#######################################
+# write_varint
+# Appends a non-negative integer to a buffer as a little-endian base-128
+# varint (7 bits per byte, high bit set on every byte but the last)
+#
+# Parameters:
+# buffer: the bytearray to append to
+# number: the integer to append
+#######################################
+
+def write_varint(buffer, number):
+    while number >= 0x80:
+        buffer.append((number & 0x7f) | 0x80)
+        number >>= 7
+    buffer.append(number)
+
+#######################################
+# read_varint
+# Reads a varint written by write_varint
+#
+# Parameters:
+# data: the bytes (or memory map) to read from
+# offset: the position of the varint
+#
+# Returns (number, offset) where offset is the position after the varint
+#######################################
+
+def read_varint(data, offset):
+    number = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, offset
+        shift += 7
+
+#######################################
+# PlanWriter class
+# Streams plans to a plan archive (see Plan archives), one record per call
+# to write. Records go straight to the file, so memory use does not depend
+# on the number of plans.
+#
+# Class variables:
+# path: the path of the archive
+# stream: the open file (None once closed)
+# snapshot_every: the number of actions between state snapshots (0 for no
+# snapshots)
+# count: the number of plans written
+#######################################
+
+class PlanWriter:
+
+    ###############################
+    # Constructor
+    # Creates (or replaces) a plan archive
+    #
+    # Parameters:
+    # self: the PlanWriter object
+    # path: the path of the archive
+    # snapshot_every: the number of actions between state snapshots (0 for
+    # no snapshots; snapshots need the initial stacks of each plan)
+    ###############################
+
+    def __init__(self, path, snapshot_every=0):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.count = 0
+        self.stream = open(path, 'wb')
+        self.stream.write(ARCHIVE_MAGIC)
+
+    ###############################
+    # write
+    # Appends a plan to the archive
+    #
+    # Parameters:
+    # self: the PlanWriter object
+    # plan: the list of actions
+    # id: the plan id (the plan's position in the archive if not given)
+    # initial: the initial stacks of the plan (None to leave out the initial
+    # state and the snapshots)
+    # locations: the number of locations (taken from initial if not given,
+    # or from the highest move of the plan, at least 3)
+    #
+    # Raises a ValueError if an action is unknown or there are more than 254
+    # locations
+    ###############################
+
+    def write(self, plan, id=None, initial=None, locations=None):
+        if id is None:
+            id = self.count
+        if locations is None:
+            if initial is None:
+                locations = 3
+                for action in plan:
+                    if len(action) > 1 and action[1:].isdigit():
+                        locations = max(locations, int(action[1:]))
+            else:
+                locations = len(initial)
+        codes = {'u': 0, 'd': 1}
+        for k in range(locations):
+            codes['m' + str(k + 1)] = k + 2
+        body = bytearray()
+        text = str(id).encode('utf-8')
+        write_varint(body, len(text))
+        body.extend(text)
+        # Pack the actions in 4 bits while the codes fit
+        bits = 4
+        if locations + 1 >= 16:
+            bits = 8
+        if locations + 1 > 255:
+            raise ValueError("plan archives hold at most 254 locations")
+        write_varint(body, locations)
+        write_varint(body, bits)
+        write_varint(body, len(plan))
+        packed = bytearray((len(plan) * bits + 7) // 8)
+        for i in range(len(plan)):
+            code = codes.get(plan[i])
+            if code is None:
+                raise ValueError("unknown action: " + str(plan[i]))
+            if bits == 8:
+                packed[i] = code
+            else:
+                packed[i >> 1] |= code << (4 * (i & 1))
+        body.extend(packed)
+        if initial is None:
+            write_varint(body, 0)
+            write_varint(body, 0)
+            write_varint(body, 0)
+        else:
+            # Number the blocks in order of appearance
+            names = []
+            for stack in initial:
+                names.extend(stack)
+            ids = {}
+            for i in range(len(names)):
+                ids[names[i]] = i
+            write_varint(body, len(names))
+            for name in names:
+                text = str(name).encode('utf-8')
+                write_varint(body, len(text))
+                body.extend(text)
+            state = CompactState(tuple([tuple(stack) for stack in initial]), 0, None)
+            write_varint(body, 1)
+            self.write_state(body, state, ids)
+            # Replay the plan for the snapshots (up to the first illegal action)
+            snapshots = []
+            if self.snapshot_every > 0:
+                for i in range(len(plan)):
+                    state = state.apply(plan[i])
+                    if state is None:
+                        break
+                    if (i + 1) % self.snapshot_every == 0:
+                        snapshots.append((i + 1, state))
+            write_varint(body, len(snapshots))
+            for step, snapshot in snapshots:
+                write_varint(body, step)
+                self.write_state(body, snapshot, ids)
+        header = bytearray()
+        write_varint(header, len(body))
+        self.stream.write(header)
+        self.stream.write(body)
+        self.count += 1
+
+    ###############################
+    # write_state
+    # Appends a state to a record body
+    #
+    # Parameters:
+    # self: the PlanWriter object
+    # body: the bytearray of the record body
+    # state: the CompactState
+    # ids: the position of each block name in the record's names
+    ###############################
+
+    def write_state(self, body, state, ids):
+        write_varint(body, state.arm)
+        if state.held is None:
+            write_varint(body, 0)
+        else:
+            write_varint(body, ids[state.held] + 1)
+        for stack in state.stacks:
+            write_varint(body, len(stack))
+            for block in stack:
+                write_varint(body, ids[block])
+
+    ###############################
+    # close
+    # Flushes and closes the archive
+    #
+    # Parameter:
+    # self: the PlanWriter object
+    ###############################
+
+    def close(self):
+        if not(self.stream is None):
+            self.stream.close()
+            self.stream = None
+
+    ###############################
+    # __enter__ and __exit__
+    # Let the object be used in a with statement, which closes it at the end
+    ###############################
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        self.close()
+
+#######################################
+# PlanRecord class
+# One plan of a PlanReader. Only the id, sizes and positions of the record
+# are read up front; the actions, names and states are decoded from the
+# memory map on demand.
+#
+# Class variables:
+# data: the memory map of the archive
+# id: the plan id
+# locations: the number of locations
+# bits: the bits per action
+# count: the number of actions
+# start: the position of the packed actions
+# extra: the position of the block names (after the packed actions)
+#######################################
+
+class PlanRecord:
+
+    ###############################
+    # Constructor
+    # Reads the header of a record body
+    #
+    # Parameters:
+    # self: the PlanRecord object
+    # data: the memory map of the archive
+    # offset: the position of the record body
+    ###############################
+
+    def __init__(self, data, offset):
+        self.data = data
+        length, offset = read_varint(data, offset)
+        self.id = bytes(data[offset:offset + length]).decode('utf-8')
+        offset += length
+        self.locations, offset = read_varint(data, offset)
+        self.bits, offset = read_varint(data, offset)
+        self.count, offset = read_varint(data, offset)
+        self.start = offset
+        self.extra = offset + (self.count * self.bits + 7) // 8
+
+    ###############################
+    # action
+    # Decodes one action of the plan
+    #
+    # Parameters:
+    # self: the PlanRecord object
+    # i: the position of the action
+    #
+    # Returns the action ('u', 'd' or 'mK')
+    ###############################
+
+    def action(self, i):
+        if self.bits == 8:
+            code = self.data[self.start + i]
+        else:
+            code = (self.data[self.start + (i >> 1)] >> (4 * (i & 1))) & 0xf
+        if code == 0:
+            return 'u'
+        if code == 1:
+            return 'd'
+        return 'm' + str(code - 1)
+
+    ###############################
+    # actions
+    # Decodes the actions of the plan one at a time
+    #
+    # Parameters:
+    # self: the PlanRecord object
+    # start: the position of the first action to decode
+    #
+    # Yields the actions in order
+    ###############################
+
+    def actions(self, start=0):
+        for i in range(start, self.count):
+            yield self.action(i)
+
+    ###############################
+    # states
+    # Decodes the block names, the initial state and the snapshots
+    #
+    # Parameter:
+    # self: the PlanRecord object
+    #
+    # Returns (initial, snapshots) where initial is the initial CompactState
+    # (None if it was left out) and snapshots is a list of (actions applied,
+    # CompactState) pairs in order
+    ###############################
+
+    def states(self):
+        data = self.data
+        offset = self.extra
+        count, offset = read_varint(data, offset)
+        names = []
+        for i in range(count):
+            length, offset = read_varint(data, offset)
+            names.append(bytes(data[offset:offset + length]).decode('utf-8'))
+            offset += length
+        present, offset = read_varint(data, offset)
+        initial = None
+        if present == 1:
+            initial, offset = self.read_state(offset, names)
+        count, offset = read_varint(data, offset)
+        snapshots = []
+        for i in range(count):
+            step, offset = read_varint(data, offset)
+            state, offset = self.read_state(offset, names)
+            snapshots.append((step, state))
+        return initial, snapshots
+
+    ###############################
+    # read_state
+    # Decodes a state written by PlanWriter.write_state
+    #
+    # Parameters:
+    # self: the PlanRecord object
+    # offset: the position of the state
+    # names: the block names of the record
+    #
+    # Returns (state, offset) where offset is the position after the state
+    ###############################
+
+    def read_state(self, offset, names):
+        data = self.data
+        arm, offset = read_varint(data, offset)
+        held, offset = read_varint(data, offset)
+        stacks = []
+        for k in range(self.locations):
+            length, offset = read_varint(data, offset)
+            stack = []
+            for i in range(length):
+                block, offset = read_varint(data, offset)
+                stack.append(names[block])
+            stacks.append(tuple(stack))
+        if held == 0:
+            held = None
+        else:
+            held = names[held - 1]
+        return CompactState(tuple(stacks), arm, held), offset
+
+    ###############################
+    # state_at
+    # Finds the state after a number of actions, by replaying the plan from
+    # the last snapshot before it (or from the initial state)
+    #
+    # Parameters:
+    # self: the PlanRecord object
+    # step: the number of actions applied
+    #
+    # Returns the CompactState after step actions
+    # Returns None if an action before it is not possible
+    # Raises a ValueError if the record has no initial state
+    ###############################
+
+    def state_at(self, step):
+        state, snapshots = self.states()
+        if state is None:
+            raise ValueError("the plan " + self.id + " has no initial state")
+        start = 0
+        for i in range(len(snapshots)):
+            if snapshots[i][0] <= step:
+                start, state = snapshots[i]
+        for i in range(start, min(step, self.count)):
+            state = state.apply(self.action(i))
+            if state is None:
+                return None
+        return state
+
+#######################################
+# PlanReader class
+# Reads a plan archive (see Plan archives) through a memory map, so records
+# are only read from disk as they are used.
+#
+# Class variables:
+# path: the path of the archive
+# stream: the open file (None once closed)
+# data: the memory map of the file
+#######################################
+
+class PlanReader:
+
+    ###############################
+    # Constructor
+    # Opens a plan archive
+    #
+    # Parameters:
+    # self: the PlanReader object
+    # path: the path of the archive
+    #
+    # Raises a ValueError if the file is not a plan archive
+    ###############################
+
+    def __init__(self, path):
+        self.path = path
+        self.stream = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self.stream.close()
+            raise ValueError(path + " is not a plan archive")
+        if not(self.data[:len(ARCHIVE_MAGIC)] == ARCHIVE_MAGIC):
+            self.close()
+            raise ValueError(path + " is not a plan archive")
+
+    ###############################
+    # __iter__
+    # Iterates over the records of the archive, skipping from one record to
+    # the next by its length
+    #
+    # Parameter:
+    # self: the PlanReader object
+    #
+    # Yields a PlanRecord for each plan in order
+    ###############################
+
+    def __iter__(self):
+        data = self.data
+        offset = len(ARCHIVE_MAGIC)
+        while offset < len(data):
+            length, offset = read_varint(data, offset)
+            yield PlanRecord(data, offset)
+            offset += length
+
+    ###############################
+    # close
+    # Closes the memory map and the file
+    #
+    # Parameter:
+    # self: the PlanReader object
+    ###############################
+
+    def close(self):
+        if not(self.stream is None):
+            self.data.close()
+            self.stream.close()
+            self.stream = None
+
+    ###############################
+    # __enter__ and __exit__
+    # Let the object be used in a with statement, which closes it at the end
+    ###############################
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        self.close()
+
+#######################################
+# default_limit
+# The action limit of the greedy Planner when none is given. Plans of the
+# greedy pipeline grow about quadratically with the number of blocks, so a
+# plan that is longer than this is taken to be cycling.
+#
+# Parameter:
+# blocks: the number of blocks of the problem
+#
+# Returns the maximum number of actions
+#######################################
+
+def default_limit(blocks):
+    return 20 * blocks * blocks + 1000
+
+#######################################
+# find_plan
+# Plans for the given stacks with the planner chosen by the settings,
+# without any execution output. The settings are a dict with the following
+# optional entries:
+# "mode": 'greedy' for the Planner pipeline (the default), 'astar' for
+# a shortest plan from the AStarPlanner, 'bidir' for a shortest plan from
+# the BidirectionalPlanner, 'portfolio' for the best plan of several
+# planners run at once (see run_portfolio) or 'anytime' for the best plan
+# found by plan_anytime within the budget
+# "budget": the seconds a portfolio or anytime plan may take (10 by
+# default)
+# "limit": the maximum number of actions of the greedy Planner (see
+# default_limit when not given or None; 0 for no limit)
+# "max_nodes": the maximum number of states expanded by the AStarPlanner or
+# the BidirectionalPlanner
+# "seed": the seed of the greedy Planner's random tie-breaking (None for
+# the deterministic choices)
+#
+# Parameters:
+# initial: the initial stacks
+# goal: the goal stacks
+# settings: the settings dict (None for the defaults)
+# stats: a dict to add the statistics of the planner to (None for no
+# statistics): the phase statistics of Planner.instrument, an "astar"
+# entry with the states expanded and generated, a "bidir" entry with the
+# states expanded, the frontier sizes and the meeting depths, or a
+# "portfolio" or "anytime" entry with the report of run_portfolio or
+# plan_anytime
+# deadline: the time.perf_counter() time to stop planning at (None for no
+# deadline); a portfolio or anytime budget is cut short to end by then
+#
+# Returns (plan, success, error) where error is None unless planning failed
+# Raises a ValueError if the mode is unknown
+#######################################
+
+def find_plan(initial, goal, settings=None, stats=None, deadline=None):
+    if settings is None:
+        settings = {}
+    mode = settings.get("mode", "greedy")
+    if mode == 'greedy':
+        # The greedy Planner can cycle, so it is always limited unless asked
+        # not to be
+        limit = settings.get("limit")
+        if limit is None:
+            limit = default_limit(sum([len(stack) for stack in initial]))
+        elif limit == 0:
+            limit = None
+        rng = None
+        if not(settings.get("seed") is None):
+            rng = random.Random(settings.get("seed"))
+        planner = Planner(*(copy_stacks(initial) + copy_stacks(goal)), output=Output('none'),
+                          rng=rng)
+        if not(stats is None):
+            stats.update(planner.instrument())
+        plan = planner.solve(limit, deadline)
+        if not(limit is None) and len(plan) > limit:
+            return plan, False, "action limit reached"
+        if not(planner.check_satisfaction()) and not(deadline is None) and time.perf_counter() >= deadline:
+            return plan, False, "time limit reached"
+        return plan, planner.check_satisfaction(), None
+    elif mode == 'astar':
+        search = AStarPlanner(*(initial + goal))
+        plan = search.plan(settings.get("max_nodes"), 1, None, deadline)
+        if not(stats is None):
+            stats["astar"] = {"expanded": search.expanded, "generated": search.generated}
+        if plan is None:
+            if search.timed_out:
+                return [], False, "time limit reached"
+            return [], False, "node limit reached"
+        return plan, True, None
+    elif mode == 'bidir':
+        search = BidirectionalPlanner(*(initial + goal))
+        plan = search.plan(settings.get("max_nodes"), deadline)
+        if not(stats is None):
+            meeting = None
+            if not(search.meeting is None):
+                meeting = list(search.meeting)
+            stats["bidir"] = {"expanded": search.expanded,
+                              "forward_frontiers": search.forward_frontiers,
+                              "backward_frontiers": search.backward_frontiers,
+                              "meeting": meeting, "complete": search.complete}
+        if plan is None:
+            if search.timed_out:
+                return [], False, "time limit reached"
+            return [], False, "node limit reached"
+        return plan, True, None
+    elif mode == 'portfolio':
+        if not(deadline is None):
+            settings = dict(settings)
+            settings["budget"] = max(0.0, min(settings.get("budget", 10.0),
+                                              deadline - time.perf_counter()))
+        plan, report = run_portfolio(initial, goal, settings)
+        if not(stats is None):
+            stats["portfolio"] = report
+        if plan is None:
+            return [], False, "no valid plan within the budget"
+        return plan, True, None
+    elif mode == 'anytime':
+        budget = time.perf_counter() + settings.get("budget", 10.0)
+        if deadline is None or budget < deadline:
+            deadline = budget
+        plan, report = plan_anytime(initial, goal, deadline)
+        if not(stats is None):
+            stats["anytime"] = report
+        if plan is None:
+            return [], False, "no valid plan within the budget"
+        return plan, True, None
+    raise ValueError("unknown planning mode: " + str(mode))
+
+#######################################
+# portfolio_strategies
+# Lists the strategies of a portfolio: the greedy Planner, randomized
+# tie-breaking variants of it, A* search and bidirectional search
+#
+# Parameter:
+# settings: the settings dict of find_plan, with the following optional
+# portfolio entries:
+# "variants": the number of randomized greedy variants (3 by default)
+# "seed": the seed of the first variant (variants use seed + 1, seed + 2,
+# ...; 0 by default)
+#
+# Returns a list of (name, settings) pairs, one per strategy
+#######################################
+
+def portfolio_strategies(settings):
+    limit = settings.get("limit")
+    max_nodes = settings.get("max_nodes")
+    seed = settings.get("seed")
+    if seed is None:
+        seed = 0
+    strategies = [("greedy", {"mode": "greedy", "limit": limit})]
+    for i in range(settings.get("variants", 3)):
+        strategies.append(("greedy-" + str(i + 1),
+                           {"mode": "greedy", "limit": limit, "seed": seed + i + 1}))
+    strategies.append(("astar", {"mode": "astar", "max_nodes": max_nodes}))
+    strategies.append(("bidir", {"mode": "bidir", "max_nodes": max_nodes}))
+    return strategies
+
+#######################################
+# portfolio_worker
+# Runs one strategy of a portfolio in its own process and sends the result
+# back. Anything the planner prints goes to stderr.
+#
+# Parameters:
+# name: the name of the strategy
+# initial: the initial stacks
+# goal: the goal stacks
+# settings: the find_plan settings of the strategy
+# results: the queue to put (name, plan, success, error, complete, time) on,
+# where complete is True if the plan is known to be a shortest plan
+#######################################
+
+def portfolio_worker(name, initial, goal, settings, results):
+    start = time.perf_counter()
+    complete = False
+    try:
+        stats = None
+        if settings.get("mode") == 'bidir':
+            stats = {}
+        with contextlib.redirect_stdout(sys.stderr):
+            plan, success, error = find_plan(initial, goal, settings, stats)
+        # Both searches find shortest plans (bidirectional search only if
+        # it started from every goal state)
+        if settings.get("mode") == 'astar':
+            complete = success
+        elif settings.get("mode") == 'bidir':
+            complete = success and stats["bidir"]["complete"]
+    except (KeyError, IndexError, TypeError, ValueError) as problem:
+        plan = []
+        success = False
+        error = str(problem)
+    results.put((name, plan, success, error, complete, time.perf_counter() - start))
+
+#######################################
+# run_portfolio
+# Runs several planners at once, each in its own process, under one
+# wall-clock budget (see portfolio_strategies). Every plan that comes back
+# is passed through optimize_plan and checked with validate_plan, and the
+# shortest valid plan is kept. The portfolio stops early once the best plan
+# is proven to be a shortest plan: when a complete search returns a plan
+# of the same length, or when its length reaches the lower bound of the
+# AStarPlanner heuristic. Strategies that are still running at the end are
+# terminated.
+#
+# Parameters:
+# initial: the initial stacks
+# goal: the goal stacks
+# settings: the settings dict of find_plan (None for the defaults), with the
+# entries of portfolio_strategies and "budget": the seconds the portfolio
+# may run (10 by default)
+#
+# Returns (plan, report) where plan is the best valid plan (None if there
+# is none) and report is a dict with the following entries:
+# "winner": the strategy of the plan (None if there is none)
+# "optimal": True if the plan is proven to be a shortest plan
+# "bound": the lower bound on the plan length (None if unknown)
+# "strategies": the "success", "length", "time", "valid" and "error" of
+# each strategy that finished
+# "cancelled": the strategies whose results were not read (every strategy
+# is either here or in "strategies")
+# "time": the seconds the portfolio ran
+#######################################
+
+def run_portfolio(initial, goal, settings=None):
+    if settings is None:
+        settings = {}
+    start = time.perf_counter()
+    deadline = start + settings.get("budget", 10.0)
+    # The heuristic of A* is a lower bound on the length of any plan
+    bound = None
+    try:
+        search = AStarPlanner(*(copy_stacks(initial) + copy_stacks(goal)))
+        bound = search.heuristic(search.start)
+    except (KeyError, ValueError):
+        pass
+    results = multiprocessing.Queue()
+    processes = {}
+    for name, options in portfolio_strategies(settings):
+        process = multiprocessing.Process(target=portfolio_worker,
+                                          args=(name, initial, goal, options, results))
+        process.daemon = True
+        process.start()
+        processes[name] = process
+    best = None
+    report = {"winner": None, "optimal": False, "bound": bound, "strategies": {},
+              "cancelled": [], "time": 0.0}
+    try:
+        waiting = len(processes)
+        while waiting > 0 and not(report["optimal"]):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                name, plan, success, error, complete, took = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            waiting -= 1
+            entry = {"success": success, "length": len(plan), "time": took}
+            if not(error is None):
+                entry["error"] = error
+            if success:
+                plan = optimize_plan(plan)
+                check = validate_plan(initial, goal, plan)
+                entry["length"] = len(plan)
+                entry["valid"] = check.legal and check.satisfied
+                if entry["valid"]:
+                    if best is None or len(plan) < len(best):
+                        best = plan
+                        report["winner"] = name
+                    # A complete search proves that no plan is shorter
+                    if complete:
+                        bound = len(plan)
+                        report["bound"] = bound
+            report["strategies"][name] = entry
+            if not(best is None) and not(bound is None) and len(best) <= bound:
+                report["optimal"] = True
+    finally:
+        # Cancel the strategies that are still running (a strategy that
+        # finished after the portfolio stopped is cancelled as well, since
+        # its result is never read)
+        for name in processes:
+            if processes[name].is_alive():
+                processes[name].terminate()
+            if not(name in report["strategies"]):
+                report["cancelled"].append(name)
+        for name in processes:
+            processes[name].join()
+        results.close()
+    report["time"] = time.perf_counter() - start
+    return best, report
+
+#######################################
+# plan_anytime
+# Plans within a deadline and keeps improving the plan until then. The
+# greedy Planner gives a first plan quickly, which is shortened with
+# optimize_plan. Since the greedy Planner can cycle, it only gets half of
+# the time and default_limit actions, so the searches always get time.
+# Then weighted A* searches run with decreasing weights,
+# each pruned to plans shorter than the best plan so far, until a search
+# with weight 1 proves the best plan is a shortest plan or the deadline
+# passes. Every plan is checked with validate_plan before it is kept, and
+# each improvement is passed to the callback as soon as it is found.
+#
+# Parameters:
+# initial: the initial stacks
+# goal: the goal stacks
+# deadline: the time.perf_counter() time to stop at
+# callback: a function called as callback(plan, info) with each better
+# plan, where info is a dict of its "source", "length" and "time" (None for
+# no callback)
+# weights: the weights of the A* searches, in the order they are run
+#
+# Returns (plan, report) where plan is the best valid plan (None if none was
+# found in time) and report is a dict with the following entries:
+# "improvements": the info of each improvement in order
+# "optimal": True if the plan is proven to be a shortest plan
+# "time": the seconds spent
+#######################################
+
+def plan_anytime(initial, goal, deadline, callback=None, weights=(5, 3, 2, 1.5, 1.25, 1)):
+    start = time.perf_counter()
+    best = None
+    report = {"improvements": [], "optimal": False, "time": 0.0}
+
+    # Keeps a plan if it is valid and shorter than the best plan so far (the
+    # plans of the greedy Planner are already known to be valid)
+    def offer(plan, source, checked=False):
+        if not(best is None) and len(plan) >= len(best):
+            return best
+        if not(checked):
+            check = validate_plan(initial, goal, plan)
+            if not(check.legal and check.satisfied):
+                return best
+        info = {"source": source, "length": len(plan), "time": time.perf_counter() - start}
+        report["improvements"].append(info)
+        if not(callback is None):
+            callback(plan, info)
+        return plan
+
+    # Start from the greedy plan (which may not reach the goal within its
+    # share of the time and actions)
+    limit = default_limit(sum([len(stack) for stack in initial]))
+    with contextlib.redirect_stdout(sys.stderr):
+        planner = Planner(*(copy_stacks(initial) + copy_stacks(goal)), output=Output('none'))
+        plan = planner.solve(limit, start + (deadline - start) / 2)
+    if planner.check_satisfaction():
+        best = offer(plan, "greedy", True)
+        if time.perf_counter() < deadline:
+            best = offer(optimize_plan(plan), "greedy+optimize")
+    # Improve the plan with weighted A* searches while there is time
+    search = AStarPlanner(*(copy_stacks(initial) + copy_stacks(goal)))
+    for weight in weights:
+        if time.perf_counter() >= deadline:
+            break
+        bound = None
+        if not(best is None):
+            bound = len(best)
+        plan = search.plan(None, weight, bound, deadline)
+        if plan is None:
+            # With weight 1, a search that ran out of states (rather than
+            # time) proves that nothing shorter than the bound exists
+            if weight == 1 and not(best is None) and search.exhausted:
+                report["optimal"] = True
+                break
+            continue
+        # A plan of a search with weight 1 is a shortest plan (if it is
+        # valid)
+        improved = offer(plan, "astar w=" + str(weight))
+        if weight == 1 and improved is plan:
+            report["optimal"] = True
+        best = improved
+        if report["optimal"]:
+            break
+    report["time"] = time.perf_counter() - start
+    return best, report
+
+#######################################
+# solve_problem
+# Solves one problem of the batch format (see read_stacks) with find_plan.
+# If the settings ask for a plan cache (see get_cache), cached plans are
+# returned without planning, and new successful plans are cached. If the
+# "canonical" setting is True, the canonical form of the problem is planned
+# for (and cached) instead, and the plan is translated back (see
+# canonicalize). If the "optimize" setting is True, successful plans are
+# passed through optimize_plan. If the "validate" setting is True, the
+# final plan is replayed with validate_plan and the record only succeeds if
+# the plan is valid. If the "stats" setting is True, the statistics of
+# find_plan are added to the record.
+#
+# Parameters:
+# problem: the problem to solve
+# number: the problem's position in the batch (the id if none is given)
+# settings: the settings dict of find_plan and get_cache (None for the
+# defaults)
+#
+# Returns a result record with the following form:
+# {"id", "plan", "length", "success", "time"}
+# with a "cached" entry if the plan came from the cache, a "stats" entry if
+# statistics were asked for and the problem was planned, a "saved" entry
+# with the number of actions removed by optimize_plan, a "valid" entry with
+# the validate_plan result if validation was asked for, and an "error" entry
+# if the problem could not be read or solved (or its plan is not valid)
+#
+# If the "timeout" setting is a number of seconds, planning is given a
+# deadline that many seconds after the call (see find_plan), and a problem
+# that is not solved by then gets a "time limit reached" error.
+#######################################
+
+def solve_problem(problem, number=0, settings=None):
+    if settings is None:
+        settings = {}
+    record = {"id": number, "plan": [], "length": 0, "success": False, "time": 0.0}
+    start = time.perf_counter()
+    deadline = None
+    if not(settings.get("timeout") is None):
+        deadline = start + settings.get("timeout")
+    try:
+        record["id"] = problem.get("id", number)
+        initial, goal = read_stacks(problem)
+        # Plan for the canonical form of the problem if asked to
+        relabeling = None
+        if settings.get("canonical", False):
+            initial, goal, relabeling = canonicalize(initial, goal)
+        # Look for a cached plan first
+        plan = None
+        cache = get_cache(settings)
+        if not(cache is None):
+            key = cache.key(initial, goal, settings.get("mode", "greedy"))
+            plan = cache.get(key)
+        if plan is None:
+            stats = None
+            if settings.get("stats", False):
+                stats = {}
+                record["stats"] = stats
+            plan, success, error = find_plan(initial, goal, settings, stats, deadline)
+            if success and not(cache is None):
+                cache.put(key, plan)
+        else:
+            success = True
+            error = None
+            record["cached"] = True
+        if success and settings.get("optimize", False):
+            optimized = optimize_plan(plan)
+            record["saved"] = len(plan) - len(optimized)
+            plan = optimized
+        if not(relabeling is None):
+            plan = translate_plan(plan, relabeling)
+        # Check the final plan against the problem as given if asked to
+        if success and settings.get("validate", False):
+            initial, goal = read_stacks(problem)
+            check = validate_plan(initial, goal, plan)
+            record["valid"] = check.legal and check.satisfied
+            if not(check.legal):
+                error = "action " + str(check.step) + " (" + check.action + "): " + check.error
+            elif not(check.satisfied):
+                error = "the plan does not reach the goal"
+            success = record["valid"]
+        record["plan"] = plan
+        record["length"] = len(plan)
+        record["success"] = success
+        if not(error is None):
+            record["error"] = error
+    except KeyError as error:
+        record["error"] = "missing " + str(error)
+    except (AttributeError, IndexError, TypeError, ValueError) as error:
+        record["error"] = str(error)
+    record["time"] = time.perf_counter() - start
+    return record
+
+#######################################
+# parse_problem
+# Reads the problem of one JSON line
+#
+# Parameter:
+# line: the line of JSON text (str or bytes)
+#
+# Returns the problem as a dict
+# Returns an error string if the line is not valid JSON or not a JSON object
+#######################################
+
+def parse_problem(line):
+    try:
+        problem = json.loads(line)
+    except ValueError as error:
+        return "invalid JSON: " + str(error)
+    if not(isinstance(problem, dict)):
+        return "a problem must be a JSON object, not " + json.dumps(problem)
+    return problem
+
+#######################################
+# read_problems
+# Lazily reads problems from a JSONL stream, one problem per line (see
+# parse_problem). Lines that are blank are skipped, and lines that are not
+# problems are passed on as an error string so that they still produce a
+# result record.
+#
+# Parameter:
+# source: the stream to read from
+#
+# Yields (number, problem) pairs, numbering problems from 1
+#######################################
+
+def read_problems(source):
+    number = 0
+    for line in source:
+        if line.strip() == '':
+            continue
+        number += 1
+        yield number, parse_problem(line)
+
+#######################################
+# solve_chunk
+# Solves a chunk of numbered problems. Anything the Planner prints while
+# solving (such as error messages) is sent to stderr to keep the results
+# clean. This is the unit of work sent to the worker processes of a
+# parallel batch.
+#
+# Parameters:
+# chunk: a list of (number, problem) pairs from read_problems
+# settings: the settings dict of find_plan (None for the defaults)
+#
+# Returns the list of result records in the order of the chunk
+#######################################
+
+def solve_chunk(chunk, settings=None):
+    records = []
+    for number, problem in chunk:
+        # Problems that could not be read are reported as errors
+        if isinstance(problem, str) or not(isinstance(problem, dict)):
+            records.append({"id": number, "plan": [], "length": 0, "success": False,
+                            "time": 0.0, "error": str(problem)})
+        else:
+            with contextlib.redirect_stdout(sys.stderr):
+                records.append(solve_problem(problem, number, settings))
+    return records
+
+#######################################
+# run_batch
+# Solves every problem of a JSONL stream and writes one JSON result record
+# per line as soon as it is available, so memory use does not depend on the
+# size of the input.
+#
+# With more than one worker, problems are sent in chunks to a pool of worker
+# processes. At most a few chunks per worker are in flight at once, which
+# keeps every worker busy while bounding memory. Records are written in input
+# order, or as soon as each chunk finishes when ordered is False (every
+# record carries its problem id either way).
+#
+# Parameters:
+# source: the stream of problems
+# sink: the stream to write result records to
+# workers: the number of worker processes (1 solves in this process)
+# chunksize: the number of problems sent to a worker at once
+# ordered: True to write records in input order
+# settings: the settings dict of find_plan (None for the defaults)
+# archive: a PlanWriter that the plan of every successful record is also
+# written to, with its initial stacks (None for no archive)
+#
+# Returns the number of problems solved
+#######################################
+
+def run_batch(source, sink, workers=1, chunksize=64, ordered=True, settings=None, archive=None):
+    count = 0
+    problems = read_problems(source)
+
+    # Writes the plans of a chunk's records to the archive
+    def store(chunk, records):
+        for i in range(len(records)):
+            if records[i]["success"]:
+                archive.write(records[i]["plan"], records[i]["id"], read_stacks(chunk[i][1])[0])
+
+    # Solve in this process with a single worker
+    if workers <= 1:
+        for number, problem in problems:
+            records = solve_chunk([(number, problem)], settings)
+            if not(archive is None):
+                store([(number, problem)], records)
+            sink.write(json.dumps(records[0]) + "\n")
+            count += 1
+        sink.flush()
+        return count
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        # The problems of each chunk in flight (for the archive)
+        chunks = {}
+        more = True
+        while more or len(pending) != 0:
+            # Keep the pool fed with up to 2 chunks per worker
+            while more and len(pending) < 2 * workers:
+                chunk = list(itertools.islice(problems, chunksize))
+                if len(chunk) == 0:
+                    more = False
+                else:
+                    future = pool.submit(solve_chunk, chunk, settings)
+                    chunks[future] = chunk
+                    pending.append(future)
+            if len(pending) == 0:
+                break
+            # Take the oldest chunk in order, or any finished chunk otherwise
+            if ordered:
+                done = pending.popleft()
+            else:
+                finished, waiting = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                done = finished.pop()
+                pending.remove(done)
+            records = done.result()
+            chunk = chunks.pop(done)
+            if not(archive is None):
+                store(chunk, records)
+            for record in records:
+                sink.write(json.dumps(record) + "\n")
+                count += 1
+    sink.flush()
+    return count
+
+#######################################
+# warm_worker
+# Prepares a worker process of a PlanServer: creates its plan cache and
+# plans a small problem once, so the first request does not pay for the
+# start-up work.
+#
+# Parameter:
+# settings: the settings dict of find_plan and get_cache
+#######################################
+
+def warm_worker(settings):
+    get_cache(settings)
+    with contextlib.redirect_stdout(sys.stderr):
+        find_plan([['a'], [], []], [[], ['a'], []], settings)
+
+#######################################
+# parse_address
+# Reads a server address in the "HOST:PORT" form, or the path of a Unix
+# socket
+#
+# Parameter:
+# address: the text of the address
+#
+# Returns (host, port) for a TCP address or (None, path) for a Unix socket
+#######################################
+
+def parse_address(address):
+    host, colon, port = address.rpartition(':')
+    if colon == '' or not(port.isdigit()):
+        return None, address
+    if host == '':
+        host = '127.0.0.1'
+    return host, int(port)
+
+#######################################
+# PlanServer class
+# A planning service for other programs on the same machine. Clients connect
+# over TCP or a Unix socket and send JSON lines. A problem of the batch
+# format (see read_stacks) is answered with one solve_problem result record.
+# {"op": "stats"} is answered with the statistics of the server. The
+# requests of a connection are solved concurrently, so records can come
+# back out of order (each record carries its problem id).
+#
+# Problems are solved by worker processes that live as long as the server,
+# so every worker keeps its plan caches (see get_cache) warm between
+# requests. At most max_active requests are given to the workers at once,
+# and the others wait in a queue. A request that takes more than timeout
+# seconds, waiting included, is answered with an error record. Its worker
+# is given the time left as the "timeout" setting of solve_problem, so it
+# stops planning at about the same time, and the request keeps its slot
+# (and counts as active) until the worker is free again. If a worker process
+# dies, the requests given to the workers are answered with an error record
+# and the workers are replaced by new ones.
+#
+# Class variables:
+# settings: the settings dict of find_plan and get_cache
+# workers: the number of worker processes
+# max_active: the most requests given to the workers at once
+# timeout: the seconds a request may take (None for no limit)
+# pool: the worker processes (None unless started)
+# slots: the semaphore that caps the requests given to the workers
+# server: the asyncio server (None unless started)
+# path: the path of the Unix socket (None for TCP)
+# received: the number of requests received
+# solved: the number of problems answered with a plan that reaches the goal
+# failed: the number of problems answered without one (errors included)
+# timeouts: the number of requests that timed out
+# restarts: the number of times the worker processes were replaced after
+# one of them died
+# waiting: the number of requests queued for a worker
+# active: the number of requests being solved by the workers (timed out
+# requests included until their workers are free)
+# latencies: the latencies of the most recent answers (in seconds)
+# number: the number given to the last problem received
+#######################################
+
+class PlanServer:
+
+    ###############################
+    # Constructor
+    # Initializes the PlanServer object
+    #
+    # Parameters:
+    # self: the PlanServer object
+    # settings: the settings dict of find_plan and get_cache (None for the
+    # defaults)
+    # workers: the number of worker processes
+    # max_active: the most requests given to the workers at once (twice the
+    # workers if not given)
+    # timeout: the seconds a request may take (None for no limit)
+    ###############################
+
+    def __init__(self, settings=None, workers=1, max_active=None, timeout=None):
+        self.settings = settings
+        if self.settings is None:
+            self.settings = {}
+        self.workers = max(1, workers)
+        self.max_active = max_active
+        if self.max_active is None:
+            self.max_active = 2 * self.workers
+        self.timeout = timeout
+        self.pool = None
+        self.slots = None
+        self.server = None
+        self.path = None
+        self.received = 0
+        self.solved = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.waiting = 0
+        self.active = 0
+        self.latencies = collections.deque(maxlen=1000)
+        self.number = 0
+
+    ###############################
+    # start
+    # Starts the worker processes and listens on an address
+    #
+    # Parameters:
+    # self: the PlanServer object
+    # address: "HOST:PORT" (port 0 picks a free port) or the path of a Unix
+    # socket
+    #
+    # Returns the address the server listens on ("HOST:PORT" or the path)
+    ###############################
+
+    async def start(self, address):
+        self.pool = self.make_pool()
+        self.slots = asyncio.Semaphore(self.max_active)
+        host, port = parse_address(address)
+        # Allow long lines for problems with many blocks
+        if host is None:
+            self.path = port
+            self.server = await asyncio.start_unix_server(self.handle, path=self.path,
+                                                          limit=2 ** 24)
+            return self.path
+        self.server = await asyncio.start_server(self.handle, host, port, limit=2 ** 24)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return host + ":" + str(port)
+
+    ###############################
+    # make_pool
+    # Starts a pool of warm worker processes
+    #
+    # Parameter:
+    # self: the PlanServer object
+    #
+    # Returns the ProcessPoolExecutor
+    ###############################
+
+    def make_pool(self):
+        # Workers are started by a fork server where possible, since workers
+        # forked from the server itself would inherit its client sockets
+        # (and keep connections open after the server closes them)
+        context = None
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('forkserver')
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context, initializer=warm_worker,
+            initargs=(self.settings,))
+
+    ###############################
+    # replace_pool
+    # Replaces a pool that is broken (a worker process died) with a new one,
+    # so that later requests are solved again. Every request that was given
+    # to the broken pool fails, and the first of them replaces it.
+    #
+    # Parameters:
+    # self: the PlanServer object
+    # pool: the broken pool
+    ###############################
+
+    def replace_pool(self, pool):
+        if not(pool is self.pool) or self.pool is None:
+            return
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = self.make_pool()
+        self.restarts += 1
+
+    ###############################
+    # close
+    # Stops listening and shuts down the worker processes
+    #
+    # Parameter:
+    # self: the PlanServer object
+    ###############################
+
+    async def close(self):
+        if not(self.server is None):
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            if not(self.path is None) and os.path.exists(self.path):
+                os.unlink(self.path)
+        if not(self.pool is None):
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    ###############################
+    # handle
+    # Answers the requests of one connection until the client closes it
+    #
+    # Parameters:
+    # self: the PlanServer object
+    # reader: the stream of the connection's requests
+    # writer: the stream to write the answers to
+    ###############################
+
+    async def handle(self, reader, writer):
+        tasks = set()
+
+        # Answers one request line and writes the answer
+        async def reply(line):
+            answer = await self.answer(line)
+            writer.write((json.dumps(answer) + "\n").encode())
+            await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if len(line) == 0:
+                    break
+                if line.strip() == b'':
+                    continue
+                task = asyncio.ensure_future(reply(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            # Finish the requests in flight before closing the connection
+            if not(len(tasks) == 0):
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    ###############################
+    # answer
+    # Answers one request line
+    #
+    # Parameters:
+    # self: the PlanServer object
+    # line: the request line (bytes)
+    #
+    # Returns the answer (a result record or the statistics)
+    ###############################
+
+    async def answer(self, line):
+        start = time.perf_counter()
+        self.received += 1
+        request = parse_problem(line)
+        if isinstance(request, dict) and request.get("op") == "stats":
+            return self.stats()
+        self.number += 1
+        number = self.number
+        # Problems that could not be read are answered without a worker
+        if not(isinstance(request, dict)):
+            record = solve_chunk([(number, request)], self.settings)[0]
+        else:
+            try:
+                record = await asyncio.wait_for(self.solve(number, request, start), self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                record = {"id": request.get("id", number), "plan": [], "length": 0,
+                          "success": False, "time": time.perf_counter() - start,
+                          "error": "timed out"}
+            except concurrent.futures.process.BrokenProcessPool:
+                record = {"id": request.get("id", number), "plan": [], "length": 0,
+                          "success": False, "time": time.perf_counter() - start,
+                          "error": "worker process failed"}
+        if record["success"]:
+            self.solved += 1
+        else:
+            self.failed += 1
+        self.latencies.append(time.perf_counter() - start)
+        return record
+
+    ###############################
+    # solve
+    # Solves a problem with the worker processes once a slot is free. The
+    # slot is held until the worker is done with the problem, even if the
+    # request is cancelled (such as by its timeout) before then.
+    #
+    # Parameters:
+    # self: the PlanServer object
+    # number: the problem's number
+    # problem: the problem to solve
+    # start: the time.perf_counter() time the request was received
+    #
+    # Returns the result record of solve_problem
+    ###############################
+
+    async def solve(self, number, problem, start):
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        # Give the worker the time left to plan
+        settings = self.settings
+        if not(self.timeout is None):
+            settings = dict(self.settings)
+            settings["timeout"] = max(0.0, self.timeout - (time.perf_counter() - start))
+        self.active += 1
+        pool = self.pool
+        try:
+            future = pool.submit(solve_chunk, [(number, problem)], settings)
+        except BaseException as error:
+            self.release()
+            if isinstance(error, concurrent.futures.process.BrokenProcessPool):
+                self.replace_pool(pool)
+            raise
+        loop = asyncio.get_running_loop()
+
+        # Frees the slot once the worker is done (called from the pool's
+        # thread)
+        def done(future):
+            try:
+                loop.call_soon_threadsafe(self.release)
+            except RuntimeError:
+                # The event loop has already been closed
+                pass
+
+        future.add_done_callback(done)
+        try:
+            records = await asyncio.wrap_future(future)
+        except concurrent.futures.process.BrokenProcessPool:
+            self.replace_pool(pool)
+            raise
+        return records[0]
+
+    ###############################
+    # release
+    # Frees the slot of a request whose worker is done
+    #
+    # Parameter:
+    # self: the PlanServer object
+    ###############################
+
+    def release(self):
+        self.active -= 1
+        self.slots.release()
+
+    ###############################
+    # stats
+    # Reports the request counters, the queue depth and the latencies of the
+    # most recent answers
+    #
+    # Parameter:
+    # self: the PlanServer object
+    #
+    # Returns the statistics as a dict
+    ###############################
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        latency = {"count": len(latencies), "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        if not(len(latencies) == 0):
+            latency["mean"] = sum(latencies) / len(latencies)
+            latency["p50"] = latencies[(len(latencies) - 1) // 2]
+            latency["p95"] = latencies[int(math.ceil(0.95 * len(latencies))) - 1]
+            latency["max"] = latencies[len(latencies) - 1]
+        return {"received": self.received, "solved": self.solved, "failed": self.failed,
+                "timeouts": self.timeouts, "restarts": self.restarts, "waiting": self.waiting,
+                "active": self.active,
+                "workers": self.workers, "max_active": self.max_active, "latency": latency}
+
+#######################################
+# serve
+# Runs a PlanServer until the process is interrupted
+#
+# Parameters:
+# address: "HOST:PORT" or the path of a Unix socket
+# settings: the settings dict of find_plan and get_cache (None for the
+# defaults)
+# workers: the number of worker processes
+# max_active: the most requests given to the workers at once (twice the
+# workers if not given)
+# timeout: the seconds a request may take (None for no limit)
+#######################################
+
+def serve(address, settings=None, workers=1, max_active=None, timeout=None):
+    server = PlanServer(settings, workers, max_active, timeout)
+
+    # Listens until the server is cancelled
+    async def run():
+        where = await server.start(address)
+        sys.stderr.write("serving on " + where + "\n")
+        try:
+            await server.server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+#######################################
+# ask_server
+# Sends requests to a PlanServer over one connection and reads the answers.
+# The requests are sent while the answers are read, with at most window
+# requests in flight, so a long stream of requests is sent as it is read
+# and its answers are passed on as they arrive, without holding either in
+# memory.
+#
+# Parameters:
+# address: "HOST:PORT" or the path of a Unix socket
+# requests: the requests (problems or {"op": "stats"} dicts, or lines of
+# JSON text; blank lines are skipped)
+# answer: the function called with each answer as it arrives (None to
+# collect the answers)
+# window: the most requests sent but not yet answered
+#
+# Returns the list of answers in the order they arrived (empty if answer is
+# given)
+#######################################
+
+async def ask_server(address, requests, answer=None, window=256):
+    host, port = parse_address(address)
+    if host is None:
+        reader, writer = await asyncio.open_unix_connection(port, limit=2 ** 24)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=2 ** 24)
+    answers = []
+    if answer is None:
+        answer = answers.append
+    slots = asyncio.Semaphore(window)
+
+    # Writes every request, then closes the sending side
+    async def send():
+        for request in requests:
+            if isinstance(request, str):
+                # The server does not answer blank lines
+                if request.strip() == '':
+                    continue
+                text = request.strip()
+            else:
+                text = json.dumps(request)
+            await slots.acquire()
+            writer.write((text + "\n").encode())
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+
+    sender = asyncio.ensure_future(send())
+    try:
+        while True:
+            line = await reader.readline()
+            if len(line) == 0:
+                break
+            slots.release()
+            answer(json.loads(line))
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+    return answers
+
+#######################################
+# run_client
+# Sends the problems of a JSONL stream to a PlanServer and writes the
+# result records in the order they finish. Problems are sent as they are
+# read and records are written as they arrive (see ask_server).
+#
+# Parameters:
+# address: "HOST:PORT" or the path of a Unix socket
+# source: the stream of problems
+# sink: the stream to write result records to
+# window: the most problems sent but not yet answered
+#
+# Returns the number of records written
+#######################################
+
+def run_client(address, source, sink, window=256):
+    count = 0
+
+    # Writes one record
+    def write(record):
+        nonlocal count
+        sink.write(json.dumps(record) + "\n")
+        count += 1
+
+    asyncio.run(ask_server(address, source, write, window))
+    sink.flush()
+    return count
+
+#######################################
+# generate_problem
+# Deterministically generates a problem of the batch format. The kinds of
+# problems are as follows:
+# random - blocks are dealt to random locations for both states
+# reversal - one tower at L1 that must be rebuilt upside down
+# interleaved - blocks alternate between L1 and L2 and must be merged into
+# one tower at L3
+# solved - a random initial state that already is the goal state
+#
+# Parameters:
+# kind: the kind of problem
+# blocks: the number of blocks (named b0, b1, ...)
+# seed: the seed of the random generator
+# locations: the number of locations (at least 3)
+#
+# Returns the problem as a dict with "id", "initial" and "goal" entries
+# Raises a ValueError if the kind is unknown
+#######################################
+
+def generate_problem(kind, blocks, seed=0, locations=3):
+    # The generator only depends on the seed, kind and size of the problem
+    name = kind + "-" + str(blocks)
+    if not(locations == 3):
+        name += "-" + str(locations) + "loc"
+    rng = random.Random(str(seed) + "-" + name)
+    names = ['b' + str(i) for i in range(blocks)]
+
+    # Deals the blocks in a random order to random locations
+    def deal():
+        order = names[:]
+        rng.shuffle(order)
+        stacks = [[] for k in range(locations)]
+        for block in order:
+            stacks[rng.randrange(locations)].append(block)
+        return stacks
+
+    # The locations after L3 start empty in the fixed kinds
+    empty = [[] for k in range(locations - 3)]
+    if kind == 'random':
+        initial = deal()
+        goal = deal()
+    elif kind == 'reversal':
+        initial = [names[:], [], []] + empty
+        goal = [names[::-1], [], []] + copy_stacks(empty)
+    elif kind == 'interleaved':
+        initial = [names[0::2], names[1::2], []] + empty
+        goal = [[], [], names[:]] + copy_stacks(empty)
+    elif kind == 'solved':
+        initial = deal()
+        goal = [stack[:] for stack in initial]
+    else:
+        raise ValueError("unknown problem kind: " + kind)
+    return {"id": name, "initial": initial, "goal": goal}
+
+#######################################
+# time_phases
+# Replaces methods of an object (such as a Planner) with versions that count
+# their calls, add up their wall time and keep the longest call. For methods
+# that return lists (such as the relation lists of search4relations and the
+# task lists of compare_relations), the sizes of the lists are added up and
+# the largest is kept as well. Only the given object is changed, so other
+# objects of the class run at full speed.
+#
+# Parameters:
+# planner: the object to time
+# names: the names of the methods to time
+#
+# Returns a dict of {"calls", "time", "max_time", "items", "max_items"}
+# entries keyed by method name
+#######################################
+
+def time_phases(planner, names):
+    phases = {}
+    for name in names:
+        phases[name] = {"calls": 0, "time": 0.0, "max_time": 0.0, "items": 0, "max_items": 0}
+
+        # Wraps the bound method so that its entry is updated on every call
+        def timed(*args, method=getattr(planner, name), entry=phases[name], **kwargs):
+            start = time.perf_counter()
+            result = None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            finally:
+                spent = time.perf_counter() - start
+                entry["time"] += spent
+                entry["calls"] += 1
+                if spent > entry["max_time"]:
+                    entry["max_time"] = spent
+                if isinstance(result, list):
+                    entry["items"] += len(result)
+                    if len(result) > entry["max_items"]:
+                        entry["max_items"] = len(result)
+
+        setattr(planner, name, timed)
+    return phases
+
+#######################################
+# benchmark_problem
+# Solves a problem twice: once to time each phase of the pipeline, and once
+# under tracemalloc to find the peak memory (tracing slows the run down, so
+# it is kept out of the timed run).
+#
+# Parameters:
+# problem: the problem to solve (see read_stacks)
+# limit: the maximum number of actions before giving up
+# memory: True to measure the peak memory
+#
+# Returns a result dict with the phase timings, total time, peak memory,
+# plan length and success of the run
+#######################################
+
+def benchmark_problem(problem, limit, memory=True):
+    initial, goal = read_stacks(problem)
+    planner = Planner(*(copy_stacks(initial) + copy_stacks(goal)), output=Output('none'))
+    phases = planner.instrument()
+    start = time.perf_counter()
+    plan = planner.solve(limit)
+    total = time.perf_counter() - start
+    result = {"id": problem["id"],
+              "blocks": sum([len(stack) for stack in initial]),
+              "phases": phases,
+              "time": total,
+              "peak_memory": None,
+              "plan_length": len(plan),
+              "limited": len(plan) > limit,
+              "success": len(plan) <= limit and planner.check_satisfaction()}
+    if memory:
+        tracemalloc.start()
+        try:
+            planner = Planner(*(copy_stacks(initial) + copy_stacks(goal)), output=Output('none'))
+            planner.solve(limit)
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+#######################################
+# run_benchmark
+# Runs the benchmark suite over every kind and size of problem and writes the
+# results to a JSON file. A line of progress is printed to stderr for each
+# problem.
+#
+# Parameters:
+# path: the file to write the results to ('-' for stdout)
+# sizes: the list of block counts
+# kinds: the list of problem kinds (see generate_problem)
+# seed: the seed of the problem generator
+# limit: the maximum number of actions per problem (scaled with the size of
+# the problem when None)
+# memory: True to measure the peak memory of each problem
+# locations: the number of locations of each problem
+#
+# Returns the results as a dict
+#######################################
+
+def run_benchmark(path, sizes, kinds, seed=0, limit=None, memory=True, locations=3):
+    results = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "python": platform.python_version(),
+               "platform": platform.platform(),
+               "seed": seed,
+               "locations": locations,
+               "cases": []}
+    for blocks in sizes:
+        for kind in kinds:
+            problem = generate_problem(kind, blocks, seed, locations)
+            case_limit = limit
+            if case_limit is None:
+                case_limit = default_limit(blocks)
+            case = benchmark_problem(problem, case_limit, memory)
+            case["kind"] = kind
+            case["limit"] = case_limit
+            results["cases"].append(case)
+            sys.stderr.write("%-12s %6d blocks %9d actions %10.4fs %s\n" % (
+                kind, blocks, case["plan_length"], case["time"],
+                "ok" if case["success"] else "FAILED"))
+    text = json.dumps(results, indent=1)
+    if path == '-':
+        sys.stdout.write(text + "\n")
+    else:
+        with open(path, 'w') as sink:
+            sink.write(text + "\n")
+    return results
+
+#######################################
+# Main driver
+# Takes user input for the initial and goal states and initializes the Planner.
+#
+# Then runs the Planner's solve function, which solves the Table relations,
+# then the On relations, and compares the Clear relations, printing every
+# action and state along the way.
+#
+# Finally, run check_satisfaction and output the final results.
+#
+# Parameters:
+# locations: the number of locations to ask for (at least 3)
+# output: the Output the actions are written to (a full Output to
+# sys.stdout if not given)
+#######################################
+
+def interactive(locations=3, output=None):
+    print("\nWelcome to WORLD OF BLOCKS")
+    print("Instructions: Input the stack in bottom to top order with the format \"x,y,z\".")
+    stacks = []
+    for state in ["Initial", "Goal"]:
+        print("\n" + state + " state:")
+        for k in range(locations):
+            print("Enter the stack at L" + str(k + 1) + ": ", end="")
+            stacks.append(input())
+    print("")
+    # Initialize the Planner object with the inputs reformatted to lists
+    planner = Planner(*[parse_stack(stack) for stack in stacks], output=output)
+    # Print the initial state
+    planner.state.print_state()
+    # Solve for the Table, On and Clear relations
+    planner.solve()
+    # Check the satisfaction and output the final results
+    if planner.check_satisfaction():
+        print("Goal state achieved successfully.\n")
+    # If check_satisfaction comes back false, process was unsuccessful
+    else:
+        print("Operation unsuccessful.\n")
+    stop = input()
+
+#######################################
+# main
+# Runs the interactive driver, the batch solver when --batch is given (or
+# sends the batch to a server when --connect is given), the planning server
+# when --serve is given, or the benchmark suite when --benchmark is given
+# (under cProfile when --profile is given).
+#
+# Parameter:
+# argv: the command line arguments
+#######################################
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="World of Blocks planner")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="solve the problems of a JSONL file ('-' for stdin)")
+    parser.add_argument("--output", metavar="FILE", default="-",
+                        help="file for the batch result records ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for --batch (0 for one per core)")
+    parser.add_argument("--chunksize", type=int, default=64,
+                        help="problems sent to a worker at once")
+    parser.add_argument("--unordered", action="store_true",
+                        help="write records as they finish instead of in input order")
+    parser.add_argument("--mode", choices=["greedy", "astar", "bidir", "portfolio", "anytime"],
+                        default="greedy",
+                        help="planner for --batch: the greedy Planner, optimal A* search, "
+                             "optimal bidirectional search, a portfolio of all of them, or "
+                             "anytime planning that improves the greedy plan until the budget")
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="seconds a portfolio or anytime plan may run for each problem")
+    parser.add_argument("--variants", type=int, default=3,
+                        help="randomized greedy variants in a portfolio")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="give up on a greedy plan after this many actions "
+                             "(20*n*n + 1000 for n blocks by default, 0 for no limit)")
+    parser.add_argument("--max-nodes", type=int, default=None,
+                        help="give up on an A* or bidirectional search after expanding this many states")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="plans kept in memory by each batch process (0 for no memory cache)")
+    parser.add_argument("--cache", metavar="FILE", default=None,
+                        help="SQLite file that stores plans across runs")
+    parser.add_argument("--canonical", action="store_true",
+                        help="plan for the canonical form of each problem, so that problems "
+                             "that only differ by block names or location order share plans")
+    parser.add_argument("--optimize", action="store_true",
+                        help="remove redundant moves and pick up/put down pairs from each plan")
+    parser.add_argument("--archive", metavar="FILE", default=None,
+                        help="also write the --batch plans to a binary plan archive")
+    parser.add_argument("--snapshot-every", type=int, default=0,
+                        help="actions between the state snapshots of --archive (0 for none)")
+    parser.add_argument("--validate", action="store_true",
+                        help="replay each --batch plan with validate_plan before it is written")
+    parser.add_argument("--stats", action="store_true",
+                        help="add per-phase call counts, times and list sizes to each batch record")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                        help="run under cProfile and write the pstats dump to FILE "
+                             "(worker processes are not profiled)")
+    parser.add_argument("--benchmark", metavar="FILE",
+                        help="run the benchmark suite and write its results ('-' for stdout)")
+    parser.add_argument("--sizes", default="3,10,30,100,300,1000,3000",
+                        help="comma separated block counts for --benchmark")
+    parser.add_argument("--kinds", default="random,reversal,interleaved,solved",
+                        help="comma separated problem kinds for --benchmark")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the --benchmark problem generator")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the peak memory runs of --benchmark")
+    parser.add_argument("--output-mode", choices=["full", "nth", "summary", "none"],
+                        default="full",
+                        help="what the interactive driver writes while solving: every action "
+                             "and state, every --every-th one, only the number of actions, "
+                             "or nothing")
+    parser.add_argument("--every", type=int, default=1,
+                        help="interval of the actions written by --output-mode nth")
+    parser.add_argument("--locations", type=int, default=3,
+                        help="locations of the interactive and --benchmark problems (at least 3)")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="run the planning server on HOST:PORT or a Unix socket path "
+                             "(with --workers worker processes)")
+    parser.add_argument("--connect", metavar="ADDRESS",
+                        help="send the --batch problems to the planning server at ADDRESS")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds a --serve request (waiting included) or a --batch problem "
+                             "may take")
+    parser.add_argument("--max-active", type=int, default=None,
+                        help="requests given to the --serve workers at once (twice the workers "
+                             "by default)")
+    args = parser.parse_args(argv)
+    # Run under cProfile if asked to
+    if args.profile is None:
+        run_command(args)
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run_command, args)
+        finally:
+            profiler.dump_stats(args.profile)
+
+#######################################
+# run_command
+# Runs the interactive driver, the batch solver, the planning server or its
+# client, or the benchmark suite as chosen by the parsed command line
+# arguments of main.
+#
+# Parameter:
+# args: the parsed arguments
+#######################################
+
+def run_command(args):
+    # Run the benchmark suite
+    if not(args.benchmark is None):
+        run_benchmark(args.benchmark, [int(size) for size in args.sizes.split(',')],
+                      args.kinds.split(','), args.seed, args.limit, not(args.no_memory),
+                      args.locations)
+        return
+    workers = args.workers
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    settings = {"mode": args.mode, "limit": args.limit, "max_nodes": args.max_nodes,
+                "cache_size": args.cache_size, "cache_path": args.cache,
+                "canonical": args.canonical, "optimize": args.optimize,
+                "validate": args.validate, "stats": args.stats, "budget": args.budget,
+                "variants": args.variants, "timeout": args.timeout}
+    # Run the planning server
+    if not(args.serve is None):
+        serve(args.serve, settings, workers, args.max_active, args.timeout)
+        return
+    # Without --batch, run the interactive driver
+    if args.batch is None:
+        interactive(args.locations, Output(args.output_mode, None, max(1, args.every)))
+        return
+    source = sys.stdin
+    sink = sys.stdout
+    if not(args.batch == '-'):
+        source = open(args.batch, 'r')
+    if not(args.output == '-'):
+        sink = open(args.output, 'w')
+    try:
+        # Send the batch to a planning server
+        if not(args.connect is None):
+            run_client(args.connect, source, sink)
+            return
+        archive = None
+        if not(args.archive is None):
+            archive = PlanWriter(args.archive, max(0, args.snapshot_every))
+        try:
+            run_batch(source, sink, workers, max(1, args.chunksize), not(args.unordered),
+                      settings, archive)
+        finally:
+            if not(archive is None):
+                archive.close()
+        # Report the cache counters of this process (worker processes keep
+        # their own memory caches)
+        cache = get_cache(settings)
+        if workers <= 1 and not(cache is None):
+            sys.stderr.write("cache: %(hits)d hits (%(disk_hits)d from disk), %(misses)d misses, "
+                             "%(evictions)d evictions\n" % cache.stats())
+            cache.close()
+    finally:
+        if not(source is sys.stdin):
+            source.close()
+        if not(sink is sys.stdout):
+            sink.close()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
+# END OF FILE
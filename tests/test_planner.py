@@ -0,0 +1,1145 @@
+# Tests for the World of Blocks planner
+#
+# Run from the repository root with "python -m pytest tests" or
+# "python -m unittest discover tests".
+
+import asyncio
+import collections
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import FoundationsOfAIProject_Ianni as wob
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+#######################################
+# load_baseline
+# Reads the problems of baseline_plans.json and the plans the original
+# three-location pipeline printed for them
+#
+# Returns a list of (initial, goal, plan) triples
+#######################################
+
+def load_baseline():
+    with open(os.path.join(HERE, 'baseline_plans.json'), 'r') as source:
+        cases = json.load(source)
+    return [(case["initial"], case["goal"], case["plan"].split()) for case in cases]
+
+#######################################
+# small_problems
+# Lists small problems of every kind that breadth-first search can solve
+# quickly
+#
+# Returns a list of problems of the batch format (see generate_problem)
+#######################################
+
+def small_problems():
+    problems = []
+    for blocks in range(1, 6):
+        for seed in range(4):
+            problems.append(wob.generate_problem('random', blocks, seed))
+    problems.append(wob.generate_problem('reversal', 4))
+    problems.append(wob.generate_problem('interleaved', 4))
+    problems.append(wob.generate_problem('solved', 4))
+    for seed in range(3):
+        problems.append(wob.generate_problem('random', 4, seed, 4))
+    return problems
+
+#######################################
+# reaches_goal
+# Checks a search state against a goal the way get_relations does: the arm
+# is empty and the towers are the goal towers (at any locations)
+#
+# Parameters:
+# state: the CompactState
+# goal: the goal stacks
+#
+# Returns True if the state satisfies the goal
+#######################################
+
+def reaches_goal(state, goal):
+    towers = sorted([tuple(stack) for stack in goal if not(len(stack) == 0)])
+    return state.held is None and sorted([stack for stack in state.stacks if not(len(stack) == 0)]) == towers
+
+#######################################
+# shortest_length
+# Finds the length of a shortest plan with plain breadth-first search
+#
+# Parameters:
+# initial: the initial stacks
+# goal: the goal stacks
+#
+# Returns the number of actions of a shortest plan
+#######################################
+
+def shortest_length(initial, goal):
+    start = wob.CompactState.from_state(wob.make_state(wob.copy_stacks(initial)))
+    depth = {start: 0}
+    frontier = collections.deque([start])
+    while not(len(frontier) == 0):
+        state = frontier.popleft()
+        if reaches_goal(state, goal):
+            return depth[state]
+        for action, child in state.successors():
+            if not(child in depth):
+                depth[child] = depth[state] + 1
+                frontier.append(child)
+    return None
+
+#######################################
+# replay
+# Applies a plan to the initial state one action at a time
+#
+# Parameters:
+# initial: the initial stacks
+# plan: the list of actions
+#
+# Returns the list of CompactStates before and after each action
+#######################################
+
+def replay(initial, plan):
+    states = [wob.CompactState.from_state(wob.make_state(wob.copy_stacks(initial)))]
+    for action in plan:
+        states.append(states[len(states) - 1].apply(action))
+    return states
+
+#######################################
+# GreedyPipelineTest class
+# The greedy Planner must keep making the plans of the original pipeline
+#######################################
+
+class GreedyPipelineTest(unittest.TestCase):
+
+    def test_plans_match_baseline(self):
+        for initial, goal, plan in load_baseline():
+            planner = wob.Planner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal)),
+                                  output=wob.Output('none'))
+            self.assertEqual(planner.solve(wob.default_limit(10)), plan, (initial, goal))
+            self.assertTrue(planner.check_satisfaction())
+
+    def test_find_plan_matches_baseline(self):
+        for initial, goal, plan in load_baseline():
+            self.assertEqual(wob.find_plan(initial, goal), (plan, True, None))
+
+    def test_cycling_problem_is_limited(self):
+        problem = wob.generate_problem('random', 15, 11)
+        plan, success, error = wob.find_plan(problem["initial"], problem["goal"])
+        self.assertFalse(success)
+        self.assertEqual(error, "action limit reached")
+        self.assertLessEqual(len(plan), wob.default_limit(15) + 100)
+
+#######################################
+# OutputTest class
+# An Output must write what its mode asks for, and the Planner must finish
+# it when solving ends
+#######################################
+
+class OutputTest(unittest.TestCase):
+
+    def solve(self, mode, every=1):
+        initial, goal, plan = load_baseline()[0]
+        stream = io.StringIO()
+        planner = wob.Planner(*(initial + goal), output=wob.Output(mode, stream, every))
+        self.assertEqual(planner.solve(), plan)
+        return stream.getvalue(), plan
+
+    def test_summary_output(self):
+        text, plan = self.solve('summary')
+        self.assertEqual(text, "Executed " + str(len(plan)) + " actions.\n")
+
+    def test_no_output(self):
+        text, plan = self.solve('none')
+        self.assertEqual(text, "")
+
+    def test_full_and_nth_output(self):
+        full, plan = self.solve('full')
+        self.assertEqual(full.count("Action: "), len(plan))
+        nth, plan = self.solve('nth', 3)
+        self.assertEqual(nth.count("Action: "), len(plan) // 3)
+        # Every written step is written as in 'full' mode
+        steps = full.split("Action: ")
+        self.assertEqual(nth.split("Action: ")[1:], steps[3::3])
+
+    def test_bad_modes(self):
+        self.assertRaises(ValueError, wob.Output, 'all')
+        self.assertRaises(ValueError, wob.Output, 'nth', None, 0)
+
+#######################################
+# BatchInputTest class
+# Every line of a batch must give a result record, with an error for the
+# lines that are not problems the Planner can solve
+#######################################
+
+class BatchInputTest(unittest.TestCase):
+
+    def test_read_problems(self):
+        source = io.StringIO('{"initial": ["a", "", ""], "goal": ["", "a", ""]}\n'
+                             '\n'
+                             '   \n'
+                             '{"initial": ["a"\n'
+                             '[1, 2]\n')
+        problems = list(wob.read_problems(source))
+        self.assertEqual([number for number, problem in problems], [1, 2, 3])
+        self.assertEqual(problems[0][1], {"initial": ["a", "", ""], "goal": ["", "a", ""]})
+        self.assertTrue(problems[1][1].startswith("invalid JSON: "))
+        self.assertEqual(problems[2][1], "a problem must be a JSON object, not [1, 2]")
+
+    def test_unreadable_lines_give_error_records(self):
+        records = wob.solve_chunk(list(wob.read_problems(io.StringIO('{bad\n[1, 2]\n"a"\n'))))
+        self.assertEqual([record["id"] for record in records], [1, 2, 3])
+        for record in records:
+            self.assertFalse(record["success"])
+            self.assertEqual((record["plan"], record["length"]), ([], 0))
+        self.assertTrue(records[0]["error"].startswith("invalid JSON: "))
+        self.assertEqual(records[1]["error"], "a problem must be a JSON object, not [1, 2]")
+        self.assertEqual(records[2]["error"], 'a problem must be a JSON object, not "a"')
+
+    def test_invalid_problems(self):
+        cases = [({"initial": ["a", "", ""]}, "missing 'goal'"),
+                 ({"goal": ["a", "", ""]}, "missing 'initial'"),
+                 ({"initial": ["a,a", "", ""], "goal": ["", "a,a", ""]},
+                  "the initial state repeats a block"),
+                 ({"initial": ["a", "", ""], "goal": ["", "b", ""]},
+                  "the initial and goal states hold different blocks"),
+                 ({"initial": ["a,b", "", ""], "goal": ["", "a", ""]},
+                  "the initial and goal states hold different blocks"),
+                 ({"initial": ["a", "", ""], "goal": ["", "a", "", ""]},
+                  "the initial and goal states have different numbers of stacks"),
+                 ({"initial": ["a", ""], "goal": ["", "a"]}, "problems need at least 3 stacks"),
+                 ({"initial": 5, "goal": ["", "a", ""]}, "'int' object is not iterable")]
+        for problem, error in cases:
+            record = wob.solve_problem(problem, 7)
+            self.assertEqual(record["id"], 7)
+            self.assertFalse(record["success"])
+            self.assertEqual(record["error"], error, problem)
+
+    def test_solved_record(self):
+        initial, goal, plan = load_baseline()[0]
+        record = wob.solve_problem({"id": "first", "initial": initial, "goal": goal}, 1)
+        self.assertEqual(record["id"], "first")
+        self.assertEqual((record["plan"], record["length"]), (plan, len(plan)))
+        self.assertTrue(record["success"])
+        self.assertNotIn("error", record)
+
+    def test_action_limit_record(self):
+        problem = wob.generate_problem('random', 15, 11)
+        record = wob.solve_problem(problem, 1)
+        self.assertFalse(record["success"])
+        self.assertEqual(record["error"], "action limit reached")
+        self.assertEqual(record["length"], len(record["plan"]))
+        record = wob.solve_problem(problem, 1, {"limit": 50})
+        self.assertEqual(record["error"], "action limit reached")
+        self.assertLessEqual(record["length"], 150)
+
+    def test_run_batch_writes_a_record_per_line(self):
+        initial, goal, plan = load_baseline()[0]
+        lines = [json.dumps({"initial": initial, "goal": goal}), '{bad',
+                 json.dumps(wob.generate_problem('random', 15, 11)), '',
+                 json.dumps({"initial": ["a", "", ""]})]
+        sink = io.StringIO()
+        self.assertEqual(wob.run_batch(io.StringIO("\n".join(lines) + "\n"), sink), 4)
+        records = [json.loads(line) for line in sink.getvalue().splitlines()]
+        self.assertEqual([record["success"] for record in records], [True, False, False, False])
+        self.assertEqual(records[0]["plan"], plan)
+        self.assertEqual(records[2]["error"], "action limit reached")
+        self.assertEqual(records[3]["error"], "missing 'goal'")
+
+#######################################
+# ParallelBatchTest class
+# A batch solved on a process pool must give the records of a batch solved
+# in one process
+#######################################
+
+class ParallelBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        lines = []
+        for initial, goal, plan in load_baseline():
+            lines.append(json.dumps({"initial": initial, "goal": goal}))
+        lines.insert(5, '{bad')
+        lines.insert(20, json.dumps(wob.generate_problem('random', 15, 11)))
+        self.text = "\n".join(lines) + "\n"
+
+    def run_batch(self, workers, ordered=True):
+        sink = io.StringIO()
+        count = wob.run_batch(io.StringIO(self.text), sink, workers, 4, ordered)
+        records = [json.loads(line) for line in sink.getvalue().splitlines()]
+        self.assertEqual(count, len(records))
+        # Times differ from run to run
+        for record in records:
+            del record["time"]
+        return records
+
+    def test_ordered_records_match_one_worker(self):
+        single = self.run_batch(1)
+        self.assertEqual(len(single), 42)
+        self.assertEqual(self.run_batch(3), single)
+
+    def test_unordered_records(self):
+        single = self.run_batch(1)
+        records = self.run_batch(3, False)
+        self.assertEqual(len(records), len(single))
+        by_id = dict([(record["id"], record) for record in records])
+        self.assertEqual([by_id[record["id"]] for record in single], single)
+
+#######################################
+# AStarTest class
+# A* search must find plans as short as breadth-first search does
+#######################################
+
+class AStarTest(unittest.TestCase):
+
+    def test_astar_is_shortest(self):
+        for problem in small_problems():
+            initial, goal = problem["initial"], problem["goal"]
+            plan = wob.AStarPlanner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal))).plan()
+            self.assertEqual(len(plan), shortest_length(initial, goal), problem)
+            check = wob.validate_plan(initial, goal, plan)
+            self.assertTrue(check.legal and check.satisfied, problem)
+
+    def test_weighted_and_bounded_astar(self):
+        for problem in small_problems():
+            initial, goal = problem["initial"], problem["goal"]
+            shortest = shortest_length(initial, goal)
+            search = wob.AStarPlanner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal)))
+            plan = search.plan(None, 3)
+            check = wob.validate_plan(initial, goal, plan)
+            self.assertTrue(check.legal and check.satisfied, problem)
+            self.assertLessEqual(len(plan), 3 * shortest)
+            # Nothing is shorter than a shortest plan
+            self.assertIsNone(search.plan(None, 1, shortest))
+            self.assertTrue(search.exhausted)
+
+    def test_node_limit(self):
+        problem = wob.generate_problem('random', 12, 2)
+        search = wob.AStarPlanner(*(problem["initial"] + problem["goal"]))
+        self.assertIsNone(search.plan(10))
+        self.assertFalse(search.exhausted)
+        self.assertEqual(wob.find_plan(problem["initial"], problem["goal"],
+                                       {"mode": "astar", "max_nodes": 10}),
+                         ([], False, "node limit reached"))
+
+#######################################
+# PlanCacheTest class
+# A PlanCache must keep the most recently used plans, count its lookups and
+# share its on-disk store between caches
+#######################################
+
+class PlanCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(handle)
+
+    def tearDown(self):
+        for key in list(wob.caches):
+            if key[1] == self.path:
+                wob.caches.pop(key).close()
+        os.unlink(self.path)
+
+    def test_lru_eviction(self):
+        cache = wob.PlanCache(2)
+        cache.put('a', ['u'])
+        cache.put('b', ['d'])
+        # Using a makes b the least recently used plan
+        self.assertEqual(cache.get('a'), ['u'])
+        cache.put('c', ['m2'])
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+        self.assertIsNone(cache.get('b'))
+        cache.put('d', ['m3'])
+        self.assertEqual(list(cache.entries), ['c', 'd'])
+        self.assertEqual(cache.stats(), {"hits": 1, "disk_hits": 0, "misses": 1,
+                                         "evictions": 2, "size": 2})
+
+    def test_plans_are_copied(self):
+        cache = wob.PlanCache(2)
+        plan = ['u', 'm2', 'd']
+        cache.put('a', plan)
+        plan.append('m1')
+        found = cache.get('a')
+        found.append('m3')
+        self.assertEqual(cache.get('a'), ['u', 'm2', 'd'])
+
+    def test_no_memory(self):
+        cache = wob.PlanCache(0)
+        cache.put('a', ['u'])
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats(), {"hits": 0, "disk_hits": 0, "misses": 1,
+                                         "evictions": 0, "size": 0})
+
+    @unittest.skipIf(wob.sqlite3 is None, "the on-disk plan cache needs the sqlite3 module")
+    def test_disk_store_is_shared(self):
+        writer = wob.PlanCache(4, self.path)
+        key = writer.key([['a'], [], []], [[], ['a'], []])
+        writer.put(key, ['u', 'm2', 'd'])
+        writer.close()
+        reader = wob.PlanCache(1, self.path)
+        try:
+            self.assertEqual(reader.get(key), ['u', 'm2', 'd'])
+            # The second lookup is served from memory
+            self.assertEqual(reader.get(key), ['u', 'm2', 'd'])
+            self.assertIsNone(reader.get(reader.key([['a'], [], []], [[], ['a'], []], 'astar')))
+            self.assertEqual(reader.stats(), {"hits": 2, "disk_hits": 1, "misses": 1,
+                                              "evictions": 0, "size": 1})
+        finally:
+            reader.close()
+
+    @unittest.skipIf(wob.sqlite3 is None, "the on-disk plan cache needs the sqlite3 module")
+    def test_cached_records(self):
+        initial, goal, plan = load_baseline()[3]
+        problem = {"initial": initial, "goal": goal}
+        settings = {"cache_size": 8, "cache_path": self.path}
+        first = wob.solve_problem(problem, 1, settings)
+        self.assertNotIn("cached", first)
+        second = wob.solve_problem(problem, 2, settings)
+        self.assertTrue(second["cached"])
+        self.assertEqual((first["plan"], second["plan"]), (plan, plan))
+        self.assertIs(wob.get_cache(settings), wob.get_cache(dict(settings)))
+        self.assertEqual(wob.get_cache(settings).stats()["hits"], 1)
+        # A new cache on the same path finds the plan on disk
+        fresh = wob.PlanCache(8, self.path)
+        try:
+            self.assertEqual(fresh.get(fresh.key(initial, goal)), plan)
+        finally:
+            fresh.close()
+        self.assertIsNone(wob.get_cache({}))
+        self.assertIsNone(wob.get_cache(None))
+
+#######################################
+# CanonicalTest class
+# Plans of canonical problems must translate back to valid plans, and the
+# canonical form must not depend on block names or on the order of L2..LK
+#######################################
+
+class CanonicalTest(unittest.TestCase):
+
+    def problems(self):
+        for locations in range(3, 6):
+            for blocks in range(1, 8):
+                for seed in range(3):
+                    yield wob.generate_problem('random', blocks, seed, locations)
+
+    def test_translated_plans_are_valid(self):
+        for problem in self.problems():
+            initial, goal = problem["initial"], problem["goal"]
+            canonical_initial, canonical_goal, relabeling = wob.canonicalize(initial, goal)
+            plan, success, error = wob.find_plan(canonical_initial, canonical_goal)
+            self.assertTrue(success, problem)
+            check = wob.validate_plan(initial, goal, wob.translate_plan(plan, relabeling))
+            self.assertTrue(check.legal and check.satisfied, problem)
+            # The relabeling names the given block of each canonical block
+            self.assertEqual(sorted(relabeling["blocks"].values()),
+                             sorted([block for stack in initial for block in stack]))
+            for k in range(len(initial)):
+                self.assertEqual([relabeling["blocks"][block] for block in canonical_initial[k]],
+                                 initial[relabeling["locations"][k]])
+
+    def test_renaming_and_reordering(self):
+        rng = random.Random(5)
+        for problem in self.problems():
+            initial, goal = problem["initial"], problem["goal"]
+            expected = wob.canonicalize(initial, goal)[:2]
+            for attempt in range(4):
+                blocks = [block for stack in initial for block in stack]
+                names = dict(zip(blocks, ['x' + str(rng.randrange(10 ** 6)) + '_' + str(i)
+                                          for i in range(len(blocks))]))
+                order = [0] + rng.sample(range(1, len(initial)), len(initial) - 1)
+                renamed_initial = [[names[block] for block in initial[k]] for k in order]
+                goal_order = rng.sample(range(len(goal)), len(goal))
+                renamed_goal = [[names[block] for block in goal[k]] for k in goal_order]
+                self.assertEqual(wob.canonicalize(renamed_initial, renamed_goal)[:2], expected,
+                                 problem)
+
+    def test_permutation_limit(self):
+        initial = [['a'], ['b', 'c'], ['d', 'e'], ['f', 'g'], []]
+        goal = [[], ['g', 'e', 'c'], ['f', 'd', 'b', 'a'], [], []]
+        canonical_initial, canonical_goal, relabeling = wob.canonicalize(initial, goal)
+        self.assertEqual(len(canonical_initial), 5)
+        # With a single order allowed, the locations of equal height keep
+        # their given order
+        limited = wob.canonicalize(initial, goal, 1)
+        self.assertEqual(limited[2]["locations"], [0, 1, 2, 3, 4])
+        self.assertEqual(limited[0], [['b0'], ['b1', 'b2'], ['b3', 'b4'], ['b5', 'b6'], []])
+        self.assertLessEqual(canonical_goal, limited[1])
+        for canonical in [(canonical_initial, canonical_goal, relabeling), limited]:
+            plan, success, error = wob.find_plan(canonical[0], canonical[1])
+            self.assertTrue(success)
+            check = wob.validate_plan(initial, goal, wob.translate_plan(plan, canonical[2]))
+            self.assertTrue(check.legal and check.satisfied)
+
+    def test_canonical_records(self):
+        for problem in self.problems():
+            record = wob.solve_problem(problem, 1, {"canonical": True, "validate": True})
+            self.assertTrue(record["success"] and record["valid"], problem)
+
+#######################################
+# OptimizerTest class
+# optimize_plan must keep plans valid and only drop redundant actions
+#######################################
+
+class OptimizerTest(unittest.TestCase):
+
+    def test_optimized_plans_stay_valid(self):
+        for initial, goal, plan in load_baseline():
+            optimized = wob.optimize_plan(plan)
+            self.assertLessEqual(len(optimized), len(plan))
+            check = wob.validate_plan(initial, goal, optimized)
+            self.assertTrue(check.legal and check.satisfied, (initial, goal))
+            self.assertEqual(check.step, len(optimized))
+            # An optimized plan cannot be optimized further
+            self.assertEqual(wob.optimize_plan(optimized), optimized)
+
+    def test_optimize_removes_redundant_actions(self):
+        self.assertEqual(wob.optimize_plan(['u', 'd', 'm2', 'm3', 'u', 'm1', 'd']),
+                         ['m3', 'u', 'm1', 'd'])
+        # Removing a pair brings a move to the arm's location next to it
+        self.assertEqual(wob.optimize_plan(['m1', 'u', 'm1', 'd']), [])
+        self.assertEqual(wob.optimize_plan(['m2', 'm1']), [])
+        self.assertEqual(wob.optimize_plan(['m2', 'u', 'm2', 'd'], 1), [])
+        self.assertEqual(wob.optimize_plan(['m2', 'u', 'm3', 'd'], 1), ['u', 'm3', 'd'])
+
+#######################################
+# DryRunTest class
+# Planner.plan must find the plan of solve without changing the Planner or
+# writing anything
+#######################################
+
+class DryRunTest(unittest.TestCase):
+
+    def test_dry_run_matches_solve(self):
+        for initial, goal, plan in load_baseline()[:10]:
+            stream = io.StringIO()
+            planner = wob.Planner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal)),
+                                  output=wob.Output('full', stream))
+            before = planner.state.format_state()
+            actions, state = planner.plan()
+            self.assertEqual(actions, plan)
+            self.assertEqual(stream.getvalue(), "")
+            self.assertEqual(planner.state.format_state(), before)
+            self.assertTrue(reaches_goal(wob.CompactState.from_state(state), goal))
+            self.assertEqual(planner.solve(), plan)
+            self.assertEqual(wob.CompactState.from_state(planner.state),
+                             wob.CompactState.from_state(state))
+
+    def test_dry_run_keeps_random_choices(self):
+        problem = wob.generate_problem('random', 8, 4, 4)
+        planner = wob.Planner(*(problem["initial"] + problem["goal"]), output=wob.Output('none'),
+                              rng=random.Random(3))
+        actions, state = planner.plan()
+        self.assertEqual(planner.plan()[0], actions)
+        self.assertEqual(planner.solve(), actions)
+
+#######################################
+# StepTest class
+# Planner.execute_steps must describe every kind of action in its Steps and
+# only execute an action when its Step is asked for
+#######################################
+
+class StepTest(unittest.TestCase):
+
+    def planner(self):
+        return wob.Planner(['a', 'b'], ['c'], [], [], ['a', 'b', 'c'], [], output=wob.Output('none'))
+
+    def test_step_fields(self):
+        planner = self.planner()
+        steps = list(planner.execute_steps(['u', 'm2', 'd', 'm1', 'u', 'm3', 'd', 'm2']))
+        Step = wob.Step
+        self.assertEqual(steps, [Step('u', 'unstack', 'b', 'a', 'L1', 'L1', 1),
+                                 Step('m2', 'move', 'b', 'c', 'L1', 'L2', 2),
+                                 Step('d', 'stack', 'b', 'c', 'L2', 'L2', 3),
+                                 Step('m1', 'move', wob.EMPTY, 'a', 'L2', 'L1', 4),
+                                 Step('u', 'pick up', 'a', wob.EMPTY, 'L1', 'L1', 5),
+                                 Step('m3', 'move', 'a', wob.EMPTY, 'L1', 'L3', 6),
+                                 Step('d', 'put down', 'a', wob.EMPTY, 'L3', 'L3', 7),
+                                 Step('m2', 'move', wob.EMPTY, 'b', 'L3', 'L2', 8)])
+        self.assertEqual(planner.state.num, 8)
+        self.assertEqual([location.stack for location in planner.state.locations],
+                         [[], [planner.ids['c'], planner.ids['b']], [planner.ids['a']]])
+
+    def test_steps_are_lazy(self):
+        planner = self.planner()
+        steps = planner.execute_steps(['u', 'm3', 'd'])
+        self.assertEqual(planner.state.num, 0)
+        self.assertEqual(next(steps).kind, 'unstack')
+        self.assertEqual((planner.state.num, planner.state.arm.item), (1, planner.ids['b']))
+        self.assertEqual(len(planner.state.locations[0].stack), 1)
+
+    def test_faulty_actions_yield_nothing(self):
+        planner = self.planner()
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            steps = list(planner.execute_steps(['x', 'm9', 'm2']))
+        self.assertEqual([step.action for step in steps], ['m2'])
+        self.assertEqual(printed.getvalue().count("faulty action"), 2)
+
+    def test_steps_describe_the_output(self):
+        initial, goal, plan = load_baseline()[2]
+        stream = io.StringIO()
+        planner = wob.Planner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal)),
+                              output=wob.Output('full', stream))
+        planner.execute_with_output(plan)
+        steps = list(wob.Planner(*(initial + goal)).execute_steps(plan))
+        self.assertEqual(len(steps), len(plan))
+        for step in steps:
+            self.assertIn(wob.describe_step(step), stream.getvalue())
+
+#######################################
+# InstrumentTest class
+# An instrumented Planner must count its phases without changing its plan
+#######################################
+
+class InstrumentTest(unittest.TestCase):
+
+    def test_phases_are_counted(self):
+        initial, goal, plan = load_baseline()[4]
+        planner = wob.Planner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal)),
+                              output=wob.Output('none'))
+        stats = planner.instrument()
+        self.assertEqual(sorted(stats), sorted(wob.PHASES + ['format_state']))
+        self.assertEqual(planner.solve(), plan)
+        for name in wob.PHASES:
+            self.assertGreater(stats[name]["calls"], 0, name)
+            self.assertGreaterEqual(stats[name]["time"], stats[name]["max_time"])
+            self.assertGreaterEqual(stats[name]["items"], stats[name]["max_items"])
+        # Nothing is rendered with an Output that writes nothing
+        self.assertEqual(stats["format_state"]["calls"], 0)
+
+    def test_instrumented_planner_takes_keywords(self):
+        initial, goal, plan = load_baseline()[0]
+        planner = wob.Planner(*(initial + goal), output=wob.Output('none'))
+        stats = planner.instrument()
+        planner.execute_with_output(plan[:3], output=wob.Output('none'))
+        self.assertEqual(stats["execute_with_output"]["calls"], 1)
+
+    def test_find_plan_stats(self):
+        initial, goal, plan = load_baseline()[4]
+        stats = {}
+        self.assertEqual(wob.find_plan(initial, goal, None, stats), (plan, True, None))
+        self.assertGreater(stats["compare_relations"]["calls"], 0)
+
+#######################################
+# BlockNameTest class
+# Blocks may have any names: names that look like block ids, long names and
+# names that are not strings
+#######################################
+
+class BlockNameTest(unittest.TestCase):
+
+    def check_planners(self, initial, goal):
+        planner = wob.Planner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal)),
+                              output=wob.Output('none'))
+        plan = planner.solve()
+        self.assertTrue(planner.check_satisfaction())
+        check = wob.validate_plan(initial, goal, plan)
+        self.assertTrue(check.legal and check.satisfied)
+        named = [[str(block) for block in stack] for stack in goal]
+        shortest = shortest_length(initial, named)
+        for search in [wob.AStarPlanner(*(initial + goal)), wob.BidirectionalPlanner(*(initial + goal))]:
+            plan = search.plan()
+            self.assertEqual(len(plan), shortest, type(search))
+            check = wob.validate_plan(initial, goal, plan)
+            self.assertTrue(check.legal and check.satisfied, type(search))
+
+    def test_blocks_named_like_ids(self):
+        self.check_planners([['0', '1'], [], ['2']], [[], ['1', '0', '2'], []])
+        self.check_planners([['1', '0'], ['alpha'], []], [['0', 'alpha', '1'], [], []])
+
+    def test_blocks_that_are_not_strings(self):
+        self.check_planners([[1, 2], [], []], [[2, 1], [], []])
+        self.check_planners([[1, 2], [], [0]], [[], [2, 1, 0], []])
+        self.assertEqual(wob.AStarPlanner([1, 2], [], [], [2, 1], [], []).plan(),
+                         ['u', 'm2', 'd', 'm1', 'u', 'm2', 'd'])
+
+    def test_long_names_are_drawn_in_columns(self):
+        planner = wob.Planner(['alpha', 'beta'], ['0'], [], ['0', 'beta', 'alpha'], [], [],
+                              output=wob.Output('none'))
+        self.assertEqual(planner.state.format_state(),
+                         "State 0:\n"
+                         "   |\n"
+                         "/     \\\n"
+                         "\n"
+                         " beta               \n"
+                         " alpha  0           \n"
+                         "=====================\n"
+                         " L1     L2     L3\n\n")
+        planner.execute_with_output(['u', 'm3'])
+        self.assertEqual(planner.state.format_state(),
+                         "State 2:\n"
+                         "                 |\n"
+                         "              /beta \\\n"
+                         "\n"
+                         " alpha  0           \n"
+                         "=====================\n"
+                         " L1     L2     L3\n\n")
+        self.assertEqual(wob.make_state([[10, 2], [], []]).format_state(),
+                         "State 0:\n |\n/  \\\n\n 2         \n 10        \n============\n"
+                         " L1  L2  L3\n\n")
+
+    def test_batch_names(self):
+        record = wob.solve_problem({"initial": ["0,10", "", "7"], "goal": ["", "10,0,7", ""]})
+        self.assertTrue(record["success"])
+        record = wob.solve_problem({"initial": [[0, 10], [], [7]], "goal": [[], [10, 0, 7], []]},
+                                   1, {"mode": "astar"})
+        self.assertTrue(record["success"])
+
+#######################################
+# BidirectionalTest class
+# Bidirectional search must find plans as short as breadth-first search does
+#######################################
+
+class BidirectionalTest(unittest.TestCase):
+
+    def test_bidirectional_is_shortest(self):
+        for problem in small_problems():
+            initial, goal = problem["initial"], problem["goal"]
+            search = wob.BidirectionalPlanner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal)))
+            plan = search.plan()
+            self.assertTrue(search.complete)
+            self.assertEqual(len(plan), shortest_length(initial, goal), problem)
+            check = wob.validate_plan(initial, goal, plan)
+            self.assertTrue(check.legal and check.satisfied, problem)
+            if not(len(plan) == 0):
+                self.assertEqual(sum(search.meeting), len(plan))
+
+    def test_limited_goal_states(self):
+        initial = [['a', 'b', 'c'], [], [], []]
+        goal = [[], ['a'], ['b'], ['c']]
+        search = wob.BidirectionalPlanner(*(initial + goal), max_goals=5)
+        self.assertFalse(search.complete)
+        plan = search.plan()
+        check = wob.validate_plan(initial, goal, plan)
+        self.assertTrue(check.legal and check.satisfied)
+        self.assertGreaterEqual(len(plan), shortest_length(initial, goal))
+
+    def test_node_limit(self):
+        problem = wob.generate_problem('random', 12, 2)
+        search = wob.BidirectionalPlanner(*(problem["initial"] + problem["goal"]))
+        self.assertIsNone(search.plan(10))
+        self.assertEqual(wob.find_plan(problem["initial"], problem["goal"],
+                                       {"mode": "bidir", "max_nodes": 10}),
+                         ([], False, "node limit reached"))
+
+#######################################
+# ProgressTest class
+# The goal progress tracked as actions are applied must match the progress
+# recomputed from the whole state
+#######################################
+
+class ProgressTest(unittest.TestCase):
+
+    # Recomputes (satisfied, total, well_placed) of Planner.progress from the
+    # stacks of the Planner's state
+    def recompute(self, planner):
+        state = planner.state
+        relations = set()
+        well_placed = set()
+        for location in state.locations:
+            stack = location.stack
+            placed = True
+            for i in range(len(stack)):
+                if i == 0:
+                    relation = ('t', stack[0])
+                else:
+                    relation = ('o', stack[i], stack[i - 1])
+                relations.add(relation)
+                placed = placed and relation in planner.relations_g
+                if placed:
+                    well_placed.add(stack[i])
+            if not(len(stack) == 0):
+                relations.add(('c', stack[len(stack) - 1]))
+        if not(state.arm.item is wob.EMPTY):
+            top = wob.EMPTY
+            if not(len(state.arm.place.stack) == 0):
+                top = state.arm.place.stack[len(state.arm.place.stack) - 1]
+            relations.add(('a', state.arm.item, top))
+        goal = list(planner.relations_g)
+        satisfied = len([relation for relation in goal if relation in relations])
+        return satisfied, len(goal), len(well_placed), well_placed
+
+    def check_progress(self, planner, step):
+        satisfied, total, placed, well_placed = self.recompute(planner)
+        self.assertEqual(planner.progress(), (satisfied, total, placed), step)
+        self.assertEqual(planner.relations_c.well_placed, well_placed, step)
+        self.assertEqual(planner.check_satisfaction(), satisfied == total, step)
+
+    def test_progress_matches_recomputed(self):
+        cases = load_baseline()
+        for seed in range(5):
+            problem = wob.generate_problem('random', 9, seed, 4)
+            plan, success, error = wob.find_plan(problem["initial"], problem["goal"])
+            cases.append((problem["initial"], problem["goal"], plan))
+        for initial, goal, plan in cases:
+            planner = wob.Planner(*(wob.copy_stacks(initial) + wob.copy_stacks(goal)),
+                                  output=wob.Output('none'))
+            self.check_progress(planner, None)
+            checked = 0
+            # Steps are executed one at a time as they are asked for
+            for step in planner.execute_steps(plan):
+                self.check_progress(planner, step)
+                checked += 1
+            self.assertEqual(checked, len(plan))
+            self.assertTrue(planner.check_satisfaction())
+
+#######################################
+# ServerTest class
+# A PlanServer must answer a local client: plans, statistics, timeouts and
+# lines that are not problems
+#######################################
+
+class ServerTest(unittest.TestCase):
+
+    # Starts a PlanServer on a free local port, runs scenario(server, address)
+    # and closes the server
+    def serve(self, scenario, settings=None, timeout=None):
+
+        async def run():
+            server = wob.PlanServer(settings, 1, None, timeout)
+            address = await server.start('127.0.0.1:0')
+            try:
+                return await scenario(server, address)
+            finally:
+                await server.close()
+
+        return asyncio.run(run())
+
+    def test_requests(self):
+        initial, goal, plan = load_baseline()[0]
+
+        async def scenario(server, address):
+            return await wob.ask_server(address, [{"id": "first", "initial": initial, "goal": goal},
+                                                  '{"initial": ["a"',
+                                                  '[1, 2]',
+                                                  {"initial": ["a", "", ""]}])
+
+        answers = self.serve(scenario)
+        self.assertEqual(len(answers), 4)
+        by_id = dict([(answer["id"], answer) for answer in answers])
+        self.assertEqual(by_id["first"]["plan"], plan)
+        self.assertTrue(by_id["first"]["success"])
+        # Problems are numbered from 1 in the order they were received
+        self.assertTrue(by_id[2]["error"].startswith("invalid JSON: "))
+        self.assertEqual(by_id[3]["error"], "a problem must be a JSON object, not [1, 2]")
+        self.assertEqual(by_id[4]["error"], "missing 'goal'")
+
+    def test_stats(self):
+        initial, goal, plan = load_baseline()[0]
+
+        async def scenario(server, address):
+            await wob.ask_server(address, [{"initial": initial, "goal": goal}, '{bad'])
+            return await wob.ask_server(address, [{"op": "stats"}])
+
+        stats = self.serve(scenario)[0]
+        self.assertEqual((stats["received"], stats["solved"], stats["failed"]), (3, 1, 1))
+        self.assertEqual((stats["timeouts"], stats["restarts"], stats["waiting"], stats["active"]),
+                         (0, 0, 0, 0))
+        self.assertEqual((stats["workers"], stats["max_active"]), (1, 2))
+        self.assertEqual(stats["latency"]["count"], 2)
+
+    def test_timeout(self):
+        # Without an action limit, the greedy Planner cycles on this problem
+        # until its deadline
+        problem = wob.generate_problem('random', 15, 11)
+        initial, goal, plan = load_baseline()[0]
+
+        async def scenario(server, address):
+            start = time.perf_counter()
+            answers = await wob.ask_server(address, [problem])
+            stats = server.stats()
+            # The worker stops at its deadline and is free for the next request
+            answers += await wob.ask_server(address, [{"initial": initial, "goal": goal}])
+            return answers, stats, time.perf_counter() - start
+
+        answers, stats, spent = self.serve(scenario, {"limit": 0}, 0.5)
+        self.assertEqual(answers[0]["error"], "timed out")
+        self.assertFalse(answers[0]["success"])
+        self.assertEqual((stats["timeouts"], stats["failed"]), (1, 1))
+        self.assertTrue(answers[1]["success"])
+        self.assertEqual(answers[1]["plan"], plan)
+        self.assertLess(spent, 3.0)
+
+    def test_dead_worker_is_replaced(self):
+        initial, goal, plan = load_baseline()[0]
+        problem = {"initial": initial, "goal": goal}
+
+        async def scenario(server, address):
+            answers = await wob.ask_server(address, [problem])
+            for process in list(server.pool._processes.values()):
+                process.kill()
+                process.join()
+            answers += await wob.ask_server(address, [problem])
+            answers += await wob.ask_server(address, [problem, problem])
+            return answers, server.stats()
+
+        answers, stats = self.serve(scenario)
+        self.assertEqual([answer["success"] for answer in answers], [True, False, True, True])
+        self.assertEqual(answers[1]["error"], "worker process failed")
+        self.assertEqual(answers[3]["plan"], plan)
+        self.assertEqual((stats["restarts"], stats["active"]), (1, 0))
+
+    def test_client_streams(self):
+        lines = []
+        for initial, goal, plan in load_baseline()[:12]:
+            lines.append(json.dumps({"initial": initial, "goal": goal}))
+        lines.insert(3, '')
+        read = []
+        arrived = []
+
+        # Yields the lines one at a time, noting how many were read
+        def source():
+            for line in lines:
+                read.append(line)
+                yield line
+
+        async def scenario(server, address):
+            answers = await wob.ask_server(address, source(),
+                                           lambda answer: arrived.append(len(read)), 2)
+            sink = io.StringIO()
+            count = await asyncio.get_running_loop().run_in_executor(
+                None, wob.run_client, address, io.StringIO("\n".join(lines) + "\n"), sink)
+            return answers, count, sink.getvalue()
+
+        answers, count, text = self.serve(scenario)
+        # Answers are passed on rather than collected
+        self.assertEqual(answers, [])
+        self.assertEqual(len(arrived), 12)
+        # No more than 2 requests were ever waiting for an answer
+        for i in range(len(arrived)):
+            self.assertLessEqual(arrived[i], i + 4)
+        self.assertLess(arrived[0], len(lines))
+        self.assertEqual(count, 12)
+        records = [json.loads(line) for line in text.splitlines()]
+        self.assertEqual(len(set([record["id"] for record in records])), 12)
+        self.assertTrue(all([record["success"] for record in records]))
+
+    def test_search_deadline(self):
+        problem = wob.generate_problem('random', 40, 3)
+        search = wob.AStarPlanner(*(problem["initial"] + problem["goal"]))
+        deadline = time.perf_counter() + 0.2
+        self.assertIsNone(search.plan(None, 1, None, deadline))
+        self.assertFalse(search.exhausted)
+        self.assertTrue(search.timed_out)
+        self.assertLess(time.perf_counter(), deadline + 0.2)
+        for mode in ['astar', 'bidir']:
+            record = wob.solve_problem(problem, 1, {"mode": mode, "timeout": 0.2})
+            self.assertEqual(record["error"], "time limit reached", mode)
+            self.assertLess(record["time"], 0.4)
+
+#######################################
+# ArchiveTest class
+# Plans written to a plan archive must read back unchanged
+#######################################
+
+class ArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.wob')
+        os.close(handle)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_round_trip(self):
+        cases = load_baseline()
+        # A problem with 15 locations needs 8 bits per action
+        problem = wob.generate_problem('random', 6, 1, 15)
+        plan = wob.AStarPlanner(*(problem["initial"] + problem["goal"])).plan()
+        cases.append((problem["initial"], problem["goal"], plan))
+        with wob.PlanWriter(self.path, 7) as writer:
+            for i in range(len(cases)):
+                writer.write(cases[i][2], "plan-" + str(i), cases[i][0])
+            # A plan can also be stored without its initial state
+            writer.write(['u', 'm2', 'd'])
+        reader = wob.PlanReader(self.path)
+        try:
+            records = list(reader)
+            self.assertEqual(len(records), len(cases) + 1)
+            for i in range(len(cases)):
+                initial, goal, plan = cases[i]
+                record = records[i]
+                self.assertEqual(record.id, "plan-" + str(i))
+                self.assertEqual(list(record.actions()), plan)
+                states = replay(initial, plan)
+                start, snapshots = record.states()
+                self.assertEqual(start, states[0])
+                for step, state in snapshots:
+                    self.assertEqual(state, states[step])
+                for step in range(len(plan) + 1):
+                    self.assertEqual(record.state_at(step), states[step])
+                if not(len(plan) == 0):
+                    self.assertEqual(record.action(len(plan) - 1), plan[len(plan) - 1])
+            self.assertEqual(list(records[len(cases)].actions()), ['u', 'm2', 'd'])
+            self.assertEqual(records[len(cases)].states(), (None, []))
+        finally:
+            reader.close()
+
+    def test_batch_archive(self):
+        cases = load_baseline()[:8]
+        lines = [json.dumps({"id": "p" + str(i), "initial": cases[i][0], "goal": cases[i][1]})
+                 for i in range(len(cases))]
+        # Failed problems are left out of the archive
+        lines.insert(2, '{bad')
+        with wob.PlanWriter(self.path, 4) as writer:
+            wob.run_batch(io.StringIO("\n".join(lines) + "\n"), io.StringIO(), 1, 64, True, None,
+                          writer)
+        with wob.PlanReader(self.path) as reader:
+            records = list(reader)
+            self.assertEqual([record.id for record in records], ["p" + str(i) for i in range(8)])
+            for i in range(len(cases)):
+                self.assertEqual(list(records[i].actions()), cases[i][2])
+                self.assertEqual(records[i].state_at(len(cases[i][2])),
+                                 replay(cases[i][0], cases[i][2])[len(cases[i][2])])
+
+    def test_not_an_archive(self):
+        with open(self.path, 'wb') as sink:
+            sink.write(b'not a plan archive')
+        self.assertRaises(ValueError, wob.PlanReader, self.path)
+
+#######################################
+# ValidatorTest class
+# validate_plan must find the first illegal action and check the goal the
+# way the Planner does
+#######################################
+
+class ValidatorTest(unittest.TestCase):
+
+    def test_baseline_plans_are_valid(self):
+        for initial, goal, plan in load_baseline():
+            check = wob.validate_plan(initial, goal, plan)
+            self.assertTrue(check.legal and check.satisfied, (initial, goal))
+            self.assertEqual(check.step, len(plan))
+            self.assertEqual(check.state, replay(initial, plan)[len(plan)])
+
+    def test_illegal_actions(self):
+        initial = [['a', 'b'], [], []]
+        goal = [[], ['b', 'a'], []]
+        check = wob.validate_plan(initial, goal, ['d'])
+        self.assertEqual((check.legal, check.step, check.action), (False, 0, 'd'))
+        self.assertEqual(check.error, "put down with an empty arm")
+        check = wob.validate_plan(initial, goal, ['u', 'u'])
+        self.assertEqual((check.legal, check.step, check.error), (False, 1, "pick up while holding b"))
+        # The state is the one reached before the illegal action
+        self.assertEqual(check.state, wob.CompactState((('a',), (), ()), 0, 'b'))
+        check = wob.validate_plan(initial, goal, ['u', 'm9'])
+        self.assertEqual((check.legal, check.step, check.error), (False, 1, "unknown action m9"))
+        check = wob.validate_plan(initial, goal, ['m2', 'u'])
+        self.assertEqual((check.legal, check.step), (False, 1))
+        self.assertEqual(check.error, "pick up from the empty stack at L2")
+        check = wob.validate_plan(initial, goal, ['x'])
+        self.assertFalse(check.legal)
+
+    def test_unfinished_plan(self):
+        initial = [['a', 'b'], [], []]
+        goal = [[], ['a', 'b'], []]
+        check = wob.validate_plan(initial, goal, ['u', 'm2', 'd'])
+        self.assertTrue(check.legal)
+        self.assertFalse(check.satisfied)
+        check = wob.validate_plan(initial, goal, ['u', 'm3', 'd', 'm1', 'u', 'm2', 'd', 'm3', 'u',
+                                                  'm2', 'd'])
+        self.assertTrue(check.legal and check.satisfied)
+
+    def test_start_with_a_held_block(self):
+        check = wob.validate_plan([['a'], [], []], [['a', 'c'], [], []], ['m1', 'd'], 1, 'c')
+        self.assertTrue(check.legal and check.satisfied)
+        # A goal tower must be a whole stack, not the bottom of one
+        check = wob.validate_plan([['a'], ['b'], []], [['b'], [], []], ['d'], 1, 'c')
+        self.assertTrue(check.legal)
+        self.assertFalse(check.satisfied)
+
+    def test_validated_records(self):
+        initial, goal, plan = load_baseline()[1]
+        record = wob.solve_problem({"initial": initial, "goal": goal}, 1, {"validate": True})
+        self.assertTrue(record["success"] and record["valid"])
+        self.assertEqual(record["plan"], plan)
+        record = wob.solve_problem({"initial": initial, "goal": goal}, 1,
+                                   {"validate": True, "optimize": True, "mode": "astar"})
+        self.assertTrue(record["success"] and record["valid"])
+
+#######################################
+# PortfolioTest class
+# A portfolio must keep the shortest valid plan of its strategies and
+# cancel the strategies still running when it stops
+#######################################
+
+class PortfolioTest(unittest.TestCase):
+
+    def names(self, settings):
+        return sorted([name for name, options in wob.portfolio_strategies(settings)])
+
+    def test_small_problems_are_optimal(self):
+        for problem in small_problems()[::6]:
+            initial, goal = problem["initial"], problem["goal"]
+            plan, report = wob.run_portfolio(initial, goal, {"budget": 20})
+            self.assertTrue(report["optimal"], problem)
+            self.assertEqual(len(plan), shortest_length(initial, goal), problem)
+            check = wob.validate_plan(initial, goal, plan)
+            self.assertTrue(check.legal and check.satisfied, problem)
+            self.assertIn(report["winner"], report["strategies"])
+            # Every strategy either finished or was cancelled
+            self.assertEqual(sorted(list(report["strategies"]) + report["cancelled"]),
+                             self.names({}))
+
+    def test_running_strategies_are_cancelled(self):
+        # Without an action limit, the greedy strategies cycle on this
+        # problem until they are cancelled
+        problem = wob.generate_problem('random', 15, 11)
+        settings = {"budget": 1.0, "limit": 0, "variants": 1}
+        start = time.perf_counter()
+        plan, report = wob.run_portfolio(problem["initial"], problem["goal"], settings)
+        self.assertLess(time.perf_counter() - start, 3.0)
+        self.assertIn("greedy", report["cancelled"])
+        self.assertNotIn("greedy", report["strategies"])
+        self.assertEqual(sorted(list(report["strategies"]) + report["cancelled"]),
+                         self.names(settings))
+        if not(plan is None):
+            check = wob.validate_plan(problem["initial"], problem["goal"], plan)
+            self.assertTrue(check.legal and check.satisfied)
+
+#######################################
+# AnytimeTest class
+# Anytime planning must return improving valid plans by its deadline
+#######################################
+
+class AnytimeTest(unittest.TestCase):
+
+    def test_anytime_improves_a_cycling_problem(self):
+        problem = wob.generate_problem('random', 15, 11)
+        found = []
+        start = time.perf_counter()
+        plan, report = wob.plan_anytime(problem["initial"], problem["goal"], start + 1.0,
+                                        lambda plan, info: found.append(info["length"]))
+        self.assertLess(time.perf_counter(), start + 1.5)
+        self.assertIsNotNone(plan)
+        self.assertEqual(found[len(found) - 1], len(plan))
+        # Every plan reported is shorter than the one before
+        self.assertEqual(found, sorted(set(found), reverse=True))
+        self.assertEqual([info["length"] for info in report["improvements"]], found)
+        check = wob.validate_plan(problem["initial"], problem["goal"], plan)
+        self.assertTrue(check.legal and check.satisfied)
+
+    def test_small_problems_are_optimal(self):
+        for problem in small_problems()[::4]:
+            initial, goal = problem["initial"], problem["goal"]
+            plan, report = wob.plan_anytime(initial, goal, time.perf_counter() + 10)
+            self.assertTrue(report["optimal"], problem)
+            self.assertEqual(len(plan), shortest_length(initial, goal), problem)
+            check = wob.validate_plan(initial, goal, plan)
+            self.assertTrue(check.legal and check.satisfied, problem)
+
+    def test_anytime_records(self):
+        initial, goal, plan = load_baseline()[5]
+        record = wob.solve_problem({"initial": initial, "goal": goal}, 1,
+                                   {"mode": "anytime", "budget": 5, "stats": True})
+        self.assertTrue(record["success"])
+        self.assertTrue(record["stats"]["anytime"]["optimal"])
+        self.assertLessEqual(record["length"], len(plan))
+
+if __name__ == "__main__":
+    unittest.main()